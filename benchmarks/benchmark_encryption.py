@@ -0,0 +1,53 @@
+# Micro-benchmark comparing the AES-GCM Encryption (current) with the legacy (pyDes) triple DES
+# version, on representative (generated) accounts files, as used for the /accounts page.
+# Usage: python -m benchmarks.benchmark_encryption [--accounts N ...] [--iterations N]
+
+import argparse
+import json
+import timeit
+from typing import List
+from foursight_core.react.api.encoding_utils import base64_encode_to_bytes, bytes_to_string
+from foursight_core.react.api.encryption import Encryption
+
+PASSWORD = "benchmark-password-not-a-secret"
+
+
+def create_accounts_file_data(naccounts: int) -> dict:
+    return {"data": [{
+        "name": f"account-{index:03}",
+        "stage": "prod" if index % 2 else "dev",
+        "foursight_url": f"https://foursight-{index:03}.some-internal-domain.hms.harvard.edu/api/view/data",
+        "portal_url": f"https://portal-{index:03}.some-internal-domain.hms.harvard.edu"
+    } for index in range(naccounts)]}
+
+
+def benchmark(naccounts_list: List[int], iterations: int) -> None:
+    encryption = Encryption(PASSWORD)
+    print(f"{'accounts':>8} {'bytes':>8} {'legacy decrypt ms':>18}"
+          f" {'aes-gcm encrypt ms':>19} {'aes-gcm decrypt ms':>19}")
+    for naccounts in naccounts_list:
+        plaintext = json.dumps(create_accounts_file_data(naccounts))
+        legacy_encryptor = encryption._get_legacy_encryptor()
+        legacy_encrypted = bytes_to_string(base64_encode_to_bytes(legacy_encryptor.encrypt(plaintext, padmode=2)))
+        encrypted = encryption.encrypt(plaintext)
+        assert encryption.decrypt(legacy_encrypted) == plaintext and encryption.decrypt(encrypted) == plaintext
+
+        def milliseconds(function) -> float:
+            return timeit.timeit(function, number=iterations) * 1000 / iterations
+
+        print(f"{naccounts:>8} {len(plaintext):>8}"
+              f" {milliseconds(lambda: encryption.decrypt(legacy_encrypted)):>18.3f}"
+              f" {milliseconds(lambda: encryption.encrypt(plaintext)):>19.3f}"
+              f" {milliseconds(lambda: encryption.decrypt(encrypted)):>19.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Encryption (AES-GCM) versus legacy triple DES.")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[5, 25, 100], help="Accounts per file.")
+    parser.add_argument("--iterations", type=int, default=10, help="Iterations per measurement.")
+    args = parser.parse_args()
+    benchmark(args.accounts, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+# Offline benchmarks of the main foursight_core code paths which talk to AWS and/or ES: storing and reading
+# check results (S3 and/or ES), check history, check scheduling (SQS), the check runner, and some React API
+# routes; run against the in-memory fakes (see fakes.py), so no AWS account or network access is needed.
+# Each benchmark reports its min/median/mean time per run, and the number of (fake) AWS/ES calls per run;
+# use --latency-ms to simulate network latency per call, so that fewer round trips show up as faster.
+# Results may be saved as JSON (--save) and compared against a previously saved run (--compare), in which
+# case the exit status is 1 if any benchmark's median time regressed by more than --threshold percent.
+# Usage: python -m benchmarks.benchmark_foursight [--checks N] [--results N] [--output-size BYTES]
+#            [--backend s3|es ...] [--iterations N] [--latency-ms N] [--only NAME ...]
+#            [--save FILE] [--compare FILE] [--threshold PERCENT]
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional
+from unittest import mock
+from .fakes import FakeAws, fake_aws
+
+with contextlib.redirect_stdout(io.StringIO()):  # importing these prints a lot (e.g. registering endpoints)
+    from .checks.benchmark_checks import BENCHMARK_PREFIX, create_benchmark_output
+    from foursight_core.app import app
+    from foursight_core.app_utils import AppUtilsCore
+    from foursight_core.check_utils import CheckHandler
+    from foursight_core.decorators import Decorators
+    from foursight_core.es_connection import ESConnection
+    from foursight_core.fs_connection import FSConnection
+    from foursight_core.react.api.react_api import ReactApi
+    from foursight_core.s3_connection import S3Connection
+    from foursight_core.sqs_utils import SQS
+    from foursight_core.stage import Stage
+
+BENCHMARK_ENV = "benchmark"
+BENCHMARK_BUCKET = f"{BENCHMARK_PREFIX}-{BENCHMARK_ENV}"
+BENCHMARK_SCHEDULE = "benchmark_checks"
+BENCHMARK_CHECK = "benchmark_check"  # the only check actually defined (and so runnable); see benchmark_checks.py
+BENCHMARK_STORE_CHECK = "benchmark_store_check"
+BENCHMARK_DELETE_CHECK = "benchmark_delete_check"
+BENCHMARK_STATUSES = ["PASS"] * 7 + ["WARN", "FAIL", "ERROR"]
+BENCHMARK_RESULTS_VERSION = 1
+UUID_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def get_check_names(nchecks: int) -> List[str]:
+    return [BENCHMARK_CHECK] + [f"{BENCHMARK_CHECK}_{index:04}" for index in range(1, nchecks)]
+
+
+def create_check_setup(check_names: List[str], output_size: int) -> dict:
+    return {check_name: {
+        "title": f"Benchmark Check {index}",
+        "group": f"Benchmark Group {index % 5}",
+        "schedule": {BENCHMARK_SCHEDULE: {BENCHMARK_ENV: {
+            "kwargs": {"primary": True, "output_size": output_size},
+            "dependencies": []
+        }}},
+        "module": "benchmark_checks"
+    } for index, check_name in enumerate(check_names)}
+
+
+def populate_results(fakes: FakeAws, use_es: bool, check_name: str,
+                     nresults: int, output_size: int, now: datetime.datetime) -> None:
+    """
+    Stores (directly into the fakes) the given number of hourly results, up to now, for the given check,
+    like CheckResult.store_result would, including its latest and primary results (the most recent one).
+    """
+    output = create_benchmark_output(output_size)
+    for index in range(nresults):
+        uuid = (now - datetime.timedelta(hours=nresults - 1 - index)).strftime(UUID_FORMAT)
+        status = BENCHMARK_STATUSES[index % len(BENCHMARK_STATUSES)]
+        result = {
+            "name": check_name, "summary": f"Benchmark check is {status}", "description": "Benchmark check",
+            "status": status, "uuid": uuid, "brief_output": None, "full_output": output, "admin_output": None,
+            "ff_link": "", "action": "", "allow_action": False, "prevent_action": False, "action_message": "",
+            "kwargs": {"primary": True, "uuid": uuid, "queue_action": "Not queued", "runtime_seconds": 1.5},
+            "type": "check"
+        }
+        keys = [f"{check_name}/{uuid}.json"]
+        if index == nresults - 1:
+            keys += [f"{check_name}/latest.json", f"{check_name}/primary.json"]
+        for key in keys:
+            document = {**result, "id_alias": key}
+            fakes.put_s3_object(BENCHMARK_BUCKET, key, json.dumps(document))
+            if use_es:
+                fakes.put_es_document(BENCHMARK_BUCKET, key, document)
+
+
+class BenchmarkEnvironment:
+    """
+    Stand-in for Environment, which needs a real environment configuration (from S3).
+    """
+    @staticmethod
+    def is_valid_environment_name(env: str, or_all: bool = False) -> bool:
+        return env == BENCHMARK_ENV or (or_all and env == "all")
+
+    @staticmethod
+    def get_selected_environment_names(env: str) -> List[str]:
+        return [BENCHMARK_ENV]
+
+
+class BenchmarkChecks:
+    """
+    Stand-in for the React API Checks, which annotates the checks with info from AWS (i.e. lambdas).
+    """
+    def __init__(self, check_setup: dict) -> None:
+        self._checks = {check_name: {"name": check_name, "group": detail["group"], "title": detail["title"]}
+                        for check_name, detail in check_setup.items()}
+
+    def get_checks(self, env: str) -> dict:
+        return self._checks
+
+
+class BenchmarkCore:
+    """
+    Stand-in for AppUtilsCore, which needs a real environment configuration to construct; this has just
+    what the (actual, unchanged) AppUtilsCore methods being benchmarked, which are borrowed here, use.
+    """
+    get_foursight_history = AppUtilsCore.get_foursight_history
+    get_foursight_history_page = AppUtilsCore.get_foursight_history_page
+    get_foursight_history_recent = staticmethod(AppUtilsCore.get_foursight_history_recent)
+    queue_scheduled_checks = AppUtilsCore.queue_scheduled_checks
+    queue_action = AppUtilsCore.queue_action
+    run_check_runner = AppUtilsCore.run_check_runner
+
+    def __init__(self, connection: FSConnection, check_setup: dict) -> None:
+        self.prefix = BENCHMARK_PREFIX
+        self.connection = connection
+        self.environment = BenchmarkEnvironment()
+        self.check_handler = create_check_handler(check_setup)
+        self.sqs = SQS(self.prefix)
+        self.stage = Stage(self.prefix)
+
+    def init_connection(self, environ: str, _environments: Optional[dict] = None) -> FSConnection:
+        return self.connection
+
+    @staticmethod
+    def get_env_schedule(check_schedule: dict, environ: str) -> list:
+        return check_schedule.get(environ) or []
+
+
+def create_check_handler(check_setup: dict) -> CheckHandler:
+    # Like CheckHandler.__init__ but without reading the check_setup file and
+    # validating it against the (real) environments and defined checks.
+    check_handler = CheckHandler.__new__(CheckHandler)
+    check_handler.prefix = BENCHMARK_PREFIX
+    check_handler.check_package_name = "benchmarks"
+    check_handler.decorators = Decorators(BENCHMARK_PREFIX)
+    check_handler.CheckResult = check_handler.decorators.CheckResult
+    check_handler.ActionResult = check_handler.decorators.ActionResult
+    check_handler.CHECK_DECO = check_handler.decorators.CHECK_DECO
+    check_handler.ACTION_DECO = check_handler.decorators.ACTION_DECO
+    check_handler.environment = BenchmarkEnvironment()
+    check_handler.CHECK_SETUP = check_setup
+    check_handler.CHECK_SORT_TITLES = CheckHandler.build_check_sort_titles(check_setup)
+    check_handler.CHECK_DISPLAY_INDEX = CheckHandler.build_check_display_index(check_setup)
+    return check_handler
+
+
+def create_connection(use_es: bool) -> FSConnection:
+    # Like FSConnection.__init__ (with test=True) but without needing a real environment configuration.
+    connection = FSConnection.__new__(FSConnection)
+    connection.fs_env = BENCHMARK_ENV
+    connection.connections = {
+        "s3": S3Connection(BENCHMARK_BUCKET),
+        "es": ESConnection(index=BENCHMARK_BUCKET, host="https://benchmark-es.localhost") if use_es else None
+    }
+    connection.ff_server = connection.ff_env = connection.ff_es = None
+    connection.ff_bucket = BENCHMARK_BUCKET
+    connection.ff_s3 = connection.ff_keys = None
+    connection.redis = connection.redis_url = None
+    return connection
+
+
+def create_react_api(check_setup: dict) -> ReactApi:
+    react_api = ReactApi.__new__(ReactApi)
+    react_api._checks = BenchmarkChecks(check_setup)
+    return react_api
+
+
+def measure(fakes: FakeAws, function: Callable, setup: Optional[Callable], iterations: int) -> dict:
+    """
+    Runs the given function the given number of times, each preceded by the given (untimed) setup,
+    if any, and returns the min/median/mean time in milliseconds, and the (fake) AWS/ES calls, per run.
+    The setup should only store data directly into the fakes, so that none of its calls are counted.
+    """
+    durations = []
+    fakes.reset_calls()
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "mean_ms": round(statistics.mean(durations), 3),
+        "calls": {operation: round(count / iterations, 2) for operation, count in sorted(fakes.calls.items())}
+    }
+
+
+def benchmark_backend(backend: str, nchecks: int, nresults: int, output_size: int,
+                      iterations: int, latency: float, only: Optional[List[str]] = None) -> dict:
+    use_es = backend == "es"
+    check_names = get_check_names(nchecks)
+    check_setup = create_check_setup(check_names, output_size)
+    now = datetime.datetime.utcnow()
+    results = {}
+    with fake_aws(latency=latency) as fakes:
+        connection = create_connection(use_es)
+        for check_name in check_names:
+            populate_results(fakes, use_es, check_name, nresults, output_size, now)
+        core = BenchmarkCore(connection, check_setup)
+        react_api = create_react_api(check_setup)
+        queue = core.sqs.get_sqs_queue()
+        runner_input = {"sqs_url": queue.url}
+        check_result = core.check_handler.CheckResult(connection, BENCHMARK_CHECK)
+        history_args = {"limit": "25", "sort": "timestamp.desc"}
+
+        def store_result() -> None:
+            check = core.check_handler.CheckResult(connection, BENCHMARK_STORE_CHECK)
+            check.status = "PASS"
+            check.full_output = create_benchmark_output(output_size)
+            check.kwargs = {"primary": True}
+            check.store_result()
+
+        def setup_delete_results() -> None:
+            populate_results(fakes, use_es, BENCHMARK_DELETE_CHECK, nresults, output_size, now)
+
+        def setup_run_check_runner() -> None:
+            queue.purge()
+            queue.messages.append(json.dumps([BENCHMARK_ENV, datetime.datetime.utcnow().strftime(UUID_FORMAT),
+                                              f"benchmark_checks/{BENCHMARK_CHECK}",
+                                              {"primary": False, "output_size": output_size}, []]))
+
+        def react_route(route: Callable, *args) -> Callable:
+            return lambda: route(react_api, {}, BENCHMARK_ENV, *args).to_dict()
+
+        # The benchmarks which write (i.e. which change the benchmarked data) are last.
+        benchmarks = [
+            ("get_check_results", lambda: core.check_handler.get_check_results(connection, checks=check_names)),
+            ("get_result_history", lambda: check_result.get_result_history(0, 25, "timestamp.desc")),
+            ("get_result_history_page", lambda: check_result.get_result_history_page(25, "timestamp.desc", None)),
+            ("get_closest_result", lambda: check_result.get_closest_result(diff_hours=nresults // 2)),
+            ("react_checks_history", react_route(ReactApi.reactapi_checks_history, BENCHMARK_CHECK, history_args)),
+            ("react_checks_history_cursor", react_route(ReactApi.reactapi_checks_history, BENCHMARK_CHECK,
+                                                        {**history_args, "cursor": ""})),
+            ("react_checks_history_recent", react_route(ReactApi.reactapi_checks_history_recent, {"limit": "25"})),
+            ("react_checks_status", react_route(ReactApi.reactapi_checks_status)),
+            ("queue_scheduled_checks", lambda: core.queue_scheduled_checks(BENCHMARK_ENV, BENCHMARK_SCHEDULE),
+             queue.purge),
+            ("store_result", store_result),
+            ("run_check_runner", lambda: core.run_check_runner(runner_input), setup_run_check_runner),
+            ("delete_results", lambda: core.check_handler.CheckResult(connection, BENCHMARK_DELETE_CHECK)
+                                           .delete_results(primary=False), setup_delete_results)
+        ]
+        if not use_es:  # the fake ES does not support aggregations
+            benchmarks.insert(8, ("react_checks_analytics", react_route(ReactApi.reactapi_checks_analytics,
+                                                                        BENCHMARK_CHECK, {"days": "30"})))
+        with mock.patch.object(app, "core", core, create=True):  # for the React API routes
+            for name, function, *setup in benchmarks:
+                if not only or name in only:
+                    results[f"{backend}/{name}"] = measure(fakes, function, setup[0] if setup else None, iterations)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Prints a comparison of the given results to the given (previously saved) baseline results, and
+    returns the names of the benchmarks whose median time regressed by more than the given percent.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline ms':>12} {'median ms':>12} {'change':>9}")
+    for name, result in results.items():
+        if not (baseline_result := baseline.get(name)):
+            print(f"{name:<40} {'-':>12} {result['median_ms']:>12.3f} {'-':>9}")
+            continue
+        change = (result["median_ms"] - baseline_result["median_ms"]) * 100 / max(baseline_result["median_ms"], 0.001)
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40} {baseline_result['median_ms']:>12.3f} {result['median_ms']:>12.3f} {change:>8.1f}%"
+              f"{' REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark foursight_core against in-memory fake AWS and ES.")
+    parser.add_argument("--checks", type=int, default=50, help="Number of checks.")
+    parser.add_argument("--results", type=int, default=200, help="Number of results per check.")
+    parser.add_argument("--output-size", type=int, default=1024, help="Size (bytes) of each result output.")
+    parser.add_argument("--backend", nargs="+", choices=["s3", "es"], default=["s3", "es"],
+                        help="Result stores to benchmark: S3 only, or S3 and ES.")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations per measurement.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency (ms) per AWS/ES call.")
+    parser.add_argument("--only", nargs="+", help="Names of the benchmarks to run (default all).")
+    parser.add_argument("--save", help="File to save the results to (JSON).")
+    parser.add_argument("--compare", help="File of previously saved results to compare to.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold (percent) for compare.")
+    args = parser.parse_args()
+
+    # The code being benchmarked logs copiously, e.g. queue_scheduled_checks (warnings), and
+    # record_run_info (errors, when skipping a run record which is already stored, i.e. normally).
+    logging.disable(logging.ERROR)
+    os.environ.setdefault("CHECK_RUNNER", f"{BENCHMARK_PREFIX}-check_runner")
+    parameters = {"checks": max(args.checks, 1), "results": max(args.results, 1), "output_size": args.output_size,
+                  "iterations": max(args.iterations, 1), "latency_ms": args.latency_ms}
+    results = {}
+    print(f"{'benchmark':<40} {'min ms':>10} {'median ms':>10} {'mean ms':>10} {'calls':>7}")
+    for backend in args.backend:
+        with contextlib.redirect_stdout(io.StringIO()):  # the code being benchmarked also prints
+            backend_results = benchmark_backend(backend, parameters["checks"], parameters["results"],
+                                                args.output_size, parameters["iterations"],
+                                                args.latency_ms / 1000, args.only)
+        for name, result in backend_results.items():
+            print(f"{name:<40} {result['min_ms']:>10.3f} {result['median_ms']:>10.3f} {result['mean_ms']:>10.3f}"
+                  f" {sum(result['calls'].values()):>7.1f}")
+        results.update(backend_results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"version": BENCHMARK_RESULTS_VERSION,
+                       "created": datetime.datetime.utcnow().isoformat(),
+                       "python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "parameters": parameters,
+                       "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != parameters:
+            print(f"\nWARNING: Comparing to results with different parameters: {baseline.get('parameters')}")
+        if compare(results, baseline.get("results", {}), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Check used by the benchmarks (see benchmarks/benchmark_foursight.py), e.g. as run by run_check_runner;
+# its full_output is a list of (short) strings totalling (roughly) the given output_size (bytes) when
+# serialized, since check outputs are typically many small items rather than one big value.
+
+from typing import List
+from foursight_core.decorators import Decorators
+
+BENCHMARK_PREFIX = "foursight-benchmark"
+BENCHMARK_CHECK_OUTPUT_SIZE = 1024
+
+deco = Decorators(BENCHMARK_PREFIX)
+CheckResult = deco.CheckResult
+check_function = deco.check_function
+
+
+def create_benchmark_output(output_size: int) -> List[str]:
+    # Each item is 15 bytes when serialized (with its quotes, comma, and space), e.g.: "item-000001",
+    return [f"item-{index:06}" for index in range(max(output_size, 0) // 15)]
+
+
+@check_function(output_size=BENCHMARK_CHECK_OUTPUT_SIZE)
+def benchmark_check(connection, **kwargs):
+    check = CheckResult(connection, "benchmark_check")
+    check.status = "PASS"
+    check.summary = "Benchmark check"
+    check.full_output = create_benchmark_output(kwargs.get("output_size", BENCHMARK_CHECK_OUTPUT_SIZE))
+    return check
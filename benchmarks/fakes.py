@@ -0,0 +1,491 @@
+# In-memory stand-ins for the AWS services (S3, SQS, Lambda, CloudWatch) and Elasticsearch used by
+# foursight_core, for running the benchmarks offline. These implement only the subset of the boto3
+# client/resource and Elasticsearch client APIs which foursight_core actually uses, and count each
+# call by operation, optionally delaying each by a fixed (simulated network) latency, so that the
+# number of round trips, and not just our own CPU time, is reflected in the benchmark results.
+# Usage: with fake_aws(latency=0.005) as fakes: ... (see benchmark_foursight.py).
+
+from collections import Counter
+from contextlib import contextmanager
+import io
+import json
+import re
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+from unittest import mock
+from elasticsearch import NotFoundError
+from foursight_core import boto_client as boto_client_module
+from foursight_core import es_connection as es_connection_module
+
+S3_LIST_PAGE_SIZE = 1000
+
+
+class FakeAws:
+    """
+    Container for the in-memory state of all the fake services, and for the call counts.
+    """
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self.s3 = {}  # bucket name -> {key: bytes}
+        self.sqs = {}  # queue url -> FakeSqsQueue
+        self.lambda_invocations = []
+        self.es = {}  # index name -> {id: document}
+
+    def call(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def client(self, service: str, **kwargs) -> Any:
+        clients = {"s3": FakeS3Client, "sqs": FakeSqsClient, "lambda": FakeLambdaClient,
+                   "cloudwatch": FakeCloudWatchClient}
+        if service not in clients:
+            raise NotImplementedError(f"No fake boto3 client for AWS service: {service}")
+        return clients[service](self)
+
+    def resource(self, service: str, **kwargs) -> Any:
+        resources = {"s3": FakeS3Resource, "sqs": FakeSqsResource}
+        if service not in resources:
+            raise NotImplementedError(f"No fake boto3 resource for AWS service: {service}")
+        return resources[service](self)
+
+    def create_es_client(self, *args, **kwargs) -> "FakeElasticsearch":
+        return FakeElasticsearch(self)
+
+    def put_s3_object(self, bucket: str, key: str, body: Any) -> None:
+        """
+        Stores the given object directly (i.e. not counted as a call); for setting up benchmark data.
+        """
+        self.s3.setdefault(bucket, {})[key] = _to_bytes(body)
+
+    def put_es_document(self, index: str, id: str, document: dict) -> None:
+        """
+        Stores the given document directly (i.e. not counted as a call); for setting up benchmark data.
+        """
+        self.es.setdefault(index, {})[id] = document
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+
+@contextmanager
+def fake_aws(latency: float = 0.0) -> Iterator[FakeAws]:
+    """
+    Context manager within which all boto3 clients/resources created via foursight_core.boto_client
+    (which is all of those used by the benchmarked code), and all Elasticsearch clients created by
+    ESConnection, are the in-memory fakes, sharing the state of the yielded FakeAws object.
+    """
+    fakes = FakeAws(latency)
+    fake_boto3 = mock.Mock(client=fakes.client, resource=fakes.resource)
+    boto_client_module.boto_client_cache_clear()
+    try:
+        with mock.patch.object(boto_client_module, "boto3", fake_boto3), \
+             mock.patch.object(es_connection_module.es_utils, "create_es_client", fakes.create_es_client):
+            yield fakes
+    finally:
+        boto_client_module.boto_client_cache_clear()
+
+
+def _to_bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return json.dumps(value).encode("utf-8")
+
+
+class FakeS3Client:
+
+    class exceptions:  # noqa: named like boto3
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def _bucket(self, bucket: str) -> dict:
+        if bucket not in self._fakes.s3:
+            raise Exception(f"NoSuchBucket: {bucket}")
+        return self._fakes.s3[bucket]
+
+    def head_bucket(self, Bucket: str) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.head_bucket")
+        self._bucket(Bucket)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def create_bucket(self, Bucket: str, **kwargs) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.create_bucket")
+        self._fakes.s3.setdefault(Bucket, {})
+        return {"Location": f"/{Bucket}"}
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.put_object")
+        self._bucket(Bucket)[Key] = _to_bytes(Body)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.get_object")
+        body = self._bucket(Bucket).get(Key)
+        if body is None:
+            raise self.exceptions.NoSuchKey(f"NoSuchKey: {Key}")
+        return {"Body": io.BytesIO(body), "ContentLength": len(body)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.head_object")
+        body = self._bucket(Bucket).get(Key)
+        if body is None:
+            raise Exception(f"Not Found: {Key}")
+        return {"ContentLength": len(body)}
+
+    def delete_objects(self, Bucket: str, Delete: dict, **kwargs) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("s3.delete_objects")
+        bucket = self._bucket(Bucket)
+        deleted = []
+        for item in Delete.get("Objects", []):
+            bucket.pop(item["Key"], None)
+            deleted.append({"Key": item["Key"]})
+        return {"Deleted": deleted}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = S3_LIST_PAGE_SIZE,  # noqa: boto3 names
+                        ContinuationToken: Optional[str] = None, StartAfter: Optional[str] = None,
+                        **kwargs) -> dict:
+        self._fakes.call("s3.list_objects_v2")
+        after = ContinuationToken or StartAfter or ""
+        keys = sorted(key for key in self._bucket(Bucket) if key.startswith(Prefix) and key > after)
+        page = keys[:min(MaxKeys, S3_LIST_PAGE_SIZE)]
+        response = {"KeyCount": len(page), "IsTruncated": len(keys) > len(page),
+                    "Contents": [{"Key": key, "Size": len(self._fakes.s3[Bucket][key])} for key in page]}
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+
+class FakeS3Resource:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def Bucket(self, name: str) -> "FakeS3Bucket":  # noqa: boto3 method name
+        return FakeS3Bucket(self._fakes, name)
+
+
+class FakeS3Bucket:
+
+    def __init__(self, fakes: FakeAws, name: str) -> None:
+        self.name = name
+        self.objects = FakeS3BucketObjects(fakes, name)
+
+
+class FakeS3BucketObjects:
+
+    class Object:
+        def __init__(self, key: str) -> None:
+            self.key = key
+
+    def __init__(self, fakes: FakeAws, bucket: str) -> None:
+        self._fakes = fakes
+        self._bucket = bucket
+
+    def all(self) -> Iterator["FakeS3BucketObjects.Object"]:
+        return self.filter(Prefix="")
+
+    def filter(self, Prefix: str = "") -> Iterator["FakeS3BucketObjects.Object"]:  # noqa: boto3 argument name
+        # Like boto3, listed in key order, a page (one call) of S3_LIST_PAGE_SIZE keys at a time.
+        keys = sorted(key for key in self._fakes.s3.get(self._bucket, {}) if key.startswith(Prefix))
+        for index, key in enumerate(keys):
+            if index % S3_LIST_PAGE_SIZE == 0:
+                self._fakes.call("s3.list_objects")
+            yield self.Object(key)
+        if not keys:
+            self._fakes.call("s3.list_objects")
+
+
+class FakeSqsQueue:
+
+    def __init__(self, fakes: FakeAws, name: str) -> None:
+        self._fakes = fakes
+        self.name = name
+        self.url = f"https://sqs.us-east-1.amazonaws.com/000000000000/{name}"
+        self.messages = []  # visible messages
+        self.in_flight = {}  # receipt handle -> message
+        self._receipts = 0
+        self._lock = threading.Lock()
+
+    def send_message(self, MessageBody: str, **kwargs) -> dict:  # noqa: boto3 argument name
+        self._fakes.call("sqs.send_message")
+        with self._lock:
+            self.messages.append(MessageBody)
+        return {"MessageId": str(len(self.messages))}
+
+    def receive(self) -> Optional[dict]:
+        with self._lock:
+            if not self.messages:
+                return None
+            self._receipts += 1
+            receipt = f"receipt-{self._receipts}"
+            self.in_flight[receipt] = self.messages.pop(0)
+            return {"Body": self.in_flight[receipt], "ReceiptHandle": receipt}
+
+    def purge(self) -> None:
+        with self._lock:
+            self.messages.clear()
+            self.in_flight.clear()
+
+
+class FakeSqsResource:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def get_queue_by_name(self, QueueName: str) -> FakeSqsQueue:  # noqa: boto3 argument name
+        self._fakes.call("sqs.get_queue_url")
+        queue = next((queue for queue in self._fakes.sqs.values() if queue.name == QueueName), None)
+        if not queue:
+            raise Exception(f"AWS.SimpleQueueService.NonExistentQueue: {QueueName}")
+        return queue
+
+    def create_queue(self, QueueName: str, **kwargs) -> FakeSqsQueue:  # noqa: boto3 argument name
+        self._fakes.call("sqs.create_queue")
+        queue = FakeSqsQueue(self._fakes, QueueName)
+        return self._fakes.sqs.setdefault(queue.url, queue)
+
+
+class FakeSqsClient:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def receive_message(self, QueueUrl: str, **kwargs) -> dict:  # noqa: boto3 argument name
+        # Returns immediately, i.e. never waits (long polls) for messages.
+        self._fakes.call("sqs.receive_message")
+        message = self._fakes.sqs[QueueUrl].receive()
+        return {"Messages": [message]} if message else {}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str) -> dict:  # noqa: boto3 argument names
+        self._fakes.call("sqs.delete_message")
+        self._fakes.sqs[QueueUrl].in_flight.pop(ReceiptHandle, None)
+        return {}
+
+    def change_message_visibility(self, QueueUrl: str, ReceiptHandle: str, **kwargs) -> dict:  # noqa: boto3 names
+        self._fakes.call("sqs.change_message_visibility")
+        queue = self._fakes.sqs[QueueUrl]
+        if (message := queue.in_flight.pop(ReceiptHandle, None)) is not None:
+            queue.messages.append(message)
+        return {}
+
+    def get_queue_attributes(self, QueueUrl: str, **kwargs) -> dict:  # noqa: boto3 argument name
+        self._fakes.call("sqs.get_queue_attributes")
+        queue = self._fakes.sqs[QueueUrl]
+        return {"Attributes": {"ApproximateNumberOfMessages": str(len(queue.messages)),
+                               "ApproximateNumberOfMessagesNotVisible": str(len(queue.in_flight))}}
+
+
+class FakeLambdaClient:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def invoke(self, FunctionName: str, Payload: str = None, **kwargs) -> dict:  # noqa: boto3 argument names
+        # Only records the invocation; the benchmarks run the check runner directly.
+        self._fakes.call("lambda.invoke")
+        self._fakes.lambda_invocations.append((FunctionName, Payload))
+        return {"StatusCode": 202}
+
+
+class FakeCloudWatchClient:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def get_metric_statistics(self, **kwargs) -> dict:
+        self._fakes.call("cloudwatch.get_metric_statistics")
+        return {"Datapoints": []}
+
+
+class FakeElasticsearchIndices:
+
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+
+    def exists(self, index: str, **kwargs) -> bool:
+        self._fakes.call("es.indices.exists")
+        return index in self._fakes.es
+
+    def create(self, index: str, **kwargs) -> dict:
+        self._fakes.call("es.indices.create")
+        self._fakes.es.setdefault(index, {})
+        return {"acknowledged": True}
+
+    def delete(self, index: str, **kwargs) -> dict:
+        self._fakes.call("es.indices.delete")
+        self._fakes.es.pop(index, None)
+        return {"acknowledged": True}
+
+    def refresh(self, index: str, **kwargs) -> dict:
+        self._fakes.call("es.indices.refresh")
+        return {}
+
+
+class FakeElasticsearch:
+    """
+    Fake Elasticsearch client; its search supports just the query clauses, sorting,
+    and paging (from/size/search_after) which ESConnection uses, but not aggregations.
+    """
+    def __init__(self, fakes: FakeAws) -> None:
+        self._fakes = fakes
+        self.indices = FakeElasticsearchIndices(fakes)
+
+    def ping(self, **kwargs) -> bool:
+        self._fakes.call("es.ping")
+        return True
+
+    def index(self, index: str, id: str, body: Any, **kwargs) -> dict:
+        self._fakes.call("es.index")
+        documents = self._fakes.es.setdefault(index, {})
+        result = "updated" if id in documents else "created"
+        documents[id] = json.loads(body) if isinstance(body, (str, bytes)) else body
+        return {"_id": id, "result": result}
+
+    def get(self, index: str, id: str, **kwargs) -> dict:
+        self._fakes.call("es.get")
+        document = self._fakes.es.get(index, {}).get(id)
+        if document is None:
+            raise NotFoundError(404, "not_found", {"_id": id, "found": False})
+        return {"_id": id, "found": True, "_source": document}
+
+    def mget(self, index: str, body: dict, **kwargs) -> dict:
+        self._fakes.call("es.mget")
+        documents = self._fakes.es.get(index, {})
+        return {"docs": [{"_id": id, "found": id in documents, "_source": documents.get(id)}
+                         for id in body.get("ids", [])]}
+
+    def count(self, index: str, **kwargs) -> dict:
+        self._fakes.call("es.count")
+        return {"count": len(self._fakes.es.get(index, {}))}
+
+    def delete_by_query(self, index: str, body: dict, **kwargs) -> dict:
+        self._fakes.call("es.delete_by_query")
+        documents = self._fakes.es.get(index, {})
+        ids = [id for id, document in list(documents.items()) if _es_matches(id, document, body.get("query"))]
+        for id in ids:
+            del documents[id]
+        return {"deleted": len(ids)}
+
+    def search(self, index: str, body: Optional[dict] = None, **params) -> dict:
+        self._fakes.call("es.search")
+        body = {**(body or {}), **params}
+        if body.get("aggs") or body.get("aggregations"):
+            raise NotImplementedError("Aggregations are not supported by FakeElasticsearch.")
+        # Note that elasticsearch_dsl passes the index as a list.
+        index = index[0] if isinstance(index, (list, tuple)) else index
+        documents = self._fakes.es.get(index, {})
+        hits = [(id, document) for id, document in documents.items() if _es_matches(id, document, body.get("query"))]
+        sort = _es_sort_spec(body.get("sort"))
+        hits = [(id, document, [_es_field(id, document, field) for field, _ in sort]) for id, document in hits]
+        for position in reversed(range(len(sort))):
+            hits.sort(key=lambda hit: _es_sort_value(hit[2][position]), reverse=sort[position][1] == "desc")
+        if search_after := body.get("search_after"):
+            hits = [hit for hit in hits if _es_is_after(hit[2], search_after, sort)]
+        start = body.get("from", body.get("from_", 0))
+        page = hits[start:start + body.get("size", 10)]
+        source_fields = body.get("_source")
+        return {
+            "took": 1,
+            "timed_out": False,
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "max_score": None,
+                "hits": [{
+                    "_index": index,
+                    "_id": id,
+                    "_score": None,
+                    "_source": ({field: document.get(field) for field in source_fields}
+                                if isinstance(source_fields, list) else document),
+                    "sort": sort_values
+                } for id, document, sort_values in page]
+            }
+        }
+
+
+def _es_sort_spec(sort: Any) -> List[tuple]:
+    if not sort:
+        return []
+    spec = []
+    for item in (sort if isinstance(sort, list) else [sort]):
+        for field, order in (item.items() if isinstance(item, dict) else [(item, "asc")]):
+            spec.append((field, order.get("order", "asc") if isinstance(order, dict) else order))
+    return spec
+
+
+def _es_sort_value(value: Any) -> tuple:
+    return (value is not None, value if value is not None else "")
+
+
+def _es_is_after(values: list, search_after: list, sort: List[tuple]) -> bool:
+    for value, after, (_, order) in zip(values, search_after, sort):
+        if value != after:
+            return _es_sort_value(value) > _es_sort_value(after) if order == "asc" else \
+                   _es_sort_value(value) < _es_sort_value(after)
+    return False
+
+
+def _es_field(id: str, document: dict, field: str) -> Any:
+    if field == "_id":
+        return id
+    if field.endswith(".keyword"):
+        field = field[:-len(".keyword")]
+    value = document
+    for name in field.split("."):
+        value = value.get(name) if isinstance(value, dict) else None
+    return value
+
+
+def _es_clauses(clauses: Any) -> list:
+    return clauses if isinstance(clauses, list) else ([clauses] if clauses else [])
+
+
+def _es_matches(id: str, document: dict, query: Optional[dict]) -> bool:
+    if not query:
+        return True
+    for kind, clause in query.items():
+        if kind == "match_all":
+            continue
+        elif kind == "bool":
+            if not all(_es_matches(id, document, item) for item in _es_clauses(clause.get("must"))):
+                return False
+            if not all(_es_matches(id, document, item) for item in _es_clauses(clause.get("filter"))):
+                return False
+            if any(_es_matches(id, document, item) for item in _es_clauses(clause.get("must_not"))):
+                return False
+        elif kind in ("term", "match"):
+            for field, value in clause.items():
+                value = value.get("value", value.get("query")) if isinstance(value, dict) else value
+                if _es_field(id, document, field) != value:
+                    return False
+        elif kind == "terms":
+            for field, values in clause.items():
+                if _es_field(id, document, field) not in values:
+                    return False
+        elif kind == "range":
+            for field, bounds in clause.items():
+                value = _es_field(id, document, field)
+                if value is None:
+                    return False
+                if ("gte" in bounds and value < bounds["gte"]) or ("gt" in bounds and value <= bounds["gt"]) or \
+                   ("lte" in bounds and value > bounds["lte"]) or ("lt" in bounds and value >= bounds["lt"]):
+                    return False
+        elif kind == "query_string":
+            # Only supports the form: field:"value" or field:"*suffix"
+            if not (match := re.fullmatch(r'([\w.]+):"(\*?)([^"*]*)"', clause["query"].strip())):
+                raise NotImplementedError(f"Unsupported query_string for FakeElasticsearch: {clause['query']}")
+            value = str(_es_field(id, document, match.group(1)) or "")
+            if not (value.endswith(match.group(3)) if match.group(2) else value == match.group(3)):
+                return False
+        else:
+            raise NotImplementedError(f"Unsupported query clause for FakeElasticsearch: {kind}")
+    return True
@@ -23,6 +23,15 @@ class AbstractConnection(object):
         """
         raise NotImplementedError
 
+    def get_objects(self, keys):
+        """
+        Generic bulk get operation. Keys is a list of filenames, returns a list
+        of the data objects stored on this connection, in the same order, with
+        None for any not found.
+        """
+        ignored(keys)
+        raise NotImplementedError
+
     def get_size(self):
         """
         Returns the number of items stored on this connection
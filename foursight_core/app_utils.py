@@ -1,9 +1,11 @@
 import ast
 import boto3
 from chalice import Response
+import concurrent.futures
 import copy
 import datetime
 from dateutil import tz
+import heapq
 from http.cookies import SimpleCookie
 import inspect
 from itertools import chain
@@ -18,10 +20,11 @@ import platform
 import pytz
 import requests
 import socket
-import sys
+import tempfile
 import time
 import types
 from typing import Optional
+import warnings
 from dcicutils.env_utils import (
     EnvUtils,
     full_env_name,
@@ -38,22 +41,28 @@ from dcicutils.lang_utils import disjoined_list
 from dcicutils.misc_utils import get_error_message, ignored
 from dcicutils.obfuscation_utils import obfuscate_dict
 from dcicutils.secrets_utils import (get_identity_name, get_identity_secrets)
+from dcicutils.task_utils import pmap
 from dcicutils.redis_tools import RedisSessionToken, RedisException, SESSION_TOKEN_COOKIE
 from .app import app
+from .boto_client import boto_client
 from .boto_sqs import boto_sqs_client
 from .check_utils import CheckHandler
 from .deploy import Deploy
 from .environment import Environment
 from .fs_connection import FSConnection
+from .json_utils import json_size, json_truncate
 from .s3_connection import S3Connection
 from .react.api.auth import Auth
+from .react.api.checks import Checks
 from .react.api.jwt_utils import jwt_decode
+from .react.api.misc_utils import run_functions_concurrently_with_timeout
 from .react.api.react_api import ReactApi
 from .react.api.datetime_utils import (
     convert_time_t_to_utc_datetime_string,
     convert_datetime_to_utc_datetime_string
 )
 from .routes import Routes
+from .run_result import RunResult
 from .route_prefixes import CHALICE_LOCAL
 from .sqs_utils import SQS
 from .stage import Stage
@@ -113,6 +122,11 @@ class AppUtilsCore(ReactApi, Routes):
     # Stuff below can be used directly by inherited classes
     TRIM_ERR_OUTPUT = 'Output too large to provide on main page - see check result directly'
     LAMBDA_MAX_BODY_SIZE = 5500000  # 6Mb is the "real" threshold
+    VIEW_FOURSIGHT_MAX_WORKERS = 8  # max number of environments loaded concurrently on the main page
+    VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS = 20  # time budget for loading each environment on the main page
+    VIEW_HEADER_CACHE_TTL_SECONDS = 300  # how long the (static) header values of the HTML views are cached
+    VIEW_QUEUE_INFO_CACHE_TTL_SECONDS = 10  # how long the check queue info of the HTML views is cached
+    JINJA_BYTECODE_CACHE_DIRECTORY = os.path.join(tempfile.gettempdir(), 'foursight-jinja-cache')
 
     def __init__(self):
         # Tuck a reference to this (singleton) instance into
@@ -133,7 +147,11 @@ class AppUtilsCore(ReactApi, Routes):
             #       as of that version (maybe even before but it's less clear where that line is). -kmp 23-Feb-2023
             #       For details, see https://jinja.palletsprojects.com/en/3.1.x/changes/
             #       and https://github.com/pallets/jinja/issues/1203
-            autoescape=jinja2.select_autoescape(['html', 'xml'])
+            autoescape=jinja2.select_autoescape(['html', 'xml']),
+            # Compiled templates are cached in memory (by the Environment) and their bytecode on disk
+            # (for new instances/containers); templates only need checking for changes when running locally.
+            bytecode_cache=self._create_jinja_bytecode_cache(),
+            auto_reload=CHALICE_LOCAL
         )
         self.auth0_domain = None
         self.auth0_client_id = None
@@ -160,6 +178,15 @@ class AppUtilsCore(ReactApi, Routes):
         """Set timeout as environment variable. Decorator instances will pick up this value"""
         os.environ['CHECK_TIMEOUT'] = str(timeout)
 
+    @classmethod
+    def _create_jinja_bytecode_cache(cls) -> Optional[jinja2.BytecodeCache]:
+        try:
+            os.makedirs(cls.JINJA_BYTECODE_CACHE_DIRECTORY, exist_ok=True)
+            return jinja2.FileSystemBytecodeCache(cls.JINJA_BYTECODE_CACHE_DIRECTORY)
+        except Exception as e:
+            logger.warning(f"Unable to create jinja bytecode cache: {get_error_message(e)}")
+            return None
+
     @classmethod
     def get_template_path(cls):
         template_dir = dirname(__file__)
@@ -583,7 +610,12 @@ class AppUtilsCore(ReactApi, Routes):
         Does any final processing of a Foursight response before returning it. Right now, this includes:
         * Changing the response body if it is greater than 5.5 MB (Lambda body max is 6 MB)
         """
-        if cls.get_size(response.body) > cls.LAMBDA_MAX_BODY_SIZE:  # should be much faster than json.dumps
+        if isinstance(response.body, str):
+            body_size = len(response.body.encode('utf-8'))
+        else:
+            # streams the JSON encoding of the body, stopping as soon as the maximum size is exceeded
+            body_size = json_size(response.body, cls.LAMBDA_MAX_BODY_SIZE)
+        if body_size > cls.LAMBDA_MAX_BODY_SIZE:
             response.body = 'Body size exceeded 6 MB maximum.'
             response.status_code = 413
         return response
@@ -611,51 +643,35 @@ class AppUtilsCore(ReactApi, Routes):
 
     @classmethod
     def get_size(cls, obj, seen=None):
-        """ Recursively finds size of objects
-            Taken directly from: https://goshippo.com/blog/measure-real-size-any-python-object/
-        """
-        size = sys.getsizeof(obj)
-        if seen is None:
-            seen = set()
-        obj_id = id(obj)
-        if obj_id in seen:
-            return 0
-        # Important mark as seen *before* entering recursion to gracefully handle
-        # self-referential objects
-        seen.add(obj_id)
-        if isinstance(obj, dict):
-            size += sum([cls.get_size(v, seen) for v in obj.values()])
-            size += sum([cls.get_size(k, seen) for k in obj.keys()])
-        elif hasattr(obj, '__dict__'):
-            size += cls.get_size(obj.__dict__, seen)
-        elif hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes, bytearray)):
-            size += sum([cls.get_size(i, seen) for i in obj])
-        return size
+        """
+        Deprecated: use json_utils.json_size, which this now simply calls, i.e. this returns the size
+        in bytes of the JSON encoding of the given object, rather than its (recursive) in-memory size.
+        """
+        ignored(seen)
+        warnings.warn("AppUtilsCore.get_size is deprecated; use foursight_core.json_utils.json_size",
+                      DeprecationWarning, stacklevel=2)
+        return json_size(obj)
 
     @classmethod
     def trim_output(cls, output, max_size=100000):
-        """ Uses the helper above with sys.getsizeof to determine the output size and remove it if it is too large.
-            Instead of encoding as JSON as that is very slow.
-
-        Old docstring below:
-
+        """
         AWS lambda has a maximum body response size of 6MB. Since results are currently delivered entirely
         in the body of the response, let's limit the size of the 'full_output', 'brief_output', and
         'admin_output' fields to 100 KB (see if this is a reasonable amount).
-        Slice the dictionaries, lists, or string to achieve this.
-        max_size input integer is in bites
+        max_size input integer is in bytes (of the JSON encoding of the output).
+
+        If the output is too large it is truncated (see json_utils.json_truncate), i.e. the first items of
+        lists and dictionaries and the start of strings are kept, with a marker noting what was elided;
+        so it is still valid JSON, and a partial view of a large output is shown rather than nothing.
+        The size is determined by streaming the JSON encoding, stopping as soon as max_size is exceeded.
 
         Takes in the non-json formatted version of the fields. For now, just use this for /view/.
         """
-        # formatted = json.dumps(output, indent=4)
-        # if len(formatted) > max_size:
-        #     return ''.join([formatted[:max_size], '\n\n... Output truncated ...'])
-        # else:
-        #     return formatted
-        size = cls.get_size(output)
-        if size > max_size:
+        try:
+            return json_truncate(output, max_size)
+        except Exception as e:
+            logger.warning(f"Unable to trim check output: {get_error_message(e)}")
             return cls.TRIM_ERR_OUTPUT
-        return output
 
     def sort_dictionary_by_case_insensitive_keys(self, dictionary: dict) -> dict:
         """
@@ -749,7 +765,7 @@ class AppUtilsCore(ReactApi, Routes):
             if not lambda_name:
                 return False
         try:
-            boto_lambda = boto3.client("lambda")
+            boto_lambda = boto_client("lambda")
             lambda_info = boto_lambda.get_function(FunctionName=lambda_name)
             if lambda_info:
                 lambda_arn = lambda_info["Configuration"]["FunctionArn"]
@@ -769,6 +785,8 @@ class AppUtilsCore(ReactApi, Routes):
                 logger.warning(f"Reloading lambda: {lambda_name}")
                 boto_lambda.update_function_configuration(FunctionName=lambda_name, Description=lambda_description)
                 logger.warning(f"Reloaded lambda: {lambda_name}")
+                # The (cached) lambdas info includes the lambda description and modified time.
+                Checks.invalidate_annotated_lambdas()
                 return True
         except Exception as e:
             logger.warning(f"Error reloading lambda ({lambda_name}): {e}")
@@ -785,7 +803,7 @@ class AppUtilsCore(ReactApi, Routes):
             if not lambda_name:
                 return None
         try:
-            boto_lambda = boto3.client("lambda")
+            boto_lambda = boto_client("lambda")
             lambda_info = boto_lambda.get_function(FunctionName=lambda_name)
             if lambda_info:
                 lambda_arn = lambda_info["Configuration"]["FunctionArn"]
@@ -865,6 +883,31 @@ class AppUtilsCore(ReactApi, Routes):
         return Response(status_code=302, body=json.dumps(resp_headers),
                         headers=resp_headers)
 
+    @function_cache(ttl=datetime.timedelta(seconds=VIEW_HEADER_CACHE_TTL_SECONDS))
+    def get_view_header_info(self) -> dict:
+        """
+        Returns the values for the header (and environment menu) of the HTML views, which rarely
+        change, and so which are cached (for VIEW_HEADER_CACHE_TTL_SECONDS) rather than getting
+        them from AWS on every page load; the returned dictionary is passed to template.render.
+        """
+        return {
+            "lambda_deployed_time": self.get_lambda_last_modified(),
+            "aws_account_number": self.get_aws_account_number(),
+            "environments": self.get_unique_annotated_environment_names()
+        }
+
+    @function_cache(ttl=datetime.timedelta(seconds=VIEW_QUEUE_INFO_CACHE_TTL_SECONDS))
+    def get_view_queue_info(self) -> dict:
+        """
+        Returns the number of running and queued checks (SQS queue attributes) for the HTML views;
+        cached briefly (for VIEW_QUEUE_INFO_CACHE_TTL_SECONDS) to absorb bursts of page loads.
+        """
+        queue_attr = self.sqs.get_sqs_attributes(self.sqs.get_sqs_queue().url)
+        return {
+            "running_checks": queue_attr.get('ApproximateNumberOfMessagesNotVisible'),
+            "queued_checks": queue_attr.get('ApproximateNumberOfMessages')
+        }
+
     def get_unique_annotated_environment_names(self):
         unique_environment_names = self.environment.list_unique_environment_names()
         unique_annotated_environment_names = [
@@ -881,7 +924,8 @@ class AppUtilsCore(ReactApi, Routes):
         """
         View a template of all checks from the given environment(s).
         Environ may be 'all' or a specific FS environments separated by commas.
-        With 'all', this function can be somewhat slow.
+        With 'all' (or multiple environments), these are loaded concurrently;
+        see get_view_environments.
         Domain is the current FS domain, needed for Auth0 redirect.
         Context is the current context, usually "/api/" or "/"
         Returns a response with html content.
@@ -894,43 +938,25 @@ class AppUtilsCore(ReactApi, Routes):
         total_envs = []
         servers = []
         view_envs = environments.keys() if environ == 'all' else [e.strip() for e in environ.split(',')]
-        for this_environ in view_envs:
-            try:
-                if not is_admin:  # no view permissions for non-admins on CGAP
-                    continue
-                connection = self.init_connection(this_environ, _environments=environments)
-            except Exception:
-                connection = None
-            if connection:
-                servers.append(connection.ff_server)
-                grouped_results = self.check_handler.get_grouped_check_results(connection)
-                for group in grouped_results:
-                    for title, result in group.items():
-                        if title == '_name':
-                            continue
-                        elif title == '_statuses':
-                            # convert counts to strings for jinja
-                            for stat, val in group[title].items():
-                                group[title][stat] = str(val)
-                            continue
-                        else:
-                            group[title] = self.process_view_result(connection, result, is_admin)
-                total_envs.append({
-                    'status': 'success',
-                    'environment': this_environ,
-                    'groups': grouped_results
-                })
+        if is_admin:  # no view permissions for non-admins on CGAP
+            for view_env in self.get_view_environments(view_envs, environments, is_admin):
+                if view_env:
+                    server = view_env.pop('server')
+                    if server:
+                        servers.append(server)
+                    total_envs.append(view_env)
         # prioritize these environments
         env_order = ['data', 'staging', 'webdev', 'hotseat', 'cgap', 'cgap-mastertest']
         total_envs = sorted(total_envs,
                             key=lambda v: env_order.index(v['environment']) if v['environment'] in env_order else 9999)
         template = self.jin_env.get_template('view_groups.html')
         # get queue information
-        queue_attr = self.sqs.get_sqs_attributes(self.sqs.get_sqs_queue().url)
-        running_checks = queue_attr.get('ApproximateNumberOfMessagesNotVisible')
-        queued_checks = queue_attr.get('ApproximateNumberOfMessages')
+        queue_info = self.get_view_queue_info()
+        running_checks = queue_info["running_checks"]
+        queued_checks = queue_info["queued_checks"]
         first_env_favicon = self.get_favicon()
         request_dict = request.to_dict()
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -942,7 +968,7 @@ class AppUtilsCore(ReactApi, Routes):
             stage=self.stage.get_stage(),
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             is_admin=is_admin,
             is_running_locally=self.is_running_locally(request_dict),
             logged_in_as=self.get_logged_in_user_info(environ, request_dict),
@@ -951,10 +977,10 @@ class AppUtilsCore(ReactApi, Routes):
             # user_record_error=self.user_record_error,
             # user_record_error_email=self.user_record_error_email,
             auth0_client_id=self.get_auth0_client_id(environ),
-            aws_account_number=self.get_aws_account_number(),
+            aws_account_number=header_info["aws_account_number"],
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             running_checks=running_checks,
             queued_checks=queued_checks,
             favicon=first_env_favicon,
@@ -964,6 +990,72 @@ class AppUtilsCore(ReactApi, Routes):
         html_resp.status_code = 200
         return self.process_response(html_resp)
 
+    def get_view_environment(self, environ, environments, is_admin=False):
+        """
+        Returns the grouped and processed check results, for the main page, for the given
+        environment, or None if a connection to the environment could not be made.
+        """
+        try:
+            connection = self.init_connection(environ, _environments=environments)
+        except Exception:
+            return None
+        grouped_results = self.check_handler.get_grouped_check_results(connection)
+        # look up the associated actions for all of the checks at once
+        assc_actions = self.get_associated_actions(connection, [result for group in grouped_results
+                                                                for title, result in group.items()
+                                                                if title not in ('_name', '_statuses')])
+        for group in grouped_results:
+            for title, result in group.items():
+                if title == '_name':
+                    continue
+                elif title == '_statuses':
+                    # convert counts to strings for jinja
+                    for stat, val in group[title].items():
+                        group[title][stat] = str(val)
+                    continue
+                else:
+                    group[title] = self.process_view_result(connection, result, is_admin,
+                                                            assc_actions=assc_actions)
+        return {
+            'status': 'success',
+            'environment': environ,
+            'server': connection.ff_server,
+            'groups': grouped_results
+        }
+
+    def get_view_environments(self, view_envs, environments, is_admin=False):
+        """
+        Returns the list of results of get_view_environment for each of the given environments,
+        in the same order, loaded concurrently (at most VIEW_FOURSIGHT_MAX_WORKERS at a time).
+        Each environment is given VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS to load, from when it starts
+        loading; one which takes longer, or which fails, gets an error result, so as not to hold up
+        the whole page; see run_functions_concurrently_with_timeout.
+        """
+        view_envs = list(view_envs)
+        if not view_envs:
+            return []
+
+        def error_view_environment(environ, description):
+            return {'status': 'error', 'environment': environ, 'server': None, 'groups': [],
+                    'description': description}
+
+        view_results = []
+        results = run_functions_concurrently_with_timeout(
+            [lambda view_env=view_env: self.get_view_environment(view_env, environments, is_admin)
+             for view_env in view_envs],
+            timeout=self.VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS, max_workers=self.VIEW_FOURSIGHT_MAX_WORKERS)
+        for view_env, (view_result, exception) in zip(view_envs, results):
+            if isinstance(exception, concurrent.futures.TimeoutError):
+                logger.warning(f"Timed out loading environment {view_env} for main page after"
+                               f" {self.VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS} seconds.")
+                view_results.append(error_view_environment(view_env, 'Timed out loading environment.'))
+            elif exception:
+                logger.warning(f"Error loading environment {view_env} for main page: {exception}")
+                view_results.append(error_view_environment(view_env, get_error_message(exception)))
+            else:
+                view_results.append(view_result)
+        return view_results
+
     def view_reload_lambda(self, request, environ, is_admin=False, domain="", context="/", lambda_name: str = None):
         self.reload_lambda(lambda_name)
         time.sleep(3)
@@ -1027,6 +1119,7 @@ class AppUtilsCore(ReactApi, Routes):
         os_environ = self.sort_dictionary_by_case_insensitive_keys(obfuscate_dict(dict(os.environ)))
         request_dict = request.to_dict()
 
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -1036,7 +1129,7 @@ class AppUtilsCore(ReactApi, Routes):
             env_full=full_env_name(environ),
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             stage=stage_name,
             is_admin=is_admin,
             is_running_locally=self.is_running_locally(request_dict),
@@ -1053,7 +1146,7 @@ class AppUtilsCore(ReactApi, Routes):
             favicon=self.get_favicon(),
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             running_checks='0',
             queued_checks='0',
             environment_names=environment_names,
@@ -1088,6 +1181,7 @@ class AppUtilsCore(ReactApi, Routes):
             except Exception as e:
                 users.append({"email": this_email, "record": {"error": str(e)}})
         template = self.jin_env.get_template('user.html')
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -1097,7 +1191,7 @@ class AppUtilsCore(ReactApi, Routes):
             env_full=full_env_name(environ),
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             stage=stage_name,
             is_admin=is_admin,
             is_running_locally=self.is_running_locally(request_dict),
@@ -1108,13 +1202,13 @@ class AppUtilsCore(ReactApi, Routes):
             # user_record_error_email=self.user_record_error_email,
             users=users,
             auth0_client_id=self.get_auth0_client_id(environ),
-            aws_account_number=self.get_aws_account_number(),
+            aws_account_number=header_info["aws_account_number"],
             portal_url=self.get_portal_url(environ),
             main_title=self.html_main_title,
             favicon=self.get_favicon(),
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             running_checks='0',
             queued_checks='0'
         )
@@ -1154,6 +1248,7 @@ class AppUtilsCore(ReactApi, Routes):
                 "modified": convert_datetime_to_utc_datetime_string(last_modified)})
         users = sorted(users, key=lambda key: key["email_address"])
         template = self.jin_env.get_template('users.html')
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -1163,7 +1258,7 @@ class AppUtilsCore(ReactApi, Routes):
             env_full=full_env_name(environ),
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             stage=stage_name,
             is_admin=is_admin,
             is_running_locally=self.is_running_locally(request_dict),
@@ -1174,13 +1269,13 @@ class AppUtilsCore(ReactApi, Routes):
             # user_record_error_email=self.user_record_error_email,
             users=users,
             auth0_client_id=self.get_auth0_client_id(environ),
-            aws_account_number=self.get_aws_account_number(),
+            aws_account_number=header_info["aws_account_number"],
             portal_url=self.get_portal_url(environ),
             main_title=self.html_main_title,
             favicon=self.get_favicon(),
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             running_checks='0',
             queued_checks='0'
         )
@@ -1221,11 +1316,12 @@ class AppUtilsCore(ReactApi, Routes):
                     'checks': {title: processed_result}
                 })
         template = self.jin_env.get_template('view_checks.html')
-        queue_attr = self.sqs.get_sqs_attributes(self.sqs.get_sqs_queue().url)
-        running_checks = queue_attr.get('ApproximateNumberOfMessagesNotVisible')
-        queued_checks = queue_attr.get('ApproximateNumberOfMessages')
+        queue_info = self.get_view_queue_info()
+        running_checks = queue_info["running_checks"]
+        queued_checks = queue_info["queued_checks"]
         first_env_favicon = self.get_favicon()
         request_dict = request.to_dict()
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -1237,10 +1333,10 @@ class AppUtilsCore(ReactApi, Routes):
             stage=self.stage.get_stage(),
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             is_admin=is_admin,
             is_running_locally=self.is_running_locally(request_dict),
             logged_in_as=self.get_logged_in_user_info(environ, request_dict),
@@ -1249,7 +1345,7 @@ class AppUtilsCore(ReactApi, Routes):
             # user_record_error=self.user_record_error,
             # user_record_error_email=self.user_record_error_email,
             auth0_client_id=self.get_auth0_client_id(environ),
-            aws_account_number=self.get_aws_account_number(),
+            aws_account_number=header_info["aws_account_number"],
             running_checks=running_checks,
             queued_checks=queued_checks,
             favicon=first_env_favicon,
@@ -1270,7 +1366,34 @@ class AppUtilsCore(ReactApi, Routes):
         ts_local = ts_utc.astimezone(tz.gettz('America/New_York'))
         return ''.join([str(ts_local.date()), ' ', str(ts_local.time()), ' ', str(ts_local.tzname())])
 
-    def process_view_result(self, connection, res, is_admin, stringify=True):
+    @staticmethod
+    def get_action_record_key(res):
+        """
+        Returns the key of the action record object for the given check result; the
+        contents of this object (if any) is the key of the action run from the check.
+        """
+        return '/'.join([res['name'], 'action_records', res['uuid']])
+
+    def get_associated_actions(self, connection, results):
+        """
+        Batch lookup of the associated actions for the given check results, for use by
+        process_view_result (via its assc_actions argument). Fetches all of the action
+        records from S3 concurrently, and then all of the associated action results
+        at once (from ES via mget, if available). Returns a dictionary of action record
+        key to a tuple of the associated action key and action result; either may be None.
+        """
+        action_record_keys = [self.get_action_record_key(res) for res in results
+                              if isinstance(res, dict) and res.get('action') and res.get('uuid')]
+        if not action_record_keys:
+            return {}
+        assc_action_keys = [assc_action_key.decode() if isinstance(assc_action_key, bytes) else assc_action_key
+                            for assc_action_key in connection.connections['s3'].get_objects(action_record_keys)]
+        found_assc_action_keys = [assc_action_key for assc_action_key in assc_action_keys if assc_action_key]
+        assc_actions = dict(zip(found_assc_action_keys, connection.get_objects(found_assc_action_keys)))
+        return {action_record_key: (assc_action_key, assc_actions.get(assc_action_key))
+                for action_record_key, assc_action_key in zip(action_record_keys, assc_action_keys)}
+
+    def process_view_result(self, connection, res, is_admin, stringify=True, assc_actions=None):
         """
         Do some processing on the content of one check result (res arg, a dict)
         Processes timestamp string, trims output fields, and adds action info.
@@ -1282,6 +1405,8 @@ class AppUtilsCore(ReactApi, Routes):
         check; also edit the check summary to reflect that action has finished.
         Otherwise, allow runs of the action.
         For now, always show latest action as well.
+        If assc_actions (from get_associated_actions) is given then the associated
+        action for the check is looked up there (if present) rather than fetched.
         """
         # first check to see if res is just a string, meaning
         # the check didn't execute properly
@@ -1320,11 +1445,16 @@ class AppUtilsCore(ReactApi, Routes):
         if res.get('action'):
             action = self.ActionResult(connection, res.get('action'))
             if action:
-                action_record_key = '/'.join([res['name'], 'action_records', res['uuid']])
-                assc_action_key = connection.connections['s3'].get_object(action_record_key)
+                action_record_key = self.get_action_record_key(res)
+                if assc_actions and action_record_key in assc_actions:
+                    assc_action_key, assc_action = assc_actions[action_record_key]
+                else:
+                    assc_action_key = connection.connections['s3'].get_object(action_record_key)
+                    assc_action = None
+                    if assc_action_key:
+                        assc_action_key = assc_action_key.decode()  # in bytes
+                        assc_action = connection.get_object(assc_action_key)
                 if assc_action_key:
-                    assc_action_key = assc_action_key.decode()  # in bytes
-                    assc_action = connection.get_object(assc_action_key)
                     # If assc_action_key is written but assc_action is None, then
                     # it most likely means the action is still running
                     if assc_action is not None:
@@ -1387,11 +1517,12 @@ class AppUtilsCore(ReactApi, Routes):
         template = self.jin_env.get_template('history.html')
         check_title = self.check_handler.get_check_title_from_setup(check)
         page_title = ''.join(['History for ', check_title, ' (', environ, ')'])
-        queue_attr = self.sqs.get_sqs_attributes(self.sqs.get_sqs_queue().url)
-        running_checks = queue_attr.get('ApproximateNumberOfMessagesNotVisible')
-        queued_checks = queue_attr.get('ApproximateNumberOfMessages')
+        queue_info = self.get_view_queue_info()
+        running_checks = queue_info["running_checks"]
+        queued_checks = queue_info["queued_checks"]
         favicon = self.get_favicon()
         request_dict = request.to_dict()
+        header_info = self.get_view_header_info()
         html_resp.body = template.render(
             request=request,
             version=self.get_app_version(),
@@ -1402,7 +1533,7 @@ class AppUtilsCore(ReactApi, Routes):
             check=check,
             load_time=self.get_load_time(),
             init_load_time=self.init_load_time,
-            lambda_deployed_time=self.get_lambda_last_modified(),
+            lambda_deployed_time=header_info["lambda_deployed_time"],
             history=history,
             history_kwargs=history_kwargs,
             res_start=start,
@@ -1418,10 +1549,10 @@ class AppUtilsCore(ReactApi, Routes):
             # user_record_error=self.user_record_error,
             # user_record_error_email=self.user_record_error_email,
             auth0_client_id=self.get_auth0_client_id(environ),
-            aws_account_number=self.get_aws_account_number(),
+            aws_account_number=header_info["aws_account_number"],
             domain=domain,
             context=context,
-            environments=self.get_unique_annotated_environment_names(),
+            environments=header_info["environments"],
             running_checks=running_checks,
             queued_checks=queued_checks,
             favicon=favicon,
@@ -1448,6 +1579,44 @@ class AppUtilsCore(ReactApi, Routes):
         result, total = result_obj.get_result_history(start, limit, sort)
         return result, total
 
+    @staticmethod
+    def get_foursight_history_recent(connection, checks, limit) -> list:
+        """
+        Get the brief form (see get_foursight_history) of the (at most) limit most recent
+        results across all of the given checks (names), most recent first; returned as a list
+        of tuples of check name and result. With ES this is a single search; otherwise, with S3,
+        the (timestamped) result keys of each check are listed concurrently, and only the most
+        recent limit of these (across all checks) are actually fetched (concurrently).
+        """
+        checks = list(checks or [])
+        if not checks or limit < 1:
+            return []
+        if connection.connections['es'] is not None:
+            history = connection.connections['es'].get_recent_results(checks, limit)
+        else:
+            s3 = connection.connections['s3']
+            # Result keys look like: <check-name>/<uuid>.json, where uuid is an ISO timestamp,
+            # so the most recent ones are simply those which sort highest by this uuid.
+            keys = chain.from_iterable(pmap(lambda check: s3.list_all_keys_w_prefix(check, records_only=True), checks))
+            keys = heapq.nlargest(limit, keys, key=lambda key: key[key.rfind('/') + 1:])
+            history = [obj for obj in s3.get_objects(keys) if isinstance(obj, dict)]
+        return [(obj.get('name'), result) for obj, result in zip(history, RunResult._format_result_history(history))]
+
+    def get_foursight_history_page(self, connection, check, limit,
+                                   sort=None, cursor=None) -> [list, int, Optional[str]]:
+        """
+        Like get_foursight_history but pages using the given opaque cursor rather than a start
+        index; None for the first page and thereafter the cursor returned for the previous page.
+        Returns a tuple of the results, total, and cursor for the next page (None if no more).
+        See RunResult.get_result_history_page.
+        """
+        # limit 'limit' param to 500
+        limit = 500 if limit > 500 else limit
+        result_obj = self.check_handler.init_check_or_action_res(connection, check)
+        if not result_obj:
+            return [], 0, None
+        return result_obj.get_result_history_page(limit, sort or 'timestamp.desc', cursor)
+
     def run_get_check(self, environ, check, uuid=None):
         """
         Loads a specific check or action result given an environment, check or
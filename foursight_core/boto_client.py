@@ -0,0 +1,125 @@
+# Shared factory for boto3 clients (and resources), so that these are created once and reused, rather than
+# (relatively expensively) on every use, and so that they are all created with the same tuned configuration.
+# Like boto_s3.py and boto_sqs.py (which use this), supports overriding the endpoint_url, e.g. to refer to a
+# locally running ersatz version of an AWS service via an emulator like localstack (https://localstack.cloud).
+
+import boto3
+from botocore.config import Config
+import os
+import threading
+from typing import Any, Optional
+
+# Maximum number of (HTTP) connections kept per client; the same client is shared across threads (see
+# boto_client), so this should be at least the maximum number of threads we use concurrently, e.g.
+# VIEW_FOURSIGHT_MAX_WORKERS and LAMBDAS_TAGS_MAX_WORKERS (8), and the S3Connection.get_objects
+# concurrency (pmap chunk_size, up to 20 or so); the botocore default is only 10.
+BOTO_CLIENT_MAX_POOL_CONNECTIONS = 32
+BOTO_CLIENT_CONNECT_TIMEOUT_SECONDS = 5
+BOTO_CLIENT_READ_TIMEOUT_SECONDS = 60
+BOTO_CLIENT_RETRIES = {"mode": "adaptive", "max_attempts": 5}
+
+# Environment variables which may be set to override the endpoint_url for the given (legacy
+# named) services; for any other service the environment variable name is AWS_ENDPOINT_URL_<SERVICE>,
+# e.g. AWS_ENDPOINT_URL_LAMBDA, or AWS_ENDPOINT_URL for all services (per the standard boto3 convention).
+BOTO_ENDPOINT_URL_ENV_VARS = {
+    "s3": "S3_URL",
+    "sqs": "SQS_URL"
+}
+
+_boto_clients = {}
+_boto_clients_lock = threading.Lock()
+_boto_resources = threading.local()
+
+
+def boto_config(**kwargs) -> Config:
+    """
+    Returns the (tuned) botocore Config we use for our boto3 clients; any given
+    kwargs (per botocore.config.Config) are merged into (override) this config.
+    """
+    config = Config(max_pool_connections=BOTO_CLIENT_MAX_POOL_CONNECTIONS,
+                    connect_timeout=BOTO_CLIENT_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=BOTO_CLIENT_READ_TIMEOUT_SECONDS,
+                    retries=dict(BOTO_CLIENT_RETRIES),  # copy since botocore updates this in place
+                    tcp_keepalive=True)
+    return config.merge(Config(**kwargs)) if kwargs else config
+
+
+def get_boto_endpoint_url(service: str) -> Optional[str]:
+    """
+    Returns the endpoint_url override for the given AWS service name, from the environment, if any;
+    see BOTO_ENDPOINT_URL_ENV_VARS. Otherwise returns None, meaning the default (real AWS) endpoint.
+    """
+    environment_variable_names = [BOTO_ENDPOINT_URL_ENV_VARS.get(service),
+                                  f"AWS_ENDPOINT_URL_{service.upper().replace('-', '_')}",
+                                  "AWS_ENDPOINT_URL"]
+    return next((os.environ[name] for name in environment_variable_names if name and os.environ.get(name)), None)
+
+
+def boto_client(service: str, region_name: Optional[str] = None, **kwargs) -> Any:
+    """
+    Returns a boto3 client object for the given AWS service name (and optional region), created with
+    our tuned config (see boto_config), and cached so that subsequent calls with the same arguments
+    return the same client. Low-level boto3 clients are thread-safe, so these are shared across threads;
+    only their creation (via the default boto3 session, which is not thread-safe) is serialized.
+    The endpoint_url may be passed explicitly (via kwargs, per boto3.client convention),
+    otherwise any override from the environment is used (see get_boto_endpoint_url).
+    """
+    kwargs = _get_boto_kwargs(service, kwargs)
+    key = _get_boto_key(service, region_name, kwargs)
+    if (client := _boto_clients.get(key)) is None:
+        with _boto_clients_lock:
+            if (client := _boto_clients.get(key)) is None:
+                client = _boto_clients[key] = boto3.client(service, region_name=region_name,
+                                                           **_get_boto_config_kwargs(kwargs))
+    return client
+
+
+def boto_resource(service: str, region_name: Optional[str] = None, **kwargs) -> Any:
+    """
+    Returns a boto3 resource object for the given AWS service name (and optional region), created with
+    our tuned config (see boto_config); like boto_client but, since boto3 resource objects are NOT
+    thread-safe, these are cached per thread. The endpoint_url may be passed explicitly
+    (via kwargs), otherwise any override from the environment is used (see get_boto_endpoint_url).
+    """
+    kwargs = _get_boto_kwargs(service, kwargs)
+    key = _get_boto_key(service, region_name, kwargs)
+    if (resources := getattr(_boto_resources, "resources", None)) is None:
+        resources = _boto_resources.resources = {}
+    if (resource := resources.get(key)) is None:
+        with _boto_clients_lock:
+            resource = resources[key] = boto3.resource(service, region_name=region_name,
+                                                       **_get_boto_config_kwargs(kwargs))
+    return resource
+
+
+def boto_client_cache_clear() -> None:
+    """
+    Clears the cached boto3 clients (for all threads) and resources (for the current thread).
+    """
+    with _boto_clients_lock:
+        _boto_clients.clear()
+    _boto_resources.resources = {}
+
+
+def _get_boto_kwargs(service: str, kwargs: dict) -> dict:
+    kwargs = dict(kwargs)
+    if not kwargs.get("endpoint_url"):
+        kwargs.pop("endpoint_url", None)
+        if endpoint_url := get_boto_endpoint_url(service):
+            kwargs["endpoint_url"] = endpoint_url
+    return kwargs
+
+
+def _get_boto_config_kwargs(kwargs: dict) -> dict:
+    config = kwargs.get("config")
+    return {**kwargs, "config": boto_config().merge(config) if config else boto_config()}
+
+
+def _get_boto_key(service: str, region_name: Optional[str], kwargs: dict) -> tuple:
+    # Any given config is keyed by its (explicitly given) option values, rather than by identity,
+    # since callers typically create a new Config object on each call.
+    config = kwargs.get("config")
+    config_options = getattr(config, "_user_provided_options", {}) if config else {}
+    return (service, region_name,
+            tuple(sorted((name, value) for name, value in kwargs.items() if name != "config")),
+            tuple(sorted((name, repr(value)) for name, value in config_options.items())))
@@ -17,6 +17,10 @@ from foursight_core.decorators import Decorators
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+# Order in which check results are listed by status; anything else sorts last.
+CHECK_STATUS_SORT_ORDER = {'ERROR': 0, 'FAIL': 1, 'WARN': 2, 'PASS': 3}
+CHECK_STATUS_SORT_ORDER_DEFAULT = 9
+
 
 class CheckHandler(object):
     """
@@ -50,6 +54,8 @@ class CheckHandler(object):
         logger.debug(f"foursight_core/CheckHandler: Validating check_setup.json file: {check_setup_file}")
         self.CHECK_SETUP = self.expand_check_setup(self.CHECK_SETUP, env)
         self.CHECK_SETUP = self.validate_check_setup(self.CHECK_SETUP)
+        self.CHECK_SORT_TITLES = self.build_check_sort_titles(self.CHECK_SETUP)
+        self.CHECK_DISPLAY_INDEX = self.build_check_display_index(self.CHECK_SETUP)
         logger.debug(f"foursight_core/CheckHandler: Done validating check_setup.json file: {check_setup_file}")
 
     def get_module_names(self):
@@ -256,6 +262,74 @@ class CheckHandler(object):
         """
         return self.CHECK_SETUP.get(check_name, {}).get("title", check_name)
 
+    @staticmethod
+    def build_check_sort_titles(check_setup):
+        """
+        Returns a dictionary of check name to lowercased check title from the given
+        CHECK_SETUP; computed once up front so sorting check results is cheap.
+        """
+        return {check_name: detail.get('title', check_name).lower() for check_name, detail in check_setup.items()}
+
+    @staticmethod
+    def build_check_display_index(check_setup):
+        """
+        Returns an index of which checks are displayed for which environments, from the
+        given CHECK_SETUP; computed once up front so per-request filtering is just lookups.
+        A check is displayed for an environment if that environment (or 'all') is in any of
+        its schedules or in its 'display' list. The returned dictionary looks like:
+        {
+            'envs': { <env-name>: { <group-name>: { <check-name>, ... }, ... }, ... },
+            'unscheduled': { <group-name>: { <check-name>, ... }, ... }
+        }
+        where 'unscheduled' contains the checks which have no schedule at all.
+        """
+        env_index = {}
+        unscheduled = {}
+        for check_name, detail in check_setup.items():
+            group = detail.get('group')
+            schedule = detail.get('schedule')
+            env_names = [env_name for sched in (schedule or {}).values() for env_name in sched]
+            if isinstance(detail.get('display'), list):
+                env_names.extend(detail['display'])
+            for env_name in env_names:
+                env_index.setdefault(env_name, {}).setdefault(group, set()).add(check_name)
+            if not schedule:
+                unscheduled.setdefault(group, set()).add(check_name)
+        return {'envs': env_index, 'unscheduled': unscheduled}
+
+    @staticmethod
+    def get_displayed_checks(check_display_index, env, is_same_env=None, include_unscheduled=False):
+        """
+        Returns a dictionary of group name to set of check names displayed for the given
+        environment, using the given index from build_check_display_index. If is_same_env
+        is given it is used to match environment names (e.g. short vs. full names) which
+        are not identical. If include_unscheduled is True then checks with no schedule
+        at all are included regardless of environment.
+        """
+        displayed_checks = {}
+
+        def add_checks(grouped_checks):
+            for group, check_names in grouped_checks.items():
+                displayed_checks.setdefault(group, set()).update(check_names)
+
+        for env_name, grouped_checks in check_display_index['envs'].items():
+            if env_name == 'all' or env_name == env or (is_same_env and is_same_env(env_name, env)):
+                add_checks(grouped_checks)
+        if include_unscheduled:
+            add_checks(check_display_index['unscheduled'])
+        return displayed_checks
+
+    def get_check_result_sort_key(self, check_result):
+        """
+        Returns the sort key for the given check result, i.e. its status rank
+        (see CHECK_STATUS_SORT_ORDER) and then its lowercased title from CHECK_SETUP.
+        """
+        check_name = check_result['name']
+        title = self.CHECK_SORT_TITLES.get(check_name)
+        if title is None:
+            title = self.get_check_title_from_setup(check_name).lower()
+        return CHECK_STATUS_SORT_ORDER.get(check_result['status'], CHECK_STATUS_SORT_ORDER_DEFAULT), title
+
     def get_check_schedule(self, schedule_name, conditions=None):
         """
         Go through CHECK_SETUP and return all the required info for to run a given
@@ -302,12 +376,10 @@ class CheckHandler(object):
             checks = [check_str.split('/')[1] for check_str in self.get_check_strings()]
 
         if connection.connections['es'] is None:
-            for check_name in checks:
-                tempCheck = self.CheckResult(connection, check_name)
-                if use_latest:
-                    found = tempCheck.get_latest_result()
-                else:
-                    found = tempCheck.get_primary_result()
+            # fetch all of the primary (or latest) results from s3 at once
+            result_key = '/latest.json' if use_latest else '/primary.json'
+            found_results = connection.connections['s3'].get_objects([check_name + result_key for check_name in checks])
+            for check_name, found in zip(checks, found_results):
                 # checks with no records will return None. Skip IGNORE checks
                 if found and found.get('status') != 'IGNORE':
                     check_results.append(found)
@@ -322,13 +394,7 @@ class CheckHandler(object):
             check_results = list(filter(lambda obj: obj['status'] != 'IGNORE' and obj['name'] in checks, check_results))
 
         # sort them by status and then alphabetically by check_setup title
-        stat_order = ['ERROR', 'FAIL', 'WARN', 'PASS']
-        return sorted(
-            check_results,
-            key=lambda v: (stat_order.index(v['status'])
-                           if v['status'] in stat_order
-                           else 9, self.get_check_title_from_setup(v['name']).lower())
-        )
+        return sorted(check_results, key=self.get_check_result_sort_key)
 
     def get_grouped_check_results(self, connection):
         """
@@ -340,6 +406,9 @@ class CheckHandler(object):
         """
         grouped_results = {}
         check_res = self.get_check_results(connection)
+        displayed_checks = self.get_displayed_checks(self.CHECK_DISPLAY_INDEX, connection.fs_env)
+        displayed_groups = {check_name: group
+                            for group, check_names in displayed_checks.items() for check_name in check_names}
         for res in check_res:
             setup_info = self.CHECK_SETUP.get(res['name'])
             # this should not happen, but fail gracefully
@@ -347,10 +416,8 @@ class CheckHandler(object):
                 logger.debug('-VIEW-> Check %s not found in CHECK_SETUP for env %s' % (res['name'], connection.fs_env))
                 continue
             # make sure this environment displays this check
-            used_envs = [env for sched in setup_info['schedule'].values() for env in sched]
-            used_envs.extend(setup_info.get('display', []))
-            if connection.fs_env in used_envs or 'all' in used_envs:
-                group = setup_info['group']
+            group = displayed_groups.get(res['name'])
+            if group is not None:
                 if group not in grouped_results:
                     grouped_results[group] = {}
                     grouped_results[group]['_name'] = group
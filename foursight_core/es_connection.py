@@ -1,5 +1,6 @@
 import os
 import json
+import logging
 from typing import Tuple
 from dcicutils.misc_utils import ignored
 from elasticsearch import (
@@ -12,6 +13,10 @@ from elasticsearch_dsl import Search
 from dcicutils import es_utils
 from foursight_core.abstract_connection import AbstractConnection
 from foursight_core.check_schema import CheckSchema
+from foursight_core.server_timing import server_timed
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
 
 
 class ElasticsearchException(Exception):
@@ -36,6 +41,10 @@ class ESConnection(AbstractConnection):
     """
 
     ES_SEARCH_SIZE = 10000
+    # Unique (per result) keyword field, with doc_values, used as the final sort (tie-breaker) when paging with
+    # search_after, as uuid is mapped as a date, and so only has millisecond precision; id_alias is the key of
+    # the result (see RunResult.store_formatted_result); sorting on _id itself needs (deprecated) fielddata.
+    RESULT_TIEBREAKER_SORT_FIELD = 'id_alias.keyword'
 
     def __init__(self, index=None, host=None):
         if not host:
@@ -45,12 +54,14 @@ class ESConnection(AbstractConnection):
         if index and not self.index_exists(index):
             self.create_index(index)
 
+    @server_timed("es")
     def index_exists(self, name):
         """
         Checks if the given index name exists
         """
         return self.es.indices.exists(index=name)
 
+    @server_timed("es")
     def create_index(self, name):
         """
         Creates an ES index called name. Returns true in success
@@ -76,6 +87,7 @@ class ESConnection(AbstractConnection):
         with open(path, 'r') as f:
             return json.load(f)
 
+    @server_timed("es")
     def delete_index(self, name):
         """
         Deletes the given index name from this es
@@ -86,12 +98,14 @@ class ESConnection(AbstractConnection):
             return False
         return True
 
+    @server_timed("es")
     def refresh_index(self):
         """
         Refreshes the index (wait removed, no need for it)
         """
         return self.es.indices.refresh(index=self.index)
 
+    @server_timed("es")
     def put_object(self, key, value):
         """
         Index a new item into es. Returns true in success
@@ -105,6 +119,7 @@ class ESConnection(AbstractConnection):
             print('Failed to add object id: %s with error: %s and body %s' % (key, str(e), value))
             return False
 
+    @server_timed("es")
     def get_object(self, key):
         """
         Gets object with uuid=key from es. Returns None if not found or no index
@@ -117,6 +132,25 @@ class ESConnection(AbstractConnection):
         except Exception:
             return None
 
+    @server_timed("es")
+    def get_objects(self, keys):
+        """
+        Gets the objects with uuids=keys from es, in one (mget) request. Returns a list
+        of objects in the same order as the given keys, with None for any not found;
+        all None if no index has been specified or on error.
+        """
+        keys = list(keys or [])
+        if not self.index or not keys:
+            return [None for _ in keys]
+        try:
+            docs = self.es.mget(index=self.index, body={'ids': keys})['docs']
+            found = {doc['_id']: doc['_source'] for doc in docs if doc.get('found')}
+            return [found.get(key) for key in keys]
+        except Exception as e:
+            logger.error(f'Failed to execute mget: {e}')
+            return [None for _ in keys]
+
+    @server_timed("es")
     def get_size(self):
         """
         Returns the number of items indexed on this es instance. Returns -1 in
@@ -128,6 +162,7 @@ class ESConnection(AbstractConnection):
             print(f'Failed to execute count: {e}')
             return 0
 
+    @server_timed("es")
     def get_size_bytes(self):
         """
         Returns number of bytes stored on this es instance
@@ -137,14 +172,29 @@ class ESConnection(AbstractConnection):
         resp = self.es.indices.stats(index=self.index, metric='store')
         return resp['_all']['total']['store']['size_in_bytes']
 
+    @server_timed("es")
     def search(self, search, key='_source') -> Tuple[list, int]:
         """
         Inner function that passes doc as a search parameter to ES. Based on the
         execute_search method in Fourfront.
         Returns a tuple with search results as a list and the total count as an integer.
+        The results are the given key (default _source) of each hit, or the whole hit if key is None.
         """
         if not self.index:
             return [], 0
+        res = self.execute(search)
+        total = self.get_hits_total(res)
+        if key is None:
+            return res['hits']['hits'], total
+        return [obj[key] for obj in res['hits']['hits']] if len(res['hits']['hits']) > 0 else [], total  # noQA
+
+    @staticmethod
+    @server_timed("es")
+    def execute(search) -> dict:
+        """
+        Executes the given search and returns its raw result (dictionary), including any aggregations.
+        Raises ElasticsearchException on error.
+        """
         err_msg = None
         try:
             res = search.execute().to_dict()
@@ -161,9 +211,7 @@ class ESConnection(AbstractConnection):
         if err_msg:
             raise ElasticsearchException(message=err_msg)
         # In next line, PyCharm's linter wrongly worries that 'res' might not be reliably set above. -kmp 6-Jun-2022
-        else:
-            total = self.get_hits_total(res)
-            return [obj[key] for obj in res['hits']['hits']] if len(res['hits']['hits']) > 0 else [], total  # noQA
+        return res
 
     @staticmethod
     def get_hits_total(result: dict) -> int:
@@ -173,10 +221,45 @@ class ESConnection(AbstractConnection):
             total = total["value"]
         return total
 
+    @server_timed("es")
     def get_result_history(self, prefix, start, limit, sort="timestamp.desc") -> [list, int]:
         """
         ES handle to implement the get_result_history functionality of RunResult
         """
+        doc = self._get_result_history_query(prefix, limit, sort)
+        doc['from'] = start
+        search = Search(using=self.es, index=self.index)
+        search.update_from_dict(doc)
+        result, total = self.search(search)
+        return result, total
+
+    @server_timed("es")
+    def get_result_history_after(self, prefix, limit, sort="timestamp.desc", search_after=None) -> [list, int, list]:
+        """
+        Like get_result_history but pages using ES search_after rather than from/size, which is
+        constant cost regardless of the depth of the page, and not limited by max_result_window.
+        The search_after argument should be None for the first page, and for subsequent pages the
+        sort values of the last result of the previous page; these are returned as the third item
+        of the returned tuple (along with the results and total); None if there are no more results.
+        """
+        # The sort must be total (unique) for search_after to not skip results with equal sort values.
+        doc = self._get_result_history_query(prefix, limit, sort, unique_sort=True)
+        if search_after:
+            doc['search_after'] = search_after
+        search = Search(using=self.es, index=self.index)
+        search.update_from_dict(doc)
+        hits, total = self.search(search, key=None)
+        last_sort_values = hits[-1].get('sort') if hits and len(hits) >= limit else None
+        return [hit['_source'] for hit in hits], total, last_sort_values
+
+    @classmethod
+    def _get_result_history_query(cls, prefix, limit, sort="timestamp.desc", unique_sort=False) -> dict:
+        """
+        Returns the ES query for the history of results with the given prefix (check or action
+        name), sorted by the given field (default timestamp, i.e. uuid), suffixed with .asc or
+        .desc; if not sorting by uuid then uuid is added as a secondary sort (tie-breaker); and
+        if unique_sort is True then RESULT_TIEBREAKER_SORT_FIELD is added as the final sort.
+        """
         sort_field = "uuid"
         sort_order = "desc"
         if sort:
@@ -191,12 +274,14 @@ class ESConnection(AbstractConnection):
                 sort_field = sort
             if sort_field == "timestamp":
                 sort_field = "uuid"
-        doc = {
-            'from': start,
+        sort_spec = [{sort_field: {'order': sort_order}}]
+        if sort_field != "uuid":
+            sort_spec.append({"uuid": {'order': sort_order}})
+        if unique_sort:
+            sort_spec.append({cls.RESULT_TIEBREAKER_SORT_FIELD: {'order': sort_order}})
+        return {
             'size': limit,
-            'sort': {
-                sort_field: {'order': sort_order}
-            },
+            'sort': sort_spec,
             'query': {
                 'bool': {
                     'must_not': [
@@ -210,11 +295,113 @@ class ESConnection(AbstractConnection):
                 }
             }
         }
+
+    @server_timed("es")
+    def get_recent_results(self, prefixes, limit) -> list:
+        """
+        Returns the (at most) limit most recent results, most recent first, across all of the
+        given prefixes (check or action names), in a single ES search, i.e. sorted by uuid and
+        excluding the primary and latest results (which duplicate timestamped ones), like
+        get_result_history but for many checks at once.
+        """
+        prefixes = list(prefixes or [])
+        if not prefixes or limit < 1:
+            return []
+        doc = {
+            'size': limit,
+            'sort': [{'uuid': {'order': 'desc'}}],
+            'query': {
+                'bool': {
+                    'must_not': [
+                        {'terms': {'_id': [prefix + '/primary.json' for prefix in prefixes] +
+                                          [prefix + '/latest.json' for prefix in prefixes]}}
+                    ],
+                    'filter': {
+                        'terms': {'name.keyword': prefixes}
+                    }
+                }
+            }
+        }
         search = Search(using=self.es, index=self.index)
         search.update_from_dict(doc)
         result, total = self.search(search)
-        return result, total
+        ignored(total)
+        return result
+
+    @staticmethod
+    def _get_result_analytics_query(prefix, since) -> dict:
+        """
+        Returns the ES query (clause) for the (timestamped) results with the given prefix
+        (check or action name) since the given (ISO formatted datetime string) uuid.
+        """
+        return {
+            'bool': {
+                'must_not': [
+                    {'term': {'_id': prefix + '/primary.json'}},
+                    {'term': {'_id': prefix + '/latest.json'}}
+                ],
+                'filter': [
+                    {'match': {'name': prefix}},
+                    {'range': {'uuid': {'gte': since}}}
+                ]
+            }
+        }
+
+    @server_timed("es")
+    def get_result_analytics(self, prefix, since, interval, percents) -> dict:
+        """
+        Returns the raw ES aggregations for the results with the given prefix (check or action name)
+        since the given (ISO formatted datetime string) uuid, i.e.: status counts (statuses); status
+        counts per time bucket of the given (ES fixed_interval) interval (buckets); and the given
+        runtime (kwargs.runtime_seconds) percentiles (runtime_percentiles) and stats (runtime_stats).
+        """
+        if not self.index:
+            return {}
+        doc = {
+            'size': 0,
+            'query': self._get_result_analytics_query(prefix, since),
+            'aggs': {
+                'statuses': {'terms': {'field': 'status.keyword', 'size': 20}},
+                'buckets': {
+                    'date_histogram': {'field': 'uuid', 'fixed_interval': interval, 'min_doc_count': 1},
+                    'aggs': {'statuses': {'terms': {'field': 'status.keyword', 'size': 20}}}
+                },
+                'runtime_percentiles': {'percentiles': {'field': 'kwargs.runtime_seconds', 'percents': percents}},
+                'runtime_stats': {'stats': {'field': 'kwargs.runtime_seconds'}}
+            }
+        }
+        search = Search(using=self.es, index=self.index)
+        search.update_from_dict(doc)
+        return self.execute(search).get('aggregations', {})
+
+    def iter_result_statuses(self, prefix, since, page_size=1000):
+        """
+        Generates the (uuid, status) of each of the results with the given prefix (check or
+        action name) since the given (ISO formatted datetime string) uuid, in ascending order
+        by uuid; paged via search_after and fetching only these two fields of each result.
+        The sort ends with RESULT_TIEBREAKER_SORT_FIELD so that it is total, otherwise results
+        with equal (millisecond precision) uuids at a page boundary would be skipped.
+        """
+        search_after = None
+        while True:
+            doc = {
+                'size': page_size,
+                '_source': ['uuid', 'status'],
+                'sort': [{'uuid': {'order': 'asc'}}, {self.RESULT_TIEBREAKER_SORT_FIELD: {'order': 'asc'}}],
+                'query': self._get_result_analytics_query(prefix, since)
+            }
+            if search_after:
+                doc['search_after'] = search_after
+            search = Search(using=self.es, index=self.index)
+            search.update_from_dict(doc)
+            hits, _ = self.search(search, key=None)
+            for hit in hits:
+                yield hit['_source'].get('uuid'), hit['_source'].get('status')
+            if len(hits) < page_size:
+                break
+            search_after = hits[-1].get('sort')
 
+    @server_timed("es")
     def get_main_page_checks(self, checks=None, primary=True):
         """
         Gets all checks for the main page. If primary is true then all checks will
@@ -259,6 +446,7 @@ class ESConnection(AbstractConnection):
                     raw_result.append(CheckSchema().create_placeholder_check(check_name))
         return raw_result
 
+    @server_timed("es")
     def list_all_keys(self):
         """
         Generic search on es that will return all ids of indexed items
@@ -281,6 +469,7 @@ class ESConnection(AbstractConnection):
         ignored(total)
         return result
 
+    @server_timed("es")
     def list_all_keys_w_prefix(self, prefix):
         """
         Lists all id's in this ES that have the given prefix.
@@ -307,6 +496,7 @@ class ESConnection(AbstractConnection):
         ignored(total)
         return result
 
+    @server_timed("es")
     def get_all_objects(self):
         """
         Calls list_all_keys with full=True to get all the objects
@@ -329,6 +519,7 @@ class ESConnection(AbstractConnection):
         ignored(total)
         return result
 
+    @server_timed("es")
     def delete_keys(self, key_list):
         """
         Deletes all uuids in key_list from es. If key_list is large this will be
@@ -345,18 +536,21 @@ class ESConnection(AbstractConnection):
         except Exception:
             return 0
 
+    @server_timed("es")
     def test_connection(self):
         """
         Hits health route on es to verify that it is up
         """
         return self.es.ping()
 
+    @server_timed("es")
     def info(self):
         """
         Returns basic info about the Elasticsearch server. 
         """
         return self.es.info()
 
+    @server_timed("es")
     def health(self):
         """
         Returns basic health about the Elasticsearch server cluster.
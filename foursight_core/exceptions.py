@@ -22,6 +22,19 @@ class BadCheckSetup(Exception):
         super().__init__(message)
 
 
+class BadHistoryCursor(ValueError):
+    """
+    Exception for a result history cursor (see RunResult.get_result_history_page) which is malformed,
+    or which was not created for the requested sort or by the results store (ES or S3) in use.
+    __init__ takes some string error message
+    """
+    def __init__(self, message=None):
+        # default error message if none provided
+        if message is None:
+            message = "Malformed result history cursor."
+        super().__init__(message)
+
+
 class MissingFoursightPrefixException(Exception):
     """
     Generic exception for an issue with foursight prefix
@@ -92,6 +92,22 @@ class FSConnection(object):
             obj = self.connections['s3'].get_object(key)
         return obj
 
+    def get_objects(self, keys):
+        """
+        Bulk version of get_object; queries ES for all keys at once and then
+        checks S3 (concurrently) for any it doesn't find. Returns a list of
+        objects in the same order as the given keys, with None for any not found.
+        """
+        keys = list(keys or [])
+        objs = [None for _ in keys]
+        if self.connections['es'] is not None:
+            objs = self.connections['es'].get_objects(keys)
+        missing = [index for index, obj in enumerate(objs) if obj is None]
+        if missing:
+            for index, obj in zip(missing, self.connections['s3'].get_objects([keys[index] for index in missing])):
+                objs[index] = obj
+        return objs
+
     def put_object(self, key, value):
         """
         Puts an object onto both ES and S3
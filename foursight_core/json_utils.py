@@ -0,0 +1,99 @@
+import json
+from typing import Any, Optional, Tuple
+
+# Separators used for sizing; same as Chalice uses to serialize JSON response bodies.
+JSON_SEPARATORS = (',', ':')
+JSON_TRUNCATED_KEY = '...'
+JSON_TRUNCATED_STRING_SUFFIX = '... (truncated)'
+
+
+def _json_encoder() -> json.JSONEncoder:
+    return json.JSONEncoder(separators=JSON_SEPARATORS, default=str)
+
+
+def json_size(value: Any, limit: Optional[int] = None) -> int:
+    """
+    Returns the size in bytes of the given value encoded as JSON (with non-ASCII characters
+    escaped, so characters are bytes). This streams the encoding, without building the whole
+    JSON string, and if the given limit is specified, stops as soon as it is exceeded, in which
+    case the returned size will be greater than the limit but not necessarily the full size.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    size = 0
+    for chunk in _json_encoder().iterencode(value):
+        size += len(chunk)
+        if limit is not None and size > limit:
+            break
+    return size
+
+
+def json_truncate(value: Any, max_size: int) -> Any:
+    """
+    Returns the given (JSON serializable) value truncated such that its JSON encoding
+    is (approximately) within the given max_size bytes; returns the given value itself
+    if it is already within this size. Truncation is structural, so the result is still
+    valid JSON, containing the first items of lists (followed by a marker string saying
+    how many items were elided), the first keys of dictionaries (followed by a marker
+    key, see JSON_TRUNCATED_KEY), and the leading part of long strings.
+    """
+    if json_size(value, max_size) <= max_size:
+        return value
+    return _json_truncate(value, max_size)[0]
+
+
+def _json_truncate(value: Any, budget: int) -> Tuple[Any, int]:
+    """
+    Returns a tuple of the given value truncated to fit within the given budget
+    (in bytes, of its JSON encoding) and the JSON size of this truncated value.
+    """
+    if isinstance(value, dict):
+        return _json_truncate_dict(value, budget)
+    elif isinstance(value, (list, tuple)):
+        return _json_truncate_list(value, budget)
+    size = json_size(value)
+    if size <= budget:
+        return value, size
+    if isinstance(value, str):
+        # The budget is in terms of encoded (escaped) characters; scale down to be safe.
+        value = value[:max(0, (budget - len(JSON_TRUNCATED_STRING_SUFFIX) - 2) * len(value) // size)]
+        value += JSON_TRUNCATED_STRING_SUFFIX
+        return value, json_size(value)
+    return None, 4
+
+
+def _json_truncated_marker(count: int, what: str) -> str:
+    return f"{count} more {what}{'s' if count != 1 else ''} truncated"
+
+
+def _json_truncate_dict(value: dict, budget: int) -> Tuple[dict, int]:
+    result = {}
+    size = 2  # {}
+    # Reserve room for the marker key/value we may need to add at the end.
+    reserved = json_size({JSON_TRUNCATED_KEY: _json_truncated_marker(len(value), 'key')})
+    for index, (key, item) in enumerate(value.items()):
+        key_size = json_size(str(key)) + 2  # the key, its colon, and separating comma
+        remaining = budget - size - key_size - reserved
+        if remaining <= 0:
+            result[JSON_TRUNCATED_KEY] = _json_truncated_marker(len(value) - index, 'key')
+            return result, size + reserved
+        item, item_size = _json_truncate(item, remaining)
+        result[key] = item
+        size += key_size + item_size
+    return result, size
+
+
+def _json_truncate_list(value: list, budget: int) -> Tuple[list, int]:
+    result = []
+    size = 2  # []
+    # Reserve room for the marker item we may need to add at the end.
+    reserved = json_size(_json_truncated_marker(len(value), 'item')) + 1
+    for index, item in enumerate(value):
+        remaining = budget - size - 1 - reserved
+        if remaining <= 0:
+            result.append(_json_truncated_marker(len(value) - index, 'item'))
+            return result, size + reserved
+        item, item_size = _json_truncate(item, remaining)
+        result.append(item)
+        size += item_size + 1
+    return result, size
@@ -1,6 +1,10 @@
+from collections import OrderedDict
+import copy
+import hashlib
 import os
 import boto3
 import logging
+import threading
 import time
 import redis
 from typing import Optional, Tuple
@@ -26,11 +30,23 @@ AUTH_TOKEN_COOKIE = 'authtoken'
 
 class Auth:
 
+    # Verified (decoded) authtokens are cached in-process, keyed by a hash of the authtoken (and
+    # session token), until the authtoken expires (authenticated_until); but if Redis is in use
+    # then only for AUTHTOKEN_CACHE_SESSION_TTL_SECONDS, so that a session deleted from Redis
+    # (e.g. by logout in another Lambda instance) is not honored for long. Failed verifications
+    # are cached for AUTHTOKEN_CACHE_NEGATIVE_TTL_SECONDS. These absorb the bursts of (parallel)
+    # API calls made by the UI, each of which otherwise does a Redis lookup and JWT verification.
+    AUTHTOKEN_CACHE_MAXSIZE = 1000
+    AUTHTOKEN_CACHE_SESSION_TTL_SECONDS = 60
+    AUTHTOKEN_CACHE_NEGATIVE_TTL_SECONDS = 10
+
     def __init__(self, auth0_client: str, auth0_secret: str, envs: Envs):
         self._auth0_client = auth0_client
         self._auth0_secret = auth0_secret
         self._envs = envs
         self._redis = None
+        self._authtoken_cache = OrderedDict()
+        self._authtoken_cache_lock = threading.Lock()
 
     def get_redis_handler(self):
         """
@@ -63,30 +79,12 @@ class Auth:
         and/or not authenticated, and containing the basic info from the authtoken.
         """
         try:
-            # Read the c4_st token (new Redis session token if Redis is in use)
-            if self._redis:
-                c4_st = read_cookie(request, SESSION_TOKEN_COOKIE)
-                redis_session_token = RedisSessionToken.from_redis(
-                    redis_handler=self._redis,
-                    namespace=self.get_redis_namespace(env),
-                    token=c4_st
-                )
-                # if this session token is not valid, nothing else is to be trusted, so bail here
-                if (not redis_session_token or
-                        not redis_session_token.validate_session_token(redis_handler=self._redis)):
-                    return self._create_unauthenticated_response(request, "missing-or-invalid-session-token")
-
-            # Read the authtoken cookie (will always be present).
+            # Verify the c4_st token (new Redis session token if Redis is in use),
+            # and verify and decode the authtoken cookie (will always be present).
 
-            authtoken = read_cookie(request, AUTH_TOKEN_COOKIE)
-            if not authtoken:
-                return self._create_unauthenticated_response(request, "no-authtoken")
-
-            # Decode the authtoken cookie.
-
-            authtoken_decoded = self.decode_authtoken(authtoken)
+            authtoken_decoded, status = self._verify_authtoken(request, env)
             if not authtoken_decoded:
-                return self._create_unauthenticated_response(request, "invalid-authtoken")
+                return self._create_unauthenticated_response(request, status)
 
             # Sanity check the decoded authtoken.
 
@@ -125,6 +123,78 @@ class Auth:
             logger.error(f"Authorization exception: {e}")
             return self._create_unauthenticated_response(request, "exception: " + str(e))
 
+    def _verify_authtoken(self, request: dict, env: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Verifies the Redis session token (if Redis is in use) and verifies and decodes the authtoken
+        cookie, from the given request; using (and updating) the verified authtoken cache (see above).
+        Returns a tuple with the decoded authtoken, and None; or None and the failure status.
+        """
+        c4_st = read_cookie(request, SESSION_TOKEN_COOKIE) if self._redis else None
+        authtoken = read_cookie(request, AUTH_TOKEN_COOKIE)
+        cache_key = self._get_authtoken_cache_key(authtoken, c4_st)
+        with self._authtoken_cache_lock:
+            if (cached := self._authtoken_cache.get(cache_key)) and cached[0] > time.time():
+                self._authtoken_cache.move_to_end(cache_key)
+                # Copy as callers update the returned (decoded authtoken) dictionary.
+                return copy.deepcopy(cached[1]), cached[2]
+
+        if self._redis:
+            redis_session_token = RedisSessionToken.from_redis(
+                redis_handler=self._redis,
+                namespace=self.get_redis_namespace(env),
+                token=c4_st
+            )
+            # if this session token is not valid, nothing else is to be trusted, so bail here
+            if (not redis_session_token or
+                    not redis_session_token.validate_session_token(redis_handler=self._redis)):
+                return self._cache_authtoken(cache_key, None, "missing-or-invalid-session-token")
+
+        if not authtoken:
+            return None, "no-authtoken"
+
+        try:
+            authtoken_decoded = self.decode_authtoken(authtoken)
+        except Exception as e:
+            logger.error(f"Authorization exception: {e}")
+            return self._cache_authtoken(cache_key, None, "exception: " + str(e))
+        if not authtoken_decoded:
+            return self._cache_authtoken(cache_key, None, "invalid-authtoken")
+        return self._cache_authtoken(cache_key, authtoken_decoded, None)
+
+    @staticmethod
+    def _get_authtoken_cache_key(authtoken: Optional[str], c4_st: Optional[str]) -> str:
+        # Hashed so the cache does not retain the (sensitive) tokens themselves.
+        return hashlib.sha256(f"{authtoken or ''}\n{c4_st or ''}".encode("utf-8")).hexdigest()
+
+    def _cache_authtoken(self, cache_key: str, authtoken_decoded: Optional[dict],
+                         status: Optional[str]) -> Tuple[Optional[dict], Optional[str]]:
+        now = time.time()
+        if authtoken_decoded:
+            expires = authtoken_decoded.get("authenticated_until")
+            if not isinstance(expires, (int, float)):
+                return authtoken_decoded, status
+            if self._redis:
+                expires = min(expires, now + self.AUTHTOKEN_CACHE_SESSION_TTL_SECONDS)
+        else:
+            expires = now + self.AUTHTOKEN_CACHE_NEGATIVE_TTL_SECONDS
+        if expires > now:
+            with self._authtoken_cache_lock:
+                self._authtoken_cache[cache_key] = (expires, copy.deepcopy(authtoken_decoded), status)
+                self._authtoken_cache.move_to_end(cache_key)
+                while len(self._authtoken_cache) > self.AUTHTOKEN_CACHE_MAXSIZE:
+                    self._authtoken_cache.popitem(last=False)
+        return authtoken_decoded, status
+
+    def invalidate_authtoken_cache(self, request: dict) -> None:
+        """
+        Removes the authtoken (and session token) of the given request from the verified authtoken cache;
+        for logout. Note that this only affects this instance; see AUTHTOKEN_CACHE_SESSION_TTL_SECONDS.
+        """
+        c4_st = read_cookie(request, SESSION_TOKEN_COOKIE) if self._redis else None
+        cache_key = self._get_authtoken_cache_key(read_cookie(request, AUTH_TOKEN_COOKIE), c4_st)
+        with self._authtoken_cache_lock:
+            self._authtoken_cache.pop(cache_key, None)
+
     def create_authtoken(self, jwt: str, jwt_expires_at: int, domain: str, request: Optional[dict] = None) -> Tuple[str, str]:
         """
         Creates and returns a new signed JWT, to be used as the login authtoken (cookie), from
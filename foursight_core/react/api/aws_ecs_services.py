@@ -1,4 +1,3 @@
-import boto3
 import datetime
 from functools import lru_cache
 import pytz
@@ -12,6 +11,7 @@ from .aws_ecs_tasks import (
 )
 from .aws_ecs_types import get_env_associated_with_cluster, get_service_type
 from ...app import app
+from ...boto_client import boto_client
 from .datetime_utils import convert_datetime_to_utc_datetime_string as datetime_string
 from .envs import Envs
 from .misc_utils import name_value_list_to_dict, run_concurrently, run_functions_concurrently
@@ -21,6 +21,9 @@ from .misc_utils import name_value_list_to_dict, run_concurrently, run_functions
 
 record_reindex_kickoff_via_tags = True
 
+# Maximum number of build IDs which may be passed to a single CodeBuild batch_get_builds call.
+CODEBUILD_BATCH_GET_BUILDS_MAX_IDS = 100
+
 
 def get_aws_ecs_clusters_for_update(envs: Envs) -> List[Dict]:
     response = []
@@ -113,7 +116,7 @@ def get_aws_ecs_services_for_update(envs: Envs, cluster_arn: str,
 
 
 def get_aws_codebuild_digest(log_group: str, log_stream: str, image_tag: Optional[str] = None) -> Optional[str]:
-    logs = boto3.client("logs")
+    logs = boto_client("logs")
     sha256_pattern = re.compile(r"sha256:([0-9a-f]{64})")
     # For some reason this (rarely-ish) intermittently fails with no error;
     # the results just do not contain the digest; don't know why so try a few times.
@@ -182,7 +185,7 @@ def aws_ecs_update_cluster(cluster_arn: str, user: Optional[str] = None) -> Dict
 
 def get_aws_ecs_cluster_status(cluster_arn: str) -> Optional[Dict]:
 
-    ecs = boto3.client("ecs")
+    ecs = boto_client("ecs")
 
     if record_reindex_kickoff_via_tags:
         # We need the full cluster ARN to deal with (cluster) tags;
@@ -282,7 +285,7 @@ def get_aws_ecr_image_info(image_repo_or_arn: str, image_tag: Optional[str] = No
             "pulled_at": datetime_string(image.get("lastRecordedPullTime"))
         }
 
-    ecr = boto3.client("ecr")
+    ecr = boto_client("ecr")
     repos = ecr.describe_repositories()["repositories"]
     for repo in repos:
         repo_name = repo["repositoryName"]
@@ -306,21 +309,87 @@ def get_aws_ecr_image_info(image_repo_or_arn: str, image_tag: Optional[str] = No
     return {}
 
 
-def get_aws_ecr_build_info(image_repo_or_arn: str, image_tag: Optional[str] = None, previous_builds: int = 2) -> Dict:
+class AwsCodeBuildCache:
+    """
+    Cache of CodeBuild projects, project build IDs, builds, and (CloudWatch build log) digests;
+    intended to be shared for the duration of a single request, e.g. across the services of a cluster
+    (see _get_aws_ecs_services_for_update_raw), so that the same builds are not fetched more than once.
+    Builds are fetched (batch_get_builds) CODEBUILD_BATCH_GET_BUILDS_MAX_IDS at a time, concurrently if
+    more than that. Concurrent use is fine; at worst something may be fetched more than once.
+    """
+    def __init__(self) -> None:
+        self._codebuild = boto_client("codebuild")
+        self._projects = None
+        self._project_build_ids = {}
+        self._builds = {}
+        self._digests = {}
+
+    def get_projects(self) -> List[str]:
+        if self._projects is None:
+            self._projects = self._codebuild.list_projects()["projects"]
+        return list(self._projects)
+
+    def get_project_build_ids(self, project: str, next_token: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Returns the list of build IDs for the given project, most recent first, starting at the given
+        next_token (from a previous call); and the next_token for the next page, or None if no more.
+        """
+        if (project, next_token) not in self._project_build_ids:
+            if next_token:
+                build_ids = self._codebuild.list_builds_for_project(projectName=project, nextToken=next_token)
+            else:
+                build_ids = self._codebuild.list_builds_for_project(projectName=project, sortOrder="DESCENDING")
+            self._project_build_ids[(project, next_token)] = (build_ids["ids"], build_ids.get("nextToken"))
+        return self._project_build_ids[(project, next_token)]
+
+    def get_project_builds(self, project: str, next_token: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Like get_project_build_ids but returns the builds themselves rather than their IDs.
+        """
+        build_ids, next_token = self.get_project_build_ids(project, next_token)
+        return self.get_builds(build_ids), next_token
+
+    def get_builds(self, build_ids: List[str]) -> List[Dict]:
+        """
+        Returns the builds for the given build IDs, in the same order; any not found are omitted.
+        """
+        def batch_get_builds(build_ids: List[str]) -> None:
+            for build in self._codebuild.batch_get_builds(ids=build_ids)["builds"]:
+                self._builds[build["id"]] = build
+        uncached_build_ids = [build_id for build_id in build_ids if build_id not in self._builds]
+        batches = [uncached_build_ids[index:index + CODEBUILD_BATCH_GET_BUILDS_MAX_IDS]
+                   for index in range(0, len(uncached_build_ids), CODEBUILD_BATCH_GET_BUILDS_MAX_IDS)]
+        if len(batches) > 1:
+            list(run_concurrently(batch_get_builds, batches))
+        elif batches:
+            batch_get_builds(batches[0])
+        return [self._builds[build_id] for build_id in build_ids if build_id in self._builds]
+
+    def get_digest(self, log_group: str, log_stream: str, image_tag: Optional[str] = None) -> Optional[str]:
+        key = (log_group, log_stream, image_tag)
+        if key not in self._digests:
+            self._digests[key] = get_aws_codebuild_digest(log_group, log_stream, image_tag)
+        return self._digests[key]
+
+
+def get_aws_ecr_build_info(image_repo_or_arn: str, image_tag: Optional[str] = None, previous_builds: int = 2,
+                           cache: Optional[AwsCodeBuildCache] = None) -> Dict:
     """
     Returns a dictionary with info about the three most recent CodeBuild builds
-    for the given image repo and tag, or None if none found.
+    for the given image repo and tag, or None if none found. The given (per-request)
+    cache is used to get the CodeBuild info, if given; otherwise one is created.
     """
     if not image_tag:
         image_repo, image_tag = _get_image_repo_and_tag(image_repo_or_arn)
     else:
         image_repo = image_repo_or_arn
 
-    codebuild = boto3.client("codebuild")
+    if not cache:
+        cache = AwsCodeBuildCache()
 
     def get_projects() -> List[str]:
 
-        projects = codebuild.list_projects()["projects"]
+        projects = cache.get_projects()
 
         # If there is a project with the same name as the image_repo then look at that one first,
         # or secondarily, prefer projects whose names contain the image_repo and/or image_tag;
@@ -364,9 +433,9 @@ def get_aws_ecr_build_info(image_repo_or_arn: str, image_tag: Optional[str] = No
 
     def get_relevant_builds(project: str) -> Generator[Optional[Dict], None, None]:
 
-        # For efficiency, and the most common actual case, get builds three at a time; i.e. since we
-        # want to the three most recent (relevant) builds, and they are usually together at the start
-        # of the (list_build_for_projects) list ordered (descending) by build (creation) time;
+        # We want the three most recent (relevant) builds, and they are usually together at the start
+        # of the (list_build_for_projects) list ordered (descending) by build (creation) time; we get
+        # the builds for a whole page of these (up to 100) build IDs at a time (see AwsCodeBuildCache);
         # but of course, just in case, we need to handle the general case.
 
         def get_relevant_build_info(build: Optional[Dict]) -> Optional[Dict]:
@@ -406,29 +475,24 @@ def get_aws_ecr_build_info(image_repo_or_arn: str, image_tag: Optional[str] = No
                     return create_build_info(build)
             return None
 
-        get_builds_from_boto_this_many_at_a_time = 4
         next_token = None
         while True:
-            if next_token:
-                build_ids = codebuild.list_builds_for_project(projectName=project, nextToken=next_token)
-            else:
-                build_ids = codebuild.list_builds_for_project(projectName=project, sortOrder="DESCENDING")
-            next_token = build_ids.get("nextToken")
-            build_ids = build_ids["ids"]
-            while build_ids:
-                build_ids_batch = build_ids[:get_builds_from_boto_this_many_at_a_time]
-                build_ids = build_ids[get_builds_from_boto_this_many_at_a_time:]
-                builds = codebuild.batch_get_builds(ids=build_ids_batch)["builds"]
-                for build in builds:
-                    build = get_relevant_build_info(build)
-                    if build:
-                        yield build
+            builds, next_token = cache.get_project_builds(project, next_token)
+            for build in builds:
+                build = get_relevant_build_info(build)
+                if build:
+                    yield build
             if not next_token:
                 break
 
     number_of_previous_builds_to_return = previous_builds
     response = {}
-    for project in get_projects():
+    projects = get_projects()
+    for project_index, project in enumerate(projects):
+        if project_index == 1:
+            # Not enough relevant builds in the first (preferred) project; so get the (first page of)
+            # builds for the rest of the projects concurrently; these are then cached for use below.
+            list(run_concurrently(cache.get_project_builds, projects[1:]))
         for build in get_relevant_builds(project):
             if not response.get("latest"):
                 response["latest"] = build
@@ -439,7 +503,7 @@ def get_aws_ecr_build_info(image_repo_or_arn: str, image_tag: Optional[str] = No
             if number_of_previous_builds_to_return <= 0:
                 break
             number_of_previous_builds_to_return -= 1
-        if number_of_previous_builds_to_return <= 0:
+        if number_of_previous_builds_to_return <= 0 and response.get("latest"):
             break
 
     return response
@@ -451,7 +515,7 @@ def _get_aws_ecs_services_for_update_raw(cluster_arn: str,
                                          include_build_digest: bool,
                                          previous_builds: int) -> List[Dict]:
 
-    ecs = boto3.client("ecs")
+    ecs = boto_client("ecs")
 
     def get_service_info(service_arn: str) -> Dict:
 
@@ -501,21 +565,19 @@ def _get_aws_ecs_services_for_update_raw(cluster_arn: str,
         # Cache this result within the enclosing function; for the below services loop.
         return get_aws_ecr_image_info(image_repo, image_tag)
 
+    # Cache the CodeBuild info (builds and digests) within the enclosing function; for the below services loop.
+    codebuild_cache = AwsCodeBuildCache()
+
     @lru_cache
     def get_build_info(image_repo: str, image_tag: str) -> Optional[Dict]:
         # Cache this result within the enclosing function; for the below services loop.
-        build = get_aws_ecr_build_info(image_repo, image_tag, previous_builds=previous_builds)
+        build = get_aws_ecr_build_info(image_repo, image_tag, previous_builds=previous_builds, cache=codebuild_cache)
         if include_build_digest:
             log_group = build.get("latest", {}).get("log_group")
             log_stream = build.get("latest", {}).get("log_stream")
-            build["latest"]["digest"] = get_build_digest(log_group, log_stream, image_tag)
+            build["latest"]["digest"] = codebuild_cache.get_digest(log_group, log_stream, image_tag)
         return build
 
-    @lru_cache
-    def get_build_digest(log_group: str, log_stream: str, image_tag: Optional[str] = None) -> Optional[str]:
-        # Cache this result within the enclosing function; for the below services loop.
-        return get_aws_codebuild_digest(log_group, log_stream, image_tag)
-
     service_arns = ecs.list_services(cluster=cluster_arn).get("serviceArns", [])
     # For better performance we get each service info in parallel.
     # But, since, typically, the image/build info for each service will be exactly the same,
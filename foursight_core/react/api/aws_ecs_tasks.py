@@ -1,9 +1,9 @@
-import boto3
 import json
 from typing import Dict, List, Optional
 from dcicutils.ecs_utils import ECSUtils
 from dcicutils.misc_utils import get_error_message
 from .aws_ecs_types import get_cluster_associated_with_env, get_task_definition_type
+from ...boto_client import boto_client
 from .aws_network import aws_get_security_groups, aws_get_subnets, aws_get_vpcs
 from .datetime_utils import convert_datetime_to_utc_datetime_string as datetime_string
 from .envs import Envs
@@ -96,7 +96,7 @@ def get_aws_ecs_tasks_for_running(envs: Envs, task_definition_type: Optional[str
             # Since we are doing this as we go we are
             # guaranteed to get at most only one of these.
             existing_task = duplicate_tasks[0]
-            ecs = boto3.client("ecs")
+            ecs = boto_client("ecs")
             existing_task_definition = (
                 ecs.describe_task_definition(taskDefinition=existing_task["task_definition_arn"])["taskDefinition"])
             this_task_definition = (
@@ -238,7 +238,7 @@ def get_aws_ecs_tasks_running(cluster_arn: Optional[str] = None,
         return get_aws_ecs_tasks_running_across_clusters(task_definition_type=task_definition_type,
                                                          task_definition_arn=task_definition_arn)
     response = []
-    ecs = boto3.client("ecs")
+    ecs = boto_client("ecs")
     task_arns = ecs.list_tasks(cluster=cluster_arn).get("taskArns")
     if task_arns:
         given_task_definition_type = task_definition_type
@@ -327,7 +327,7 @@ def aws_ecs_run_task(cluster_arn: str, task_definition_arn: str, args: Dict) ->
             "security_group": security_group,
             "subnets": subnets
         }
-        ecs = boto3.client("ecs")
+        ecs = boto_client("ecs")
         run_task_response = ecs.run_task(
             launchType="FARGATE",
             count=1,
@@ -354,7 +354,7 @@ def _get_task_definition_arns() -> List[str]:
 
 
 def _get_task_arns(cluster_arn: str, task_definition_arn: str) -> List[str]:
-    ecs = boto3.client("ecs")
+    ecs = boto_client("ecs")
     return ecs.list_tasks(cluster=cluster_arn, family=task_definition_arn).get("taskArns")
 
 
@@ -1,5 +1,5 @@
-import boto3
-import copy
+from ...boto_client import boto_client
+import concurrent.futures
 import re
 from typing import Callable, Optional, Union
 # TODO: Included here until we get utils PR-236 approved/merged/pushed
@@ -7,8 +7,14 @@ from typing import Callable, Optional, Union
 from .misc_utils import keys_and_values_to_dict
 from dcicutils.function_cache_decorator import function_cache
 from dcicutils.obfuscation_utils import obfuscate_dict
+from .cache_utils import ttl_function_cache
 from .misc_utils import sort_dictionary_by_case_insensitive_keys
 
+# The network (VPCs with their Subnets and Security Groups) assembled by aws_get_network is cached for
+# this long; and for AWS_NETWORK_CACHE_STALE_SECONDS longer the cached value is returned while refreshed.
+AWS_NETWORK_CACHE_TTL_SECONDS = 5 * 60
+AWS_NETWORK_CACHE_STALE_SECONDS = 30 * 60
+
 
 def _filter_boto_description_list(description: dict,
                                   name: str,
@@ -126,6 +132,20 @@ def _create_tags_dictionary(tags: list) -> dict:
     return sort_dictionary_by_case_insensitive_keys(obfuscate_dict(keys_and_values_to_dict(tags)))
 
 
+def _describe_ec2(ec2, operation: str, name: str, **kwargs) -> dict:
+    """
+    Returns the result of the given boto3 EC2 "describe" operation (e.g. describe_vpcs), with the given
+    arguments, as a dictionary with the given property name (e.g. Vpcs) containing the list of items from
+    ALL pages of the result (a single describe call may not return all items); i.e. like the result of a
+    single (unpaged) call to the describe operation. Uses the given EC2 client or creates one if None.
+    """
+    ec2 = ec2 or boto_client("ec2")
+    items = []
+    for page in ec2.get_paginator(operation).paginate(**kwargs):
+        items.extend(page.get(name) or [])
+    return {name: items}
+
+
 @function_cache
 def aws_get_vpcs(predicate: Optional[Union[str, re.Pattern, Callable]] = None, raw: bool = False) -> list:
     """
@@ -144,6 +164,11 @@ def aws_get_vpcs(predicate: Optional[Union[str, re.Pattern, Callable]] = None, r
     :returns: List of matching (based on predicate) AWS VPC objects.
     :raises Exception: On any error.
     """
+    return _aws_get_vpcs(predicate, raw)
+
+
+def _aws_get_vpcs(predicate: Optional[Union[str, re.Pattern, Callable]] = None, raw: bool = False,
+                  ec2: Optional[object] = None) -> list:
     def create_record(tag: str, item: dict) -> dict:
         #
         # Example record from boto3.describe_vpcs:
@@ -209,8 +234,7 @@ def aws_get_vpcs(predicate: Optional[Union[str, re.Pattern, Callable]] = None, r
             "status": item.get("State"),
             "tags": tags
         }
-    ec2 = boto3.client("ec2")
-    vpcs = ec2.describe_vpcs()
+    vpcs = _describe_ec2(ec2, "describe_vpcs", "Vpcs")
     vpcs = _filter_boto_description_list(vpcs, "Vpcs", predicate, create_record if not raw else None)
     return vpcs
 
@@ -235,6 +259,11 @@ def aws_get_subnets(predicate: Optional[Union[str, re.Pattern, Callable]] = None
     :returns: List of matching (based on predicate) AWS Subnet objects.
     :raises Exception: On any error.
     """
+    return _aws_get_subnets(predicate, vpc_id, raw)
+
+
+def _aws_get_subnets(predicate: Optional[Union[str, re.Pattern, Callable]] = None,
+                     vpc_id: Optional[str] = None, raw: bool = False, ec2: Optional[object] = None) -> list:
     def create_record(tag: str, item: dict) -> dict:
         #
         # Example record from boto3.describe_subnets:
@@ -311,8 +340,7 @@ def aws_get_subnets(predicate: Optional[Union[str, re.Pattern, Callable]] = None
             "status": item.get("State"),
             "tags": tags
         }
-    ec2 = boto3.client("ec2")
-    subnets = ec2.describe_subnets()
+    subnets = _describe_ec2(ec2, "describe_subnets", "Subnets")
     subnets = _filter_boto_description_list(subnets, "Subnets", predicate, create_record if not raw else None)
     if vpc_id:
         vpc_property = "vpc" if not raw else "VpcId"
@@ -340,6 +368,11 @@ def aws_get_security_groups(predicate: Optional[Union[str, re.Pattern, Callable]
     :returns: List of matching (based on predicate) AWS Security Group objects.
     :raises Exception: On any error.
     """
+    return _aws_get_security_groups(predicate, vpc_id, raw)
+
+
+def _aws_get_security_groups(predicate: Optional[Union[str, re.Pattern, Callable]] = None,
+                             vpc_id: Optional[str] = None, raw: bool = False, ec2: Optional[object] = None) -> list:
     def create_record(tag: str, item: dict) -> dict:
         #
         # Example record from boto3.describe_subnets:
@@ -426,8 +459,7 @@ def aws_get_security_groups(predicate: Optional[Union[str, re.Pattern, Callable]
             "vpc": item.get("VpcId"),
             "tags": tags
         }
-    ec2 = boto3.client("ec2")
-    security_groups = ec2.describe_security_groups()
+    security_groups = _describe_ec2(ec2, "describe_security_groups", "SecurityGroups")
     security_groups = _filter_boto_description_list(security_groups, "SecurityGroups", predicate,
                                                     create_record if not raw else None)
     if vpc_id:
@@ -473,9 +505,9 @@ def aws_get_security_group_rules(security_group_id: str, direction: Optional[str
             "description": item.get("Description"),
             "owner": item.get("GroupOwnerId")
         }
-    ec2 = boto3.client("ec2")
     filters = [{"Name": "group-id", "Values": [security_group_id]}]
-    security_group_rules = ec2.describe_security_group_rules(Filters=filters)["SecurityGroupRules"]
+    security_group_rules = _describe_ec2(None, "describe_security_group_rules", "SecurityGroupRules",
+                                         Filters=filters)["SecurityGroupRules"]
     if direction == "inbound":
         security_group_rules = [security_group_rule for security_group_rule in security_group_rules
                                 if security_group_rule.get("IsEgress") is False]
@@ -487,7 +519,7 @@ def aws_get_security_group_rules(security_group_id: str, direction: Optional[str
     return security_group_rules
 
 
-@function_cache
+@ttl_function_cache(ttl=AWS_NETWORK_CACHE_TTL_SECONDS, stale=AWS_NETWORK_CACHE_STALE_SECONDS)
 def aws_get_network(predicate: Optional[Union[str, re.Pattern, Callable]] = None, raw: bool = False) -> list:
     """
     Returns AWS network info, i.e. WRT VPCs, Subnets, and Security Groups, whose tags match the given predicate
@@ -500,13 +532,23 @@ def aws_get_network(predicate: Optional[Union[str, re.Pattern, Callable]] = None
     :returns: List of matching (based on predicate) AWS VPC, Subnet, and Security Group objects.
     :raises Exception: On any error.
     """
-    vpcs = aws_get_vpcs(predicate, raw)
-    vpcs = copy.deepcopy(vpcs)  # Copy because we're going to modify and it's cached.
-    subnets = aws_get_subnets(predicate, None, raw)
-    sgs = aws_get_security_groups(predicate, None, raw)
+    # Note we get these directly (not via the cached aws_get_vpcs, et cetera) as this itself is cached,
+    # with a TTL; and concurrently, sharing one EC2 client, which is thread-safe.
+    ec2 = boto_client("ec2")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        vpcs = executor.submit(_aws_get_vpcs, predicate, raw, ec2)
+        subnets = executor.submit(_aws_get_subnets, predicate, None, raw, ec2)
+        sgs = executor.submit(_aws_get_security_groups, predicate, None, raw, ec2)
+        vpcs, subnets, sgs = vpcs.result(), subnets.result(), sgs.result()
     vpc_property = "vpc" if not raw else "VpcId"
     id_property = "id" if not raw else "VpcId"
+    subnets_by_vpc = {}
+    for subnet in subnets:
+        subnets_by_vpc.setdefault(subnet.get(vpc_property), []).append(subnet)
+    sgs_by_vpc = {}
+    for sg in sgs:
+        sgs_by_vpc.setdefault(sg.get(vpc_property), []).append(sg)
     for vpc in vpcs:
-        vpc["subnets"] = [subnet for subnet in subnets if subnet[vpc_property] == vpc[id_property]]
-        vpc["security_groups"] = [sg for sg in sgs if sg[vpc_property] == vpc[id_property]]
+        vpc["subnets"] = subnets_by_vpc.get(vpc[id_property], [])
+        vpc["security_groups"] = sgs_by_vpc.get(vpc[id_property], [])
     return vpcs
@@ -21,24 +21,72 @@ class AwsS3:
 
     @classmethod
     def get_bucket_keys(cls, bucket_name: str) -> list:
+        """
+        Returns the first page (BUCKET_KEYS_DEFAULT_LIMIT) of keys in the given bucket;
+        see get_bucket_keys_page for paging through all of the keys of a bucket.
+        """
         results = []
         try:
-            s3 = boto_s3_client()
-            bucket_keys = s3.list_objects(Bucket=bucket_name)
-            if bucket_keys:
-                bucket_keys = bucket_keys.get("Contents")
-                if bucket_keys:
-                    for bucket_key in sorted(bucket_keys, key=lambda item: item["Key"]):
-                        results.append({
-                            "key": bucket_key["Key"],
-                            "size": bucket_key["Size"],
-                            "modified": convert_datetime_to_utc_datetime_string(bucket_key["LastModified"])
-                        })
-
+            results = cls.get_bucket_keys_page(bucket_name)["keys"]
         except Exception as e:
             logger.error(f"Exception getting S3 bucket key list: {e}")
         return results
 
+    # The maximum number of keys S3 returns per list_objects_v2 call is 1000.
+    BUCKET_KEYS_PAGE_SIZE = 1000
+    BUCKET_KEYS_DEFAULT_LIMIT = 1000
+    BUCKET_KEYS_MAX_LIMIT = 10000
+
+    @classmethod
+    def get_bucket_keys_page(cls, bucket_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                             limit: int = BUCKET_KEYS_DEFAULT_LIMIT, token: Optional[str] = None) -> dict:
+        """
+        Returns a page of (at most the given limit number of) keys in the given bucket, starting after
+        the given (continuation) token, if any. Only keys starting with the given prefix are included,
+        if given; and if the given delimiter is given (e.g. "/") then keys containing the delimiter
+        after the prefix are rolled up into "folders", i.e. the distinct key prefixes up to and including
+        the delimiter; note that the limit counts both keys and folders. Keys (and folders) are in key
+        (UTF-8 binary) order, as returned by S3. The returned next_token (S3 continuation token) is to be
+        passed (as the token argument) to get the next page; it is None if there are no more keys.
+        Raises an exception on error.
+        """
+        limit = max(1, min(limit, cls.BUCKET_KEYS_MAX_LIMIT))
+        s3 = boto_s3_client()
+        folders = []
+        keys = []
+        next_token = token
+        while True:
+            page_size = min(limit - len(folders) - len(keys), cls.BUCKET_KEYS_PAGE_SIZE)
+            kwargs = {"Bucket": bucket_name, "MaxKeys": page_size}
+            if prefix:
+                kwargs["Prefix"] = prefix
+            if delimiter:
+                kwargs["Delimiter"] = delimiter
+            if next_token:
+                kwargs["ContinuationToken"] = next_token
+            response = s3.list_objects_v2(**kwargs)
+            folders.extend(folder["Prefix"] for folder in response.get("CommonPrefixes") or [])
+            for bucket_key in response.get("Contents") or []:
+                keys.append({
+                    "key": bucket_key["Key"],
+                    "size": bucket_key["Size"],
+                    "modified": convert_datetime_to_utc_datetime_string(bucket_key["LastModified"])
+                })
+            next_token = response.get("NextContinuationToken") if response.get("IsTruncated") else None
+            if not next_token or len(folders) + len(keys) >= limit:
+                break
+        return {
+            "bucket": bucket_name,
+            "prefix": prefix,
+            "delimiter": delimiter,
+            "folders": folders,
+            "keys": keys,
+            "count": len(folders) + len(keys),
+            "limit": limit,
+            "token": token,
+            "next_token": next_token
+        }
+
     SHOW_BUCKET_KEY_CONTENT_MAX_SIZE_BYTES = 50000
 
     @classmethod
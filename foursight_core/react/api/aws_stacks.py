@@ -1,46 +1,52 @@
-import boto3
+from ...boto_client import boto_client
+from .cache_utils import ttl_function_cache
 from .datetime_utils import convert_datetime_to_utc_datetime_string
 from .yaml_utils import load_yaml
 from collections import OrderedDict
-from dcicutils.function_cache_decorator import function_cache
 from dcicutils.obfuscation_utils import obfuscate_dict
 from typing import Optional, Union
 
 
 _STACK_NAME_PREFIX = "c4-"
+# The list of stacks is cached only briefly so that it reflects deploys reasonably promptly.
+AWS_STACKS_CACHE_TTL_SECONDS = 60
+# Stack resources and templates are cached by stack name AND stack version (see _get_aws_stack_version),
+# which is revalidated on each call via a (cheap) describe_stacks; so these are refetched only when the
+# stack actually changes (is updated); this long ttl just bounds the lifetime of entries for stale versions.
+AWS_STACK_DETAILS_CACHE_TTL_SECONDS = 24 * 60 * 60
 
 
-@function_cache
+@ttl_function_cache(ttl=AWS_STACKS_CACHE_TTL_SECONDS)
 def aws_get_stacks() -> list:
     """
     Returns the list of all known AWS CloudFormation stacks with various metadata.
     """
     def stack_id(element):
-        return element.name
+        return element["StackName"]
     stacks_info = []
-    cf = boto3.resource("cloudformation")
-    for stack in sorted(cf.stacks.all(), key=stack_id):
-        if stack.name.startswith(_STACK_NAME_PREFIX):
+    cf = boto_client("cloudformation")
+    stacks = [stack for page in cf.get_paginator("describe_stacks").paginate() for stack in page.get("Stacks", [])]
+    for stack in sorted(stacks, key=stack_id):
+        if stack["StackName"].startswith(_STACK_NAME_PREFIX):
             stacks_info.append(_create_aws_stack_info(stack))
     return stacks_info
 
 
-def _create_aws_stack_info(stack: object):
+def _create_aws_stack_info(stack: dict):
     """
-    Returns the given boto3 format AWS stack info in our canonical form.
+    Returns the given boto3 (describe_stacks) format AWS stack info in our canonical form.
     """
     return {
-        "name": stack.name,
-        "id": stack.stack_id,
-        "description": stack.description,
-        "role_arn": stack.role_arn,
-        "status": stack.stack_status,
-        "updated": convert_datetime_to_utc_datetime_string(stack.last_updated_time),
-        "created": convert_datetime_to_utc_datetime_string(stack.creation_time)
+        "name": stack.get("StackName"),
+        "id": stack.get("StackId"),
+        "description": stack.get("Description"),
+        "role_arn": stack.get("RoleARN"),
+        "status": stack.get("StackStatus"),
+        "updated": convert_datetime_to_utc_datetime_string(stack.get("LastUpdatedTime")),
+        "created": convert_datetime_to_utc_datetime_string(stack.get("CreationTime"))
     }
 
 
-@function_cache
 def aws_get_stack(stack_name_or_object: Union[str, object]) -> dict:
     """
     Returns all detailed info for the given AWS CloudFormation stack name,
@@ -48,80 +54,106 @@ def aws_get_stack(stack_name_or_object: Union[str, object]) -> dict:
     Output and parameter values are obfuscated if their names represents a sensitive value.
     """
     result = {}
-    stack = _get_aws_stack_object(stack_name_or_object)
+    stack = _describe_aws_stack(stack_name_or_object)
     if stack:
         result = _create_aws_stack_info(stack)
-        outputs = aws_get_stack_outputs(stack)
-        parameters = aws_get_stack_parameters(stack)
-        resources = aws_get_stack_resources(stack)
+        # The outputs and parameters come along with the describe_stacks info; only the resources need
+        # another AWS call, and that only if the stack has changed since they were last (cached) fetched.
+        outputs = _get_aws_stack_outputs(stack)
+        parameters = _get_aws_stack_parameters(stack)
+        resources = _aws_get_stack_resources(stack["StackName"], _get_aws_stack_version(stack))
         result["outputs"] = outputs
         result["parameters"] = parameters
         result["resources"] = resources
     return result
 
 
-@function_cache
 def aws_get_stack_outputs(stack_name_or_object: Union[str, object]) -> dict:
     """
     Returns the name/value outputs for the given AWS CloudFormation stack name.
     Output values are obfuscated if the output name represents a sensitive value.
     """
+    return _get_aws_stack_outputs(_describe_aws_stack(stack_name_or_object))
+
+
+def _get_aws_stack_outputs(stack: Optional[dict]) -> dict:
     def output_id(element):
         return element["OutputKey"]
     result = {}
-    stack = _get_aws_stack_object(stack_name_or_object)
-    if stack and stack.outputs:
-        for stack_output in sorted(stack.outputs, key=output_id):
+    if stack and stack.get("Outputs"):
+        for stack_output in sorted(stack["Outputs"], key=output_id):
             result[stack_output.get("OutputKey")] = stack_output.get("OutputValue")
     return _obfuscate(result)
 
 
-@function_cache
 def aws_get_stack_parameters(stack_name_or_object: Union[str, object]) -> dict:
     """
     Returns a name/value dictionary of the parameters for the given AWS CloudFormation stack name.
     Parameter values are obfuscated if the parameter name represents a sensitive value.
     """
+    return _get_aws_stack_parameters(_describe_aws_stack(stack_name_or_object))
+
+
+def _get_aws_stack_parameters(stack: Optional[dict]) -> dict:
     def parameter_id(element):
         return element["ParameterKey"]
     result = {}
-    stack = _get_aws_stack_object(stack_name_or_object)
-    if stack and stack.parameters:
-        for stack_parameter in sorted(stack.parameters, key=parameter_id):
+    if stack and stack.get("Parameters"):
+        for stack_parameter in sorted(stack["Parameters"], key=parameter_id):
             result[stack_parameter.get("ParameterKey")] = stack_parameter.get("ParameterValue")
     return _obfuscate(result)
 
 
-@function_cache
 def aws_get_stack_resources(stack_name_or_object: Union[str, object]) -> dict:
     """
     Returns a name/value dictionary of the resources for the given AWS CloudFormation stack name.
     """
+    stack = _describe_aws_stack(stack_name_or_object)
+    if not stack:
+        return {}
+    return _aws_get_stack_resources(stack["StackName"], _get_aws_stack_version(stack))
+
+
+@ttl_function_cache(ttl=AWS_STACK_DETAILS_CACHE_TTL_SECONDS)
+def _aws_get_stack_resources(stack_name: str, stack_version: str) -> dict:
     def resource_id(element):
-        return element.logical_resource_id
+        return element["LogicalResourceId"]
     result = {}
-    stack = _get_aws_stack_object(stack_name_or_object)
-    if stack:
-        for stack_resource in sorted(list(stack.resource_summaries.all()), key=resource_id):
-            result[stack_resource.logical_resource_id] = stack_resource.resource_type
+    cf = boto_client("cloudformation")
+    stack_resources = [stack_resource
+                       for page in cf.get_paginator("list_stack_resources").paginate(StackName=stack_name)
+                       for stack_resource in page.get("StackResourceSummaries", [])]
+    for stack_resource in sorted(stack_resources, key=resource_id):
+        result[stack_resource["LogicalResourceId"]] = stack_resource.get("ResourceType")
     return _obfuscate(result)
 
 
-def _get_aws_stack_object(stack_name_or_object: Union[str, object]) -> Optional[object]:
+def _describe_aws_stack(stack_name_or_object: Union[str, object]) -> Optional[dict]:
     """
-    Returns the boto3 Cloudformation stack object for the given stack name, if the given argument
-    is a string, or if the given argument is already a boto3 stack object, then return that value.
+    Returns the boto3 (describe_stacks) format info for the given stack name, if the given argument
+    is a string, or for the name of the given boto3 stack object. This is a single (cheap) AWS call,
+    which includes the stack outputs and parameters, and is what we use to revalidate our cached
+    stack details (resources and template), by stack version (see _get_aws_stack_version).
     :param stack_name_or_object: String representing Cloudformation stack name or boto3 stack object.
-    :returns: The boto3 Cloudformation stack object or None if not found.
+    :returns: The boto3 Cloudformation stack info (dictionary) or None if not found.
     """
     if type(stack_name_or_object).__name__ == "cloudformation.Stack":
-        return stack_name_or_object
+        stack_name_or_object = stack_name_or_object.name
     elif not isinstance(stack_name_or_object, str):
         return None
-    cf = boto3.resource("cloudformation")
-    stack = list(cf.stacks.filter(StackName=stack_name_or_object))
+    cf = boto_client("cloudformation")
+    stack = cf.describe_stacks(StackName=stack_name_or_object).get("Stacks", [])
     return get_single_item_list_value(stack)
-    # return stack[0] if len(stack) == 1 else None
+
+
+def _get_aws_stack_version(stack: dict) -> str:
+    """
+    Returns a value identifying the current version of the given boto3 (describe_stacks) format
+    stack info; this changes whenever the stack is updated (or deleted and recreated), and while
+    the update is in progress (via the status), after which its resources and template may differ.
+    """
+    updated = stack.get("LastUpdatedTime") or stack.get("CreationTime")
+    return f"{stack.get('StackId')}|{stack.get('StackStatus')}|{updated.isoformat() if updated else ''}"
 
 
 def get_single_item_list_value(any_list: list) -> object:
@@ -130,13 +162,18 @@ def get_single_item_list_value(any_list: list) -> object:
     return any_list[0]
 
 
-@function_cache
 def aws_get_stack_template(stack_name: str) -> dict:
     """
     Returns the AWS Cloudformation template as a dictionary for the given stack name.
     The entire template will be obfuscated according to the obfuscate_dict function.
     """
-    cf = boto3.client("cloudformation")
+    stack = _describe_aws_stack(stack_name)
+    return _aws_get_stack_template(stack["StackName"], _get_aws_stack_version(stack))
+
+
+@ttl_function_cache(ttl=AWS_STACK_DETAILS_CACHE_TTL_SECONDS)
+def _aws_get_stack_template(stack_name: str, stack_version: str) -> dict:
+    cf = boto_client("cloudformation")
     stack_template = cf.get_template(StackName=stack_name)
     stack_template_body = stack_template["TemplateBody"]
     if isinstance(stack_template_body, dict) or isinstance(stack_template_body, OrderedDict):
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Optional
+from dcicutils.misc_utils import get_error_message
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+# Global list of all @ttl_function_cache decorated function wrappers; for ttl_function_cache_info/clear.
+_ttl_function_cache_list = []
+
+
+def ttl_function_cache(ttl: int, stale: int = 0, maxsize: int = 256,
+                       key: Optional[Callable] = None, nocache_none: bool = False) -> Callable:
+    """
+    Decorator to cache the results of a function, like dcicutils.function_cache_decorator.function_cache,
+    but whose cached values expire after the given ttl (time to live) seconds; and if the stale argument
+    is given then for that many more seconds past the ttl the (stale) cached value is still returned,
+    and a refresh of the value is started in the background (stale-while-revalidate), so that callers
+    do not pay the latency of refetching the value. At most maxsize values are cached (least recently
+    used evicted first). The key argument is an optional callable, passed the same arguments as the
+    decorated function, to compute the cache key; by default this is the arguments themselves.
+    If nocache_none is True then None values are not cached. Hit/miss/latency statistics are
+    available via the cache_info function of the decorated function, or ttl_function_cache_info.
+
+    Note that in AWS Lambda background refreshes only run while an invocation is active,
+    so a refresh might not complete until a subsequent request; which is fine here.
+    """
+    def ttl_function_cache_decorator(wrapped_function: Callable) -> Callable:
+
+        cache = OrderedDict()
+        lock = threading.Lock()
+        refreshing = set()
+        stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0,
+                 "duration_total": 0.0, "duration_max": 0.0, "updated": None}
+
+        def call(cache_key: Any, args: tuple, kwargs: dict) -> Any:
+            started = time.monotonic()
+            value = wrapped_function(*args, **kwargs)
+            duration = time.monotonic() - started
+            with lock:
+                stats["duration_total"] += duration
+                stats["duration_max"] = max(stats["duration_max"], duration)
+                stats["updated"] = datetime.datetime.now()
+                if value is not None or not nocache_none:
+                    cache[cache_key] = (value, time.monotonic())
+                    cache.move_to_end(cache_key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return value
+
+        def refresh(cache_key: Any, args: tuple, kwargs: dict) -> None:
+            try:
+                call(cache_key, args, kwargs)
+                with lock:
+                    stats["refreshes"] += 1
+            except Exception as e:
+                # Keep serving the stale value; it expires on its own if refreshes keep failing.
+                with lock:
+                    stats["errors"] += 1
+                logger.warning(f"Error refreshing cached value for {_get_function_name(wrapped_function)}:"
+                               f" {get_error_message(e)}")
+            finally:
+                with lock:
+                    refreshing.discard(cache_key)
+
+        def function_wrapper(*args, **kwargs) -> Any:
+            cache_key = key(*args, **kwargs) if key else args + tuple(sorted(kwargs.items()))
+            with lock:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    value, timestamp = cached
+                    age = time.monotonic() - timestamp
+                    if age <= ttl:
+                        stats["hits"] += 1
+                        cache.move_to_end(cache_key)
+                        return value
+                    if age <= ttl + stale:
+                        stats["stale_hits"] += 1
+                        cache.move_to_end(cache_key)
+                        if cache_key not in refreshing:
+                            refreshing.add(cache_key)
+                            threading.Thread(target=refresh, args=(cache_key, args, kwargs), daemon=True).start()
+                        return value
+                stats["misses"] += 1
+            return call(cache_key, args, kwargs)
+
+        def cache_info() -> dict:
+            with lock:
+                calls = stats["misses"] + stats["refreshes"] + stats["errors"]
+                return {
+                    "name": _get_function_name(wrapped_function),
+                    "hits": stats["hits"],
+                    "stale_hits": stats["stale_hits"],
+                    "misses": stats["misses"],
+                    "refreshes": stats["refreshes"],
+                    "refresh_errors": stats["errors"],
+                    "size": len(cache),
+                    "maxsize": maxsize,
+                    "ttl": ttl,
+                    "stale": stale,
+                    "updated": stats["updated"].strftime("%Y-%m-%d %H:%M:%S") if stats["updated"] else None,
+                    # Durations (latency) of calls to the wrapped function, in milliseconds.
+                    "duration_avg": stats["duration_total"] * 1000 / calls if calls else None,
+                    "duration_max": stats["duration_max"] * 1000
+                }
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+                for name in stats:
+                    stats[name] = 0.0 if name.startswith("duration") else (None if name == "updated" else 0)
+
+        function_wrapper.cache_info = cache_info
+        function_wrapper.cache_clear = cache_clear
+        _ttl_function_cache_list.append(function_wrapper)
+        return function_wrapper
+
+    return ttl_function_cache_decorator
+
+
+def _get_function_name(wrapped_function: Callable) -> str:
+    return f"{wrapped_function.__module__}.{wrapped_function.__qualname__}"
+
+
+def ttl_function_cache_info() -> List[dict]:
+    """
+    Returns a list of dictionaries with the info/stats of all @ttl_function_cache decorated functions.
+    """
+    return sorted([function_wrapper.cache_info() for function_wrapper in _ttl_function_cache_list],
+                  key=lambda item: item["name"])
+
+
+def ttl_function_cache_clear(function_name: Optional[str] = None) -> int:
+    """
+    Clears the cache for the given named function (as per ttl_function_cache_info), OR for
+    ALL @ttl_function_cache decorated functions if no name given. Returns the number of caches cleared.
+    """
+    ncleared = 0
+    for function_wrapper in _ttl_function_cache_list:
+        if not function_name or function_wrapper.cache_info()["name"] == function_name:
+            function_wrapper.cache_clear()
+            ncleared += 1
+    return ncleared
@@ -0,0 +1,199 @@
+import datetime
+import re
+from typing import Iterable, List, Optional
+from .datetime_utils import convert_time_t_to_utc_datetime_string
+
+CHECK_ANALYTICS_DEFAULT_INTERVAL = "1d"
+CHECK_ANALYTICS_DEFAULT_DAYS = 30
+CHECK_ANALYTICS_MAX_DAYS = 366
+CHECK_ANALYTICS_MAX_BUCKETS = 2000
+CHECK_ANALYTICS_PERCENTS = [50.0, 90.0, 95.0, 99.0]
+# Statuses considered failures for failure streaks and recovery time; any other status is a recovery.
+CHECK_FAILURE_STATUSES = ["FAIL", "ERROR"]
+# Number of result objects fetched (concurrently) from S3 at a time, when ES is not available.
+_S3_RESULTS_BATCH_SIZE = 100
+_INTERVAL_UNITS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+_UUID_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def parse_interval(interval: str) -> int:
+    """
+    Returns the number of seconds of the given interval string, which looks like 30m, 6h, or 1d
+    (i.e. the same as an ES fixed_interval in minutes, hours, or days). Raises ValueError if malformed.
+    """
+    match = re.fullmatch(r"([1-9][0-9]*)([mhd])", interval or "")
+    if not match:
+        raise ValueError(f"Invalid analytics interval: {interval} (expected like 30m, 6h, or 1d).")
+    return int(match.group(1)) * _INTERVAL_UNITS[match.group(2)]
+
+
+def get_check_analytics(connection, check: str,
+                        interval: str = CHECK_ANALYTICS_DEFAULT_INTERVAL,
+                        days: int = CHECK_ANALYTICS_DEFAULT_DAYS,
+                        now: Optional[datetime.datetime] = None) -> dict:
+    """
+    Returns analytics for the results of the given check (name) over the past given number of days:
+    counts by status, overall and per time bucket of the given interval (see parse_interval); runtime
+    (kwargs.runtime_seconds) stats and percentiles; failure streaks (consecutive FAIL/ERROR results);
+    and the mean time to recovery (from the first failure of a streak to the next non-failure result).
+    Uses ES aggregations if ES is available (percentiles are then approximate, as computed by ES);
+    otherwise streams through the S3 results, never holding more than a batch of them at once.
+    Raises ValueError if the interval is malformed or would result in too many buckets.
+    """
+    interval_seconds = parse_interval(interval)
+    days = max(1, min(days, CHECK_ANALYTICS_MAX_DAYS))
+    if (days * 24 * 60 * 60) // interval_seconds > CHECK_ANALYTICS_MAX_BUCKETS:
+        raise ValueError(f"Analytics interval {interval} is too small for {days} days.")
+    since = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=days)
+    since = since.strftime(_UUID_FORMAT)
+    if connection.connections["es"] is not None:
+        analytics = _get_check_analytics_from_es(connection.connections["es"], check, since, interval)
+    else:
+        analytics = _get_check_analytics_from_s3(connection.connections["s3"], check, since, interval_seconds)
+    return {"check": check, "interval": interval, "days": days, "since": since, **analytics}
+
+
+def _get_check_analytics_from_es(es, check: str, since: str, interval: str) -> dict:
+    aggregations = es.get_result_analytics(check, since, interval, CHECK_ANALYTICS_PERCENTS)
+
+    def status_counts(aggregation: dict) -> dict:
+        return {bucket["key"]: bucket["doc_count"] for bucket in aggregation.get("buckets", [])}
+
+    buckets = [{
+        "timestamp": convert_time_t_to_utc_datetime_string(bucket["key"] // 1000),
+        "total": bucket["doc_count"],
+        "status_counts": status_counts(bucket.get("statuses", {}))
+    } for bucket in aggregations.get("buckets", {}).get("buckets", [])]
+    runtime_stats = aggregations.get("runtime_stats", {})
+    runtime_percentiles = aggregations.get("runtime_percentiles", {}).get("values", {})
+    statuses = status_counts(aggregations.get("statuses", {}))
+    failures = CheckFailureStreaks()
+    for uuid, status in es.iter_result_statuses(check, since):
+        failures.add(uuid, status)
+    return {
+        "source": "es",
+        "total": sum(statuses.values()),
+        "status_counts": statuses,
+        "buckets": buckets,
+        "runtime": {
+            "count": runtime_stats.get("count", 0),
+            "min": runtime_stats.get("min"),
+            "max": runtime_stats.get("max"),
+            "avg": runtime_stats.get("avg"),
+            "percentiles": {str(float(percent)): value for percent, value in runtime_percentiles.items()}
+        },
+        **failures.to_dict()
+    }
+
+
+def _get_check_analytics_from_s3(s3, check: str, since: str, interval_seconds: int) -> dict:
+    # Result keys look like: <check-name>/<uuid>.json, where uuid is an ISO timestamp,
+    # so these keys serve as an index of the results by time without fetching them.
+    prefix = check + "/"
+    keys = [key for key in s3.list_all_keys_w_prefix(check, records_only=True) if key[len(prefix):-5] >= since]
+    keys.sort()
+    statuses = {}
+    buckets = {}
+    runtimes = []
+    failures = CheckFailureStreaks()
+    for batch in _batches(keys, _S3_RESULTS_BATCH_SIZE):
+        for key, result in zip(batch, s3.get_objects(batch)):
+            if not isinstance(result, dict):
+                continue
+            uuid = key[len(prefix):-5]
+            status = result.get("status", "Not found")
+            statuses[status] = statuses.get(status, 0) + 1
+            bucket_time = _uuid_to_time_t(uuid) // interval_seconds * interval_seconds
+            bucket = buckets.setdefault(bucket_time, {})
+            bucket[status] = bucket.get(status, 0) + 1
+            runtime = (result.get("kwargs") or {}).get("runtime_seconds")
+            if isinstance(runtime, (int, float)):
+                runtimes.append(runtime)
+            failures.add(uuid, status)
+    runtimes.sort()
+    return {
+        "source": "s3",
+        "total": sum(statuses.values()),
+        "status_counts": statuses,
+        "buckets": [{
+            "timestamp": convert_time_t_to_utc_datetime_string(bucket_time),
+            "total": sum(buckets[bucket_time].values()),
+            "status_counts": buckets[bucket_time]
+        } for bucket_time in sorted(buckets)],
+        "runtime": {
+            "count": len(runtimes),
+            "min": runtimes[0] if runtimes else None,
+            "max": runtimes[-1] if runtimes else None,
+            "avg": sum(runtimes) / len(runtimes) if runtimes else None,
+            "percentiles": {str(percent): percentile(runtimes, percent) for percent in CHECK_ANALYTICS_PERCENTS}
+        },
+        **failures.to_dict()
+    }
+
+
+class CheckFailureStreaks:
+    """
+    Accumulates failure streaks and recovery times from the statuses of a sequence
+    of check results, which must be added in ascending order by their uuid (timestamp).
+    """
+    def __init__(self) -> None:
+        self._streaks = 0
+        self._longest_streak = 0
+        self._current_streak = 0
+        self._failed_since = None
+        self._recoveries = 0
+        self._recovery_seconds = 0.0
+
+    def add(self, uuid: str, status: str) -> None:
+        if status in CHECK_FAILURE_STATUSES:
+            if self._current_streak == 0:
+                self._streaks += 1
+                self._failed_since = uuid
+            self._current_streak += 1
+            self._longest_streak = max(self._longest_streak, self._current_streak)
+        elif self._current_streak > 0:
+            self._current_streak = 0
+            if self._failed_since and uuid:
+                self._recoveries += 1
+                self._recovery_seconds += (_uuid_to_datetime(uuid) -
+                                           _uuid_to_datetime(self._failed_since)).total_seconds()
+            self._failed_since = None
+
+    def to_dict(self) -> dict:
+        return {
+            "failures": {
+                "streaks": self._streaks,
+                "longest_streak": self._longest_streak,
+                "current_streak": self._current_streak
+            },
+            "recovery": {
+                "count": self._recoveries,
+                "mean_seconds": self._recovery_seconds / self._recoveries if self._recoveries else None
+            }
+        }
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """
+    Returns the given percentile of the given (sorted) values, linearly interpolated between the closest
+    ranks (like numpy.percentile), which is what ES approximates; returns None if there are no values.
+    """
+    if not values:
+        return None
+    rank = (len(values) - 1) * percent / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def _batches(values: list, size: int) -> Iterable[list]:
+    for index in range(0, len(values), size):
+        yield values[index:index + size]
+
+
+def _uuid_to_datetime(uuid: str) -> datetime.datetime:
+    return datetime.datetime.strptime(uuid, _UUID_FORMAT)
+
+
+def _uuid_to_time_t(uuid: str) -> int:
+    return int(_uuid_to_datetime(uuid).replace(tzinfo=datetime.timezone.utc).timestamp())
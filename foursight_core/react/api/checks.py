@@ -1,24 +1,37 @@
-import boto3
 from chalice import Cron
+import concurrent.futures
 import copy
 import cron_descriptor
 import logging
 import os
 from typing import Callable, Optional
 from dcicutils.function_cache_decorator import function_cache
+from ...boto_client import boto_client
+from ...check_utils import CheckHandler
 from ...decorators import Decorators
+from .cache_utils import ttl_function_cache
 from .envs import Envs
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
 
+# The annotated lambdas (get_annotated_lambdas) are cached for this long, or until invalidated
+# (invalidate_annotated_lambdas) i.e. by reload_lambda; for LAMBDAS_CACHE_STALE_SECONDS longer
+# the cached value is returned while refreshed in the background.
+LAMBDAS_CACHE_TTL_SECONDS = 10 * 60
+LAMBDAS_CACHE_STALE_SECONDS = 60 * 60
+# Maximum number of concurrent lambda list_tags calls.
+LAMBDAS_TAGS_MAX_WORKERS = 8
+
 
 class Checks:
 
-    def __init__(self, check_setup, envs: Envs):
+    def __init__(self, check_setup, envs: Envs, check_display_index: Optional[dict] = None):
         self._check_setup_raw = check_setup
         self._check_setup = copy.deepcopy(check_setup)
         self._envs = envs
+        # See CheckHandler.build_check_display_index; normally shared with the CheckHandler.
+        self._check_display_index = check_display_index or CheckHandler.build_check_display_index(check_setup)
 
     def get_checks_raw(self) -> dict:
         """
@@ -154,25 +167,12 @@ class Checks:
         """
         if not env:
             return checks
-        checks_for_env = {}
-        for check_key in checks.keys():
-            included = False
-            if checks[check_key].get("schedule"):
-                for check_schedule_key in checks[check_key]["schedule"].keys():
-                    for check_env_key in checks[check_key]["schedule"][check_schedule_key].keys():
-                        if check_env_key == "all" or self._envs.is_same_env(check_env_key, env):
-                            included = True
-                            checks_for_env[check_key] = checks[check_key]
-            else:
-                # If no schedule section (which has the env section) then include it.
-                included = True
-                checks_for_env[check_key] = checks[check_key]
-            if not included:
-                if isinstance(checks[check_key].get("display"), list):
-                    for check_env_key in checks[check_key]["display"]:
-                        if check_env_key == "all" or self._envs.is_same_env(check_env_key, env):
-                            checks_for_env[check_key] = checks[check_key]
-        return checks_for_env
+        # If no schedule section (which has the env section) then include it.
+        displayed_checks = CheckHandler.get_displayed_checks(self._check_display_index, env,
+                                                             is_same_env=self._envs.is_same_env,
+                                                             include_unscheduled=True)
+        displayed_check_names = set().union(*displayed_checks.values())
+        return {check_key: check for check_key, check in checks.items() if check_key in displayed_check_names}
 
     def _annotate_checks_for_dependencies(self, checks: dict) -> None:
         """
@@ -230,7 +230,7 @@ class Checks:
             stack_name = self._get_stack_name()
             if not stack_name:
                 return {}
-        boto_cloudformation = boto3.client('cloudformation')
+        boto_cloudformation = boto_client('cloudformation')
         return boto_cloudformation.get_template(StackName=stack_name)
 
     @staticmethod
@@ -286,6 +286,9 @@ class Checks:
                 pass
             return False
 
+        lambdas_by_name = {}
+        for la in lambdas:
+            lambdas_by_name.setdefault(la["lambda_name"], []).append(la)
         stack_template = stack_template["TemplateBody"]["Resources"]
         for resource_key in stack_template:
             resource_type = stack_template[resource_key]["Type"]
@@ -305,18 +308,17 @@ class Checks:
                             else:
                                 event_target_function_name = event_target_function_arn[0]
                             if event_target_function_name:
-                                for la in lambdas:
-                                    if la["lambda_name"] == event_target_function_name:
-                                        event_schedule = str(event_schedule).replace("cron(", "").replace(")", "")
-                                        la["lambda_schedule"] = str(event_schedule)
-                                        if is_cron_schedule_never(event_schedule):
-                                            cron_description = "Never"
-                                        else:
-                                            cron_description = cron_descriptor.get_description(str(event_schedule))
-                                            if cron_description.startswith("At "):
-                                                cron_description = cron_description[3:]
-                                            cron_description = cron_description + " (UTC)"
-                                        la["lambda_schedule_description"] = cron_description
+                                for la in lambdas_by_name.get(event_target_function_name, []):
+                                    event_schedule = str(event_schedule).replace("cron(", "").replace(")", "")
+                                    la["lambda_schedule"] = str(event_schedule)
+                                    if is_cron_schedule_never(event_schedule):
+                                        cron_description = "Never"
+                                    else:
+                                        cron_description = cron_descriptor.get_description(str(event_schedule))
+                                        if cron_description.startswith("At "):
+                                            cron_description = cron_description[3:]
+                                        cron_description = cron_description + " (UTC)"
+                                    la["lambda_schedule_description"] = cron_description
         return lambdas
 
     @staticmethod
@@ -325,33 +327,42 @@ class Checks:
         Annotates and returns the given AWS lambdas list with various AWS lambda metadata,
         e.g. the function name and ARN, code size, role, and description.
         """
-        boto_lambda = boto3.client("lambda")
+        boto_lambda = boto_client("lambda")
         # lambda_functions = boto_lambda.list_functions()["Functions"]
         lambda_functions = Checks._get_all_lambda_functions()
-        for lambda_function in lambda_functions:
-            lambda_function_handler = lambda_function["Handler"]
-            for la in lambdas:
-                if la["lambda_handler"] == lambda_function_handler:
-                    la["lambda_function_name"] = lambda_function["FunctionName"]
-                    la["lambda_function_arn"] = lambda_function["FunctionArn"]
-                    la["lambda_code_size"] = lambda_function["CodeSize"]
-                    la["lambda_modified"] = lambda_function["LastModified"]
-                    la["lambda_description"] = lambda_function["Description"]
-                    la["lambda_role"] = lambda_function["Role"]
-                    #
-                    # Look for the real modified time which may be in the tag if we ever did a manual
-                    # reload of the lambda which will do its job by making an innocuous change to the
-                    # lambda (its description) but which also has the effect of changing its modified
-                    # time, so that process also squirrels away the real lambda modified time in a
-                    # tag called last_modified. See the reload_lambda function for details of this.
-                    try:
-                        lambda_function_tags = boto_lambda.list_tags(Resource=lambda_function["FunctionArn"])["Tags"]
-                        lambda_modified = lambda_function_tags.get("last_modified")
-                        if lambda_modified:
-                            la["lambda_modified"] = lambda_modified
-                    except Exception as e:
-                        logger.warning(f"Exception getting AWS lambdas info: {e}")
-                        pass
+        lambdas_by_handler = {}
+        for la in lambdas:
+            lambdas_by_handler.setdefault(la["lambda_handler"], []).append(la)
+        lambda_functions = [lambda_function for lambda_function in lambda_functions
+                            if lambda_function["Handler"] in lambdas_by_handler]
+
+        def get_lambda_function_tags(lambda_function: dict) -> dict:
+            try:
+                return boto_lambda.list_tags(Resource=lambda_function["FunctionArn"])["Tags"]
+            except Exception as e:
+                logger.warning(f"Exception getting AWS lambdas info: {e}")
+                return {}
+
+        # Get the tags for the lambdas concurrently; the (boto3) lambda client is thread-safe.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=LAMBDAS_TAGS_MAX_WORKERS) as executor:
+            lambda_functions_tags = list(executor.map(get_lambda_function_tags, lambda_functions))
+        for lambda_function, lambda_function_tags in zip(lambda_functions, lambda_functions_tags):
+            for la in lambdas_by_handler[lambda_function["Handler"]]:
+                la["lambda_function_name"] = lambda_function["FunctionName"]
+                la["lambda_function_arn"] = lambda_function["FunctionArn"]
+                la["lambda_code_size"] = lambda_function["CodeSize"]
+                la["lambda_modified"] = lambda_function["LastModified"]
+                la["lambda_description"] = lambda_function["Description"]
+                la["lambda_role"] = lambda_function["Role"]
+                #
+                # Look for the real modified time which may be in the tag if we ever did a manual
+                # reload of the lambda which will do its job by making an innocuous change to the
+                # lambda (its description) but which also has the effect of changing its modified
+                # time, so that process also squirrels away the real lambda modified time in a
+                # tag called last_modified. See the reload_lambda function for details of this.
+                lambda_modified = lambda_function_tags.get("last_modified")
+                if lambda_modified:
+                    la["lambda_modified"] = lambda_modified
         return lambdas
 
     @staticmethod
@@ -361,27 +372,41 @@ class Checks:
         """
         if not checks or not isinstance(checks, dict):
             return lambdas
+        lambdas_by_handler = Checks._get_lambdas_by_handler(lambdas)
         for check_name in checks:
             check_item = checks[check_name]
             check_item_schedule = check_item.get("schedule")
             if check_item_schedule:
                 for check_item_schedule_name in check_item_schedule.keys():
-                    for lambda_item in lambdas:
-                        if (lambda_item["lambda_handler"] == check_item_schedule_name
-                                or lambda_item["lambda_handler"] == "app." + check_item_schedule_name):
-                            if not lambda_item.get("lambda_checks"):
-                                lambda_item["lambda_checks"] = []
-                            lambda_item["lambda_checks"].append({
-                                "check_title": check_item.get("title"),
-                                "check_name": check_name,
-                                "check_group": check_item.get("group")
-                            })
+                    for lambda_item in lambdas_by_handler.get(check_item_schedule_name, []):
+                        if not lambda_item.get("lambda_checks"):
+                            lambda_item["lambda_checks"] = []
+                        lambda_item["lambda_checks"].append({
+                            "check_title": check_item.get("title"),
+                            "check_name": check_name,
+                            "check_group": check_item.get("group")
+                        })
         for lambda_item in lambdas:
             if lambda_item.get("lambda_checks"):
                 lambda_item["lambda_checks"].sort(key=lambda item: f"{item['check_group']}.{item['check_name']}")
         return lambdas
 
-    @function_cache
+    @staticmethod
+    def _get_lambdas_by_handler(lambdas: list) -> dict:
+        """
+        Returns a dictionary of the given lambdas (list) by lambda handler name, which is like app.some_handler,
+        each with a list of the lambdas with that handler; these are also keyed by the handler name without the
+        "app." prefix, which is how check schedules refer to them (see _annotate_lambdas_with_check_setup).
+        """
+        lambdas_by_handler = {}
+        for lambda_item in lambdas:
+            lambda_handler = lambda_item["lambda_handler"]
+            lambdas_by_handler.setdefault(lambda_handler, []).append(lambda_item)
+            if lambda_handler.startswith("app."):
+                lambdas_by_handler.setdefault(lambda_handler[4:], []).append(lambda_item)
+        return lambdas_by_handler
+
+    @ttl_function_cache(ttl=LAMBDAS_CACHE_TTL_SECONDS, stale=LAMBDAS_CACHE_STALE_SECONDS)
     def _get_annotated_lambdas(self) -> dict:
         stack_name = self._get_stack_name()
         stack_template = self._get_stack_template(stack_name)
@@ -391,13 +416,22 @@ class Checks:
         lambdas = self._annotate_lambdas_with_check_setup(lambdas, self._check_setup)
         return lambdas
 
-    @function_cache
     def get_annotated_lambdas(self, env: Optional[str] = None) -> dict:
         """
         Returns the dictionary of all AWS lambdas for our defined stack.
+        Cached (see _get_annotated_lambdas) except for the filtering part.
         """
         return self._filter_lambdas_by_env(self._get_annotated_lambdas(), env)
 
+    @staticmethod
+    def invalidate_annotated_lambdas() -> None:
+        """
+        Clears the cached annotated lambdas (see get_annotated_lambdas); e.g. after a lambda reload
+        which changes its modified time and description. Note this is only for this process (lambda
+        instance); others will pick up the changes when their cached values expire.
+        """
+        Checks._get_annotated_lambdas.cache_clear()
+
     def _filter_lambdas_by_env(self, lambdas: list, env: Optional[str] = None) -> list:
         """
         Filters the given list of lambda info by the given environment (i.e. just the
@@ -425,16 +459,15 @@ class Checks:
         """
         Annotates the given checks with the (cron) schedule from the given associated AWS lambdas.
         """
+        lambdas_by_handler = Checks._get_lambdas_by_handler(lambdas)
         for check_name in checks:
             check_item = checks[check_name]
             check_schedule = check_item.get("schedule")
             if check_schedule:
                 for check_schedule_name in check_schedule.keys():
-                    for la in lambdas:
-                        if (la["lambda_handler"] == check_schedule_name
-                                or la["lambda_handler"] == "app." + check_schedule_name):
-                            check_schedule[check_schedule_name]["cron"] = la["lambda_schedule"]
-                            check_schedule[check_schedule_name]["cron_description"] = la["lambda_schedule_description"]
+                    for la in lambdas_by_handler.get(check_schedule_name, []):
+                        check_schedule[check_schedule_name]["cron"] = la["lambda_schedule"]
+                        check_schedule[check_schedule_name]["cron_description"] = la["lambda_schedule_description"]
 
     @function_cache
     def get_registry(self) -> dict:
@@ -523,7 +556,7 @@ class Checks:
                         lambda_function_stack_name = lambda_function_environment_variables.get("STACK_NAME")
                         return lambda_function_stack_name == stack_name
             return False
-        boto_lambda = boto3.client("lambda")
+        boto_lambda = boto_client("lambda")
         results = []
         marker = None
         while True:
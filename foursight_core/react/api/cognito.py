@@ -1,13 +1,13 @@
 # AWS Cognito authentication support functions.
 
-# from cryptography.hazmat.backends.openssl.rsa import _RSAPublicKey as RSAPublicKey
-# The above import no longer works with cryptography version 43.0.1; only used for type hint.
-RSAPublicKey = object 
 import jwt as jwtlib
-from jwt import PyJWKClient
+from jwt import PyJWK, PyJWKClientError, PyJWKSet
+import logging
 import requests
 import os
-from typing import Tuple
+import threading
+import time
+from typing import Optional, Tuple
 from typing_extensions import TypedDict
 from dcicutils.common import REGION as AWS_REGION
 from dcicutils.function_cache_decorator import function_cache
@@ -17,9 +17,23 @@ from foursight_core.react.api.gac import Gac
 from foursight_core.react.api.jwt_utils import jwt_encode
 from foursight_core.react.api.misc_utils import get_request_domain, get_request_origin
 
+# from cryptography.hazmat.backends.openssl.rsa import _RSAPublicKey as RSAPublicKey
+# The above import no longer works with cryptography version 43.0.1; only used for type hint.
+RSAPublicKey = object
+
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
 
 AWS_COGNITO_SERVICE_BASE_URL = f"https://cognito-idp.{AWS_REGION}.amazonaws.com"
 
+# The Cognito JWKS (JSON Web Key Set) signing keys are cached process-wide, per user pool, for this long;
+# an unknown key ID (kid) triggers a refresh, but not more often than every COGNITO_JWKS_REFRESH_SECONDS,
+# and if a refresh fails, the previous (stale) key set is used; see CognitoJwksCache.
+COGNITO_JWKS_CACHE_TTL_SECONDS = 60 * 60
+COGNITO_JWKS_REFRESH_SECONDS = 30
+COGNITO_JWKS_FETCH_TIMEOUT_SECONDS = 10
+
 KEY_REGION = "region"
 KEY_DOMAIN = "domain"
 KEY_USER_POOL_ID = "userpool"
@@ -358,13 +372,15 @@ def _get_cognito_oauth_signing_key(jwt: str) -> RSAPublicKey:
     return signing_key.key
 
 
-def _get_cognito_oauth_signing_key_client() -> PyJWKClient:
+def _get_cognito_oauth_signing_key_client() -> "CognitoJwksCache":
     """
     Returns an object which can be used to extract a signing key from a JWT.
     The returned object will contain a "get_signing_key_from_jwt" method, which takes
     JWT string argument and returns a signing key object which has a "key" property.
-    Hits the jwks.json (JSON Web Key Sets) API for the Cognito authentication server.
-    Actual type of returned object: jwt.jwks_client.PyJWKClient
+    Hits the jwks.json (JSON Web Key Sets) API for the Cognito authentication server,
+    but only as needed, as the returned object is cached process-wide per user pool,
+    and it caches the key set; see CognitoJwksCache. Previously (PyJWKClient) we
+    refetched the key set for every (login) call.
 
     Cognito configuration dependencies: user pool ID.
     Cognito endpoint dependencies: JWKS i.e. /.well-known/jwks.json.
@@ -373,8 +389,73 @@ def _get_cognito_oauth_signing_key_client() -> PyJWKClient:
     """
     config = _get_cognito_oauth_config_basic()
     user_pool_id = config[KEY_USER_POOL_ID]
-    cognito_jwks_url = f"{AWS_COGNITO_SERVICE_BASE_URL}/{user_pool_id}/.well-known/jwks.json"
-    return PyJWKClient(cognito_jwks_url)
+    with _cognito_jwks_caches_lock:
+        jwks_cache = _cognito_jwks_caches.get(user_pool_id)
+        if not jwks_cache:
+            cognito_jwks_url = f"{AWS_COGNITO_SERVICE_BASE_URL}/{user_pool_id}/.well-known/jwks.json"
+            jwks_cache = _cognito_jwks_caches[user_pool_id] = CognitoJwksCache(cognito_jwks_url)
+        return jwks_cache
+
+
+class CognitoJwksCache:
+    """
+    Cache of the JWKS (JSON Web Key Set) signing keys from the given JWKS URL (for a Cognito user pool).
+    The key set is fetched on first use and refetched after the given ttl (seconds), or if a key ID (kid)
+    is asked for which is not in the key set (i.e. the keys have been rotated); but no more often than
+    every refresh (seconds) so that bogus key IDs do not cause a fetch for every call. If a fetch fails
+    then the previous (stale) key set, if any, continues to be used (until a subsequent fetch succeeds).
+    So, in the common case, getting a signing key is a local (no network) operation.
+    """
+    def __init__(self, jwks_url: str,
+                 ttl: int = COGNITO_JWKS_CACHE_TTL_SECONDS,
+                 refresh: int = COGNITO_JWKS_REFRESH_SECONDS,
+                 timeout: int = COGNITO_JWKS_FETCH_TIMEOUT_SECONDS) -> None:
+        self._jwks_url = jwks_url
+        self._ttl = ttl
+        self._refresh = refresh
+        self._timeout = timeout
+        self._jwks = None
+        self._fetched_at = None
+        self._fetch_attempted_at = None
+        self._lock = threading.Lock()
+
+    def get_signing_key_from_jwt(self, jwt: str) -> PyJWK:
+        header = jwtlib.get_unverified_header(jwt)
+        return self.get_signing_key(header.get("kid"))
+
+    def get_signing_key(self, kid: str) -> PyJWK:
+        with self._lock:
+            now = time.monotonic()
+            if self._jwks is None or now - self._fetched_at > self._ttl:
+                self._fetch_keys(now)
+            signing_key = self._find_signing_key(kid)
+            if not signing_key:
+                self._fetch_keys(now)
+                signing_key = self._find_signing_key(kid)
+        if not signing_key:
+            raise PyJWKClientError(f"Unable to find a signing key that matches: {kid}")
+        return signing_key
+
+    def _fetch_keys(self, now: float) -> None:
+        if self._jwks is not None and now - self._fetch_attempted_at < self._refresh:
+            return
+        self._fetch_attempted_at = now
+        try:
+            response = requests.get(self._jwks_url, timeout=self._timeout)
+            response.raise_for_status()
+            self._jwks = PyJWKSet.from_dict(response.json())
+            self._fetched_at = now
+        except Exception as e:
+            if self._jwks is None:
+                raise PyJWKClientError(f"Unable to fetch signing keys from: {self._jwks_url} ({e})")
+            logger.warning(f"Error fetching signing keys from: {self._jwks_url} (using previous keys): {e}")
+
+    def _find_signing_key(self, kid: str) -> Optional[PyJWK]:
+        return next((key for key in self._jwks.keys if key.key_id == kid), None) if self._jwks else None
+
+
+_cognito_jwks_caches = {}
+_cognito_jwks_caches_lock = threading.Lock()
 
 
 def _create_cognito_authtoken(token: dict, envs: Envs, domain: str, site: str) -> Tuple[dict, int]:
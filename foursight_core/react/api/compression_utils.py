@@ -0,0 +1,129 @@
+import base64
+from chalice import Response
+from chalice.app import handle_extra_types
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional, Union
+from dcicutils.misc_utils import str_to_bool
+from ...server_timing import server_timing_span
+try:
+    import brotli
+except ImportError:  # brotli is optional; if not installed then only gzip is supported.
+    brotli = None
+
+# Response compression is only enabled if the FOURSIGHT_RESPONSE_COMPRESSION environment variable is set to true.
+# This is because compressed (binary) bodies are returned to API Gateway base64 encoded (see CompressedResponse),
+# and API Gateway only decodes these back to binary if its binaryMediaTypes is configured (to */*) to do so;
+# this is a deployment (API Gateway) setting outside of this code. Note that chalice local always decodes these.
+COMPRESSION_ENABLED_ENV_VAR = "FOURSIGHT_RESPONSE_COMPRESSION"
+# Bodies smaller than this (in bytes) are not worth compressing.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSIBLE_CONTENT_TYPES = [
+    "application/json",
+    "application/javascript",
+    "application/css",
+    "image/svg+xml",
+    "text/"
+]
+
+
+class CompressedResponse(Response):
+    """
+    Chalice response with a compressed (bytes) body. Chalice only base64 encodes a body
+    (which is required for binary bodies for API Gateway) if its content type is one of
+    its binary types (app.api.binary_types), which we do not want to be the case for JSON,
+    HTML, etc, as then (uncompressed) string bodies of those types would fail; so we do
+    the base64 encoding here unconditionally.
+    """
+    def to_dict(self, binary_types: Optional[list] = None) -> Dict[str, Any]:
+        response = super().to_dict()
+        response["body"] = base64.b64encode(self.body).decode("ascii")
+        response["isBase64Encoded"] = True
+        return response
+
+
+def is_compression_enabled() -> bool:
+    return str_to_bool(os.environ.get(COMPRESSION_ENABLED_ENV_VAR, "false"))
+
+
+def is_compressible_content_type(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    return any(content_type.startswith(compressible) for compressible in COMPRESSIBLE_CONTENT_TYPES)
+
+
+def get_accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Returns the compression encoding we should use (br or gzip) according to the given
+    Accept-Encoding request header value, or None if no (supported) encoding is accepted.
+    Brotli (br) is preferred, if supported (i.e. the brotli package is installed).
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        parts = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for part in parts[1:]:
+            if part.startswith("q="):
+                try:
+                    quality = float(part[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0]] = quality
+    for encoding in (["br"] if brotli else []) + ["gzip"]:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0.0:
+            return encoding
+    return None
+
+
+def compress(data: Union[str, bytes], encoding: str) -> bytes:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    # Fixed mtime so the same content always compresses to the same bytes (e.g. for ETags).
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def create_compressed_response(body: bytes, encoding: str, status_code: int = 200,
+                               headers: Optional[dict] = None) -> CompressedResponse:
+    """
+    Returns a response for the given already compressed body; with the appropriate headers.
+    """
+    headers = {**(headers or {}), "Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    return CompressedResponse(body=body, headers=headers, status_code=status_code)
+
+
+def compress_response(response: Response, accept_encoding: Optional[str]) -> Response:
+    """
+    Returns the given response compressed according to the given Accept-Encoding request
+    header value, if compression is enabled (see is_compression_enabled), the response
+    has a compressible content type, and its body is at least COMPRESSION_MIN_SIZE bytes;
+    otherwise returns the given response unchanged.
+    """
+    if not accept_encoding or isinstance(response, CompressedResponse) or not is_compression_enabled():
+        return response
+    headers = response.headers or {}
+    header_names = [name.lower() for name in headers]
+    if "content-encoding" in header_names:
+        return response
+    content_type = next((value for name, value in headers.items() if name.lower() == "content-type"), None)
+    if not is_compressible_content_type(content_type):
+        return response
+    if not (encoding := get_accepted_encoding(accept_encoding)):
+        return response
+    body = response.body
+    if not isinstance(body, (str, bytes)):
+        with server_timing_span("json"):
+            # Same serialization as chalice.Response.to_dict does.
+            body = json.dumps(body, separators=(",", ":"), default=handle_extra_types)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    return create_compressed_response(compress(body, encoding), encoding, response.status_code, headers)
@@ -49,7 +49,7 @@ def convert_time_t_to_datetime_string(time_t: int, tzname: Optional[str] = None)
     :param tzname: A timezone name (string); default to UTC if unspecified.
     :return: A datetime string in the given timezone formatted like: 2022-08-22 13:25:34 EDT
     """
-    return convert_datetime_to_datetime_string(convert_time_t_to_datetime(time_t), tzname)
+    return convert_datetime_to_string(convert_time_t_to_datetime(time_t), tzname)
 
 
 def convert_time_t_to_utc_datetime_string(time_t: int) -> Optional[str]:
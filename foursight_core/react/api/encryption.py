@@ -8,22 +8,29 @@
 
 import json
 import os
-from pyDes import triple_des
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from typing import Optional, Union
 from .encoding_utils import base64_decode_to_bytes, base64_encode_to_bytes, bytes_to_string
 
+# Encrypted values are prefixed with this (versioned) envelope header; values without it are legacy
+# (triple DES) encrypted values, which are still decrypted. Note that the colon cannot occur in base64.
+ENCRYPTION_ENVELOPE_V2 = "fse2:"
+_ENCRYPTION_NONCE_SIZE = 12
+_ENCRYPTION_KEY_INFO = b"foursight-core-encryption-v2"
+
 
 # Encryption utility class, to encrypt/decrypt with given password.
 # If no password given then we use the value of CLIENT_SECRET environment
 # variable which should be ENCODED_AUTH0_SECRET from the GAC.
 #
-# We are using pyDes for this, which is pure Python to avoid portability issues,
-# and is SUPER slow, but OK for now for our purposes of just decrypting the authToken
-# on each protected API call. I.e. it takes nearly 100ms to decrypt 500 characters!
-#
-# TODO
-# From Will: Note that triple_des is not really all that secure.
-# Try maybe this: https://github.com/wbond/oscrypto (AES 256)
+# We use AES-256-GCM (authenticated encryption) from the cryptography package, with a key derived
+# (via HKDF-SHA256) from the password and a random nonce per value, in a versioned envelope, i.e.:
+# "fse2:" + base64(nonce + ciphertext + tag). This replaces our previous use of the pure Python pyDes
+# triple DES, which was SUPER slow (nearly 100ms to decrypt 500 characters) and not all that secure;
+# values encrypted with that (legacy) version are still transparently decrypted (requires pyDes).
+# See benchmarks/benchmark_encryption.py for a comparison.
 class Encryption:
 
     def __init__(self, password: Optional[str] = None) -> None:
@@ -38,12 +45,11 @@ class Encryption:
                 password = os.environ.get("ENCODED_AUTH0_SECRET", None)
                 if not password:
                     raise Exception(f"Encryption error: No password found for the Encryption class.")
-        # Encryption password must be of length 8, 16, or 24.
-        if len(password) < 24:
-            password = password.ljust(24, '_')
-        elif len(password) > 24:
-            password = password[0:24]
-        self._encryptor = triple_des(password)
+        self._password = password
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=_ENCRYPTION_KEY_INFO).derive(
+            password.encode("utf-8"))
+        self._encryptor = AESGCM(key)
+        self._legacy_encryptor = None
 
     def encrypt(self, plaintext_value: Union[str, dict, list]) -> str:
         """
@@ -56,18 +62,42 @@ class Encryption:
         try:
             if isinstance(plaintext_value, dict) or isinstance(plaintext_value, list):
                 plaintext_value = json.dumps(plaintext_value)
-            return bytes_to_string(base64_encode_to_bytes(self._encryptor.encrypt(plaintext_value, padmode=2)))
+            nonce = os.urandom(_ENCRYPTION_NONCE_SIZE)
+            encrypted_value = nonce + self._encryptor.encrypt(nonce, plaintext_value.encode("utf-8"), None)
+            return ENCRYPTION_ENVELOPE_V2 + bytes_to_string(base64_encode_to_bytes(encrypted_value))
         except Exception as e:
             raise Exception(f"Encryption error: {str(e)}")
 
     def decrypt(self, encrypted_value: str) -> str:
         """
         Decrypts the given encrypted string value (assumed to have been returned be
-        the above encrypt method) using the password specified at class construction
-        time, and returns the decrypted value as a string.
+        the above encrypt method, or by its previous triple DES version) using the password
+        specified at class construction time, and returns the decrypted value as a string.
         Raises an Exception on error.
         """
         try:
-            return bytes_to_string(self._encryptor.decrypt(base64_decode_to_bytes(encrypted_value), padmode=2))
+            if not encrypted_value.startswith(ENCRYPTION_ENVELOPE_V2):
+                return self._decrypt_legacy(encrypted_value)
+            encrypted_value = base64_decode_to_bytes(encrypted_value[len(ENCRYPTION_ENVELOPE_V2):])
+            nonce = encrypted_value[:_ENCRYPTION_NONCE_SIZE]
+            return self._encryptor.decrypt(nonce, encrypted_value[_ENCRYPTION_NONCE_SIZE:], None).decode("utf-8")
         except Exception as e:
-            raise Exception(f"Decryption error: {str(e)}")
+            raise Exception(f"Decryption error: {str(e) or type(e).__name__}")
+
+    def _decrypt_legacy(self, encrypted_value: str) -> str:
+        return bytes_to_string(self._get_legacy_encryptor().decrypt(base64_decode_to_bytes(encrypted_value), padmode=2))
+
+    def _get_legacy_encryptor(self):
+        """
+        Returns the (pyDes) triple DES encryptor used by the previous (legacy) version of this class.
+        """
+        if not self._legacy_encryptor:
+            from pyDes import triple_des  # Imported only if needed; for decrypting legacy values.
+            # Encryption password must be of length 8, 16, or 24.
+            password = self._password
+            if len(password) < 24:
+                password = password.ljust(24, '_')
+            elif len(password) > 24:
+                password = password[0:24]
+            self._legacy_encryptor = triple_des(password)
+        return self._legacy_encryptor
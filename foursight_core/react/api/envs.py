@@ -1,13 +1,18 @@
 import copy
 import logging
 import os
+import threading
+import time
 from typing import Optional, Tuple
 from dcicutils import ff_utils
 from dcicutils.env_utils import foursight_env_name
 from dcicutils.function_cache_decorator import function_cache
 from dcicutils.misc_utils import find_association
 from ...app import app
+from ...server_timing import server_timing_span
+from .cache_utils import ttl_function_cache
 from .gac import Gac
+from .misc_utils import run_functions_concurrently_with_timeout
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -22,11 +27,24 @@ class Envs:
 
     _DEFAULT_ENV_PLACHOLDER = 'no-default-env'
 
+    # The per-environment (Portal) user lookups of get_user_auth_info are done concurrently,
+    # at most USER_AUTH_INFO_MAX_WORKERS at a time, each given USER_AUTH_INFO_ENV_TIMEOUT_SECONDS;
+    # the results are cached per email for USER_AUTH_INFO_CACHE_TTL_SECONDS; this smooths over
+    # repeated logins (e.g. across tabs). Partial results, i.e. with failed/timed out lookups (from
+    # just the environments which succeeded), are cached for USER_AUTH_INFO_PARTIAL_CACHE_TTL_SECONDS,
+    # so that an environment which is down is retried sooner, without slowing down every login meanwhile.
+    USER_AUTH_INFO_MAX_WORKERS = 8
+    USER_AUTH_INFO_ENV_TIMEOUT_SECONDS = 10
+    USER_AUTH_INFO_CACHE_TTL_SECONDS = 60
+    USER_AUTH_INFO_PARTIAL_CACHE_TTL_SECONDS = 10
+
     def __init__(self, known_envs: list):
         # This known_envs should be the list of annotated environment name objects
         # as returned by app_utils.get_unique_annotated_environment_names, where each
         # object contains these fields: name, short_name, full_name, public_name, foursight_name
         self._known_envs = known_envs
+        self._user_auth_info_cache = {}
+        self._user_auth_info_cache_lock = threading.Lock()
         # Set any green/blue production/staging info.
         for known_env in self._known_envs:
             if self._env_contains(known_env, "blue"):
@@ -95,33 +113,63 @@ class Envs:
         i.e the list of annotated environment name objects; the list of allowed environment
         names for the given user/email, via the users store in ElasticSearch; and since we're
         getting the user record anyways, the first/last name of the user, for display only.
+        The user is looked up in each environment concurrently; see USER_AUTH_INFO_MAX_WORKERS.
         """
+        # Note we must lower case the email to find the user. This is because all emails
+        # in the database are lowercased; it causes issues with OAuth if we don't do this.
+        email = email.lower()
+        with self._user_auth_info_cache_lock:
+            if (cached := self._user_auth_info_cache.get(email)) and cached[0] > time.time():
+                allowed_envs, first_name, last_name = cached[1]
+                return list(allowed_envs), first_name, last_name
+        known_env_names = [known_env["full_name"] for known_env in self._known_envs]
+        if not known_env_names:
+            return [], None, None
         allowed_envs = []
         first_name = None
         last_name = None
-        for known_env in self._known_envs:
-            try:
-                # Note we must lower case the email to find the user. This is because all emails
-                # in the database are lowercased; it causes issues with OAuth if we don't do this.
-                known_env_name = known_env["full_name"]
-                envs = app.core.init_environments(known_env_name)
-                connection = app.core.init_connection(known_env_name, envs)
-                user = ff_utils.get_metadata('users/' + email.lower(),
-                                             key=connection.ff_keys,
-                                             add_on="frame=object&datastore=database")
-                if self._is_user_allowed_access(user):
-                    # Since this is in a loop, for each env, this setup here will end up getting first/last name
-                    # from the last env in the loop; doesn't really matter, just pick one set; this is just for
-                    # informational/display purposes in the UI.
-                    first_name = user.get("first_name")
-                    last_name = user.get("last_name")
-                    allowed_envs.append(known_env_name)
-            except Exception as e:
+        complete = True
+        results = run_functions_concurrently_with_timeout(
+            [lambda known_env_name=known_env_name: self._get_user(known_env_name, email)
+             for known_env_name in known_env_names],
+            timeout=self.USER_AUTH_INFO_ENV_TIMEOUT_SECONDS, max_workers=self.USER_AUTH_INFO_MAX_WORKERS)
+        # Results processed in known environment order; so as before (when serial) the first/last name
+        # comes from the last allowed environment; doesn't really matter, just pick one set; this is just
+        # for informational/display purposes in the UI.
+        for known_env_name, (user, exception) in zip(known_env_names, results):
+            if exception:
+                complete = False
                 if raise_exception:
-                    raise
-                logger.warning(f"Exception getting allowed envs for {email}: {e}")
+                    raise exception
+                logger.warning(f"Exception getting allowed envs for {email} for {known_env_name}: {exception}")
+            elif self._is_user_allowed_access(user):
+                first_name = user.get("first_name")
+                last_name = user.get("last_name")
+                allowed_envs.append(known_env_name)
+        with self._user_auth_info_cache_lock:
+            now = time.time()
+            for expired_email in [key for key, value in self._user_auth_info_cache.items() if value[0] <= now]:
+                del self._user_auth_info_cache[expired_email]
+            ttl = self.USER_AUTH_INFO_CACHE_TTL_SECONDS if complete else self.USER_AUTH_INFO_PARTIAL_CACHE_TTL_SECONDS
+            self._user_auth_info_cache[email] = (now + ttl, (list(allowed_envs), first_name, last_name))
         return allowed_envs, first_name, last_name
 
+    def _get_user(self, env_name: str, email: str) -> Optional[dict]:
+        with server_timing_span("portal"):
+            return ff_utils.get_metadata('users/' + email,
+                                         key=self._get_portal_access_keys(env_name),
+                                         add_on="frame=object&datastore=database")
+
+    @ttl_function_cache(ttl=10 * 60, nocache_none=True)
+    def _get_portal_access_keys(self, env_name: str) -> Optional[dict]:
+        """
+        Returns the Portal access keys (ff_keys) for the given environment; cached so that a
+        (Foursight) connection need not be created for each environment on each login.
+        """
+        envs = app.core.init_environments(env_name)
+        connection = app.core.init_connection(env_name, envs)
+        return connection.ff_keys
+
     @staticmethod
     def _is_user_allowed_access(user: Optional[dict]) -> bool:
         return user and Envs._is_user_in_one_or_more_groups(user, ["admin", "foursight"])
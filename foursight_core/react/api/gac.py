@@ -1,5 +1,4 @@
 import re
-import boto3
 import logging
 import os
 from typing import Optional
@@ -9,6 +8,7 @@ from dcicutils.function_cache_decorator import function_cache
 from dcicutils.misc_utils import override_environ, get_error_message
 from dcicutils.obfuscation_utils import obfuscate_dict
 from dcicutils.secrets_utils import get_identity_name, get_identity_secrets
+from ...boto_client import boto_client
 from .misc_utils import sort_dictionary_by_case_insensitive_keys
 
 logging.basicConfig()
@@ -20,7 +20,7 @@ class Gac:
 
     @staticmethod
     def _all_secret_names():
-        secrets_manager = boto3.client('secretsmanager')
+        secrets_manager = boto_client('secretsmanager')
         pagination_next_token = None
         while True:
             kwargs = {"NextToken": pagination_next_token} if pagination_next_token else {}
@@ -1,14 +1,36 @@
 import base64
+import datetime
 import json
-from typing import List, Optional, Tuple, Union
+import logging
+import threading
+import time
+from typing import Optional, Tuple, Union
 import uuid
+import pytz
 from ...boto_s3 import boto_s3_client
 from .datetime_utils import convert_datetime_to_utc_datetime_string
 
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+# Index of the ingestion submissions in a metadata-bundles-bucket (see read_ingestion_submissions); persisted
+# in the (foursight) results bucket of the environment, as this key, rather than in the metadata-bundles-bucket,
+# which belongs to the portal ingestion process (and to which we may not even have write access).
+INGESTION_SUBMISSIONS_INDEX_KEY = "{env}/ingestion-submissions-index.json"
+INGESTION_SUBMISSIONS_INDEX_VERSION = 1
+# Maximum number of (1000 key) pages of the bucket listed to update the index per request.
+INGESTION_SUBMISSIONS_INDEX_PAGES_PER_UPDATE = 5
+# If a scan through the whole bucket has been going on longer than this then it is finished in one go.
+INGESTION_SUBMISSIONS_INDEX_RECONCILE_SECONDS = 60 * 60
+# Minimum time between writes of the (updated) index to S3.
+INGESTION_SUBMISSIONS_INDEX_PERSIST_SECONDS = 60
+_MAX_KEYS_PER_READ = 1000
+
 
 def read_ingestion_submissions(bucket: str,
                                offset: int = 0, limit: int = -1,
-                               sort: Optional[str] = None) -> dict:
+                               sort: Optional[str] = None,
+                               results_bucket: Optional[str] = None, env: Optional[str] = None) -> dict:
     """
     Returns information about the ingestion submission keys within the metadata-bundles-bucket,
     This keys in this bucket are organized by ingestion submission uuid like this:
@@ -28,87 +50,27 @@ def read_ingestion_submissions(bucket: str,
 
     These are ordered, by default, by reverse modified datetime (most recent first).
 
+    Unfortunately AWS/boto3 does not allow sorting, so we would need to read all the keys in the bucket
+    for every call; so rather, these are read from an index of the submissions (see
+    update_ingestion_submissions_index) which is updated incrementally, a bounded number of keys
+    per call; so new or updated submissions may take a few calls to show up in large buckets;
+    the paging info includes when the index was last fully reconciled with the bucket. The index
+    is persisted in the given (foursight) results bucket for the given environment, if specified.
+
     Some ingestion info can be gotten via Portal but only that which is written to the database,
     which does not include the details of the ingested submission, i.e. the actual list of uuids
     for objects which were created, update, or validated; nor does it include any details of any
     validation errors (or other errors or exceptions) which may have occurred.
     """
-    s3 = boto_s3_client()
-
-    def is_uuid(value: str) -> bool:
-        try:
-            return str(uuid.UUID(value)).lower() == value.lower()
-        except Exception as e:
-            return False
-
-    def get_uuid_and_file_from_key(key: str) -> Tuple[Optional[str], Optional[str]]:
-        parts = key.split("/")
-        if len(parts) != 2 or not is_uuid(parts[0]) or not parts[1]:
-            return (None, None)
-        return (parts[0], parts[1])
-
-    def add_key_to_keys(key: dict, key_size: int, keys: dict) -> None:
-        key_uuid = key["uuid"]
-        key_file = key["file"]
-        existing_key = keys.get(key_uuid)
-        if existing_key:
-            # We take the most recently modified date within the
-            # bucket amont the keys with the same (prefix) uuid.
-            if key["modified"] > existing_key["modified"]:
-                existing_key["modified"] = key["modified"]
-            if key_file.startswith("datafile"):
-                existing_key["file"] = key_file
-            key = existing_key
-        else:
-            keys[key_uuid] = key
-        if _is_started_file(key_file):
-            key["started"] = True
-        if _is_done_file(key_file):
-            key["done"] = True
-        if _is_error_file(key_file):
-            key["error"] = True
-        if not key.get("files"):
-            key["files"] = []
-        if not [file for file in key["files"] if file["file"] == key_file]:
-            file = {"file": key_file, "modified": key["modified"], "size": key_size}
-            if _is_detail_file(key_file):
-                file["detail"] = True
-            key["files"].append(file)
-        if key["file"] and not key["file"].startswith("datafile"):
-            key["file"] = None
-
-    # Unfortunately AWS/boto3 does not allow sorting, so we need to read all the keys in the bucket;
-    # this may be slow, but it's quicker than manually rummaging around when you need to find something.
-
-    def get_chunk_of_keys(bucket: str, next_token: Optional[str] = None) -> Tuple[Optional[List[dict]], Optional[str]]:
-        keys = {}
-        MAX_KEYS_PER_READ = 1000
-        if next_token:
-            response = s3.list_objects_v2(Bucket=bucket, MaxKeys=MAX_KEYS_PER_READ, ContinuationToken=next_token)
-        else:
-            response = s3.list_objects_v2(Bucket=bucket, MaxKeys=MAX_KEYS_PER_READ)
-        for item in response.get("Contents", []):
-            key = item["Key"]
-            uuid, file = get_uuid_and_file_from_key(key)
-            if not uuid or not file:
-                continue
-            key = {"uuid": uuid, "file": file, "modified": item["LastModified"]}
-            add_key_to_keys(key, item["Size"], keys)
-        return (keys, response.get("NextContinuationToken"))
-
-    keys = {}
-    next_token = None
-    while True:
-        chunk_of_keys, next_token = get_chunk_of_keys(bucket, next_token)
-        if chunk_of_keys:
-           for key in chunk_of_keys:
-               keys[key] = chunk_of_keys[key]
-        if not next_token:
-            break
-    keys = [keys[key] for key in keys]
+    index = update_ingestion_submissions_index(bucket, results_bucket=results_bucket, env=env)
+    with _get_ingestion_submissions_index_locks(bucket)[0]:
+        # Shallow copies as the index may be updated (by another thread) while we are using these.
+        keys = [{**key, "files": list(key["files"])} for key in index["submissions"].values()]
+        reconciled = index["reconciled"]
     total = len(keys)
 
-    sort_key = None
+    sort_key = "uuid"
+    sort_reverse = False
     if sort:
         if sort.endswith(".desc"):
             sort_key = sort[:-5].lower()
@@ -124,22 +86,208 @@ def read_ingestion_submissions(bucket: str,
     end_offset = offset + limit if offset + limit <= total else total
     keys = keys[offset:end_offset]
 
-    # Convert datatime objects to strings, here just for minor performance reason,
+    # Convert datatime values to display strings, here just for minor performance reason,
     # rather than doing it for all keys, just do the ones we are returning.
     for key in keys:
+        del key["scan"]
         key["modified"] = convert_datetime_to_utc_datetime_string(key["modified"])
-        for file in key["files"]:
-            file["modified"] = convert_datetime_to_utc_datetime_string(file["modified"])
+        key["files"] = [{**file, "modified": convert_datetime_to_utc_datetime_string(file["modified"])}
+                        for file in key["files"]]
 
     return {
         "paging": {
             "total": total, "count": end_offset - offset,
-            "limit": limit, "offset": offset, "more": max(total - offset - limit, 0)
+            "limit": limit, "offset": offset, "more": max(total - offset - limit, 0),
+            "reconciled": convert_datetime_to_utc_datetime_string(reconciled)
         },
         "list": keys
     }
 
 
+def update_ingestion_submissions_index(bucket: str, max_pages: Optional[int] = None,
+                                       results_bucket: Optional[str] = None, env: Optional[str] = None) -> dict:
+    """
+    Updates, and returns, the index of ingestion submissions in the given metadata-bundles-bucket.
+    The index is a dictionary with a "submissions" dictionary by submission uuid (each like the items
+    returned by read_ingestion_submissions but with ISO modified datetime strings); it is kept in memory,
+    and, if the results bucket and environment are given, persisted to S3 (at INGESTION_SUBMISSIONS_INDEX_KEY
+    for the environment in the results bucket) from where it is loaded if not yet in memory (e.g. on a cold
+    start); if it does not exist at all it is built from the whole bucket.
+
+    The index is updated by continuing a scan through the keys of the bucket, starting after (StartAfter)
+    the last key seen in the previous update, for at most the given number of (1000 key) pages (default
+    INGESTION_SUBMISSIONS_INDEX_PAGES_PER_UPDATE; or, if negative, until the end of the bucket); S3 lists
+    keys in key order, and since these keys start with a (random) uuid new submissions can appear anywhere,
+    so this scan wraps around; when a scan reaches the end of the bucket, any submissions (or files) not seen
+    during the scan are removed from the index (i.e. it is reconciled with the bucket). If a scan has been
+    going for longer than INGESTION_SUBMISSIONS_INDEX_RECONCILE_SECONDS it is finished here in one go.
+
+    Only one update of the index of a bucket is done at a time; if one is already in progress (in another
+    thread) then the index is returned as is, rather than waiting for it, unless it is not yet loaded at all.
+    The bucket is listed, and the index persisted, without holding the lock for the index (see
+    _get_ingestion_submissions_index_locks), which is only held to merge the listed keys into it;
+    so reads of the index, and updates of the indexes of other buckets, are not held up by this.
+    """
+    if max_pages is None:
+        max_pages = INGESTION_SUBMISSIONS_INDEX_PAGES_PER_UPDATE
+    index_lock, update_lock = _get_ingestion_submissions_index_locks(bucket)
+    index = _ingestion_submissions_indexes.get(bucket)
+    if not update_lock.acquire(blocking=not index):
+        return index
+    try:
+        if not (index := _ingestion_submissions_indexes.get(bucket)):
+            index = _load_ingestion_submissions_index(bucket, results_bucket, env)
+            if not index:
+                index = _create_ingestion_submissions_index(bucket)
+                max_pages = -1
+            with index_lock:
+                _ingestion_submissions_indexes[bucket] = index
+        elif time.time() - index["scan_started"] > INGESTION_SUBMISSIONS_INDEX_RECONCILE_SECONDS:
+            max_pages = -1
+        # Only this (update) thread changes the scan position so it needs no lock to read it here.
+        scan_after = index["scan_after"]
+        s3 = boto_s3_client()
+        npages = 0
+        items = []
+        scan_completed = False
+        while max_pages < 0 or npages < max_pages:
+            kwargs = {"Bucket": bucket, "MaxKeys": _MAX_KEYS_PER_READ}
+            if scan_after:
+                kwargs["StartAfter"] = scan_after
+            response = s3.list_objects_v2(**kwargs)
+            npages += 1
+            if contents := response.get("Contents", []):
+                items.extend(contents)
+                scan_after = contents[-1]["Key"]
+            if not response.get("IsTruncated"):
+                scan_completed = True
+                break
+        changed = scan_completed
+        with index_lock:
+            for item in items:
+                key_uuid, key_file = _get_uuid_and_file_from_key(item["Key"])
+                if key_uuid and key_file:
+                    _add_key_to_index(index, key_uuid, key_file, item["Size"], item["LastModified"])
+                    changed = True
+            index["scan_after"] = scan_after
+            if scan_completed:
+                _reconcile_ingestion_submissions_index(index)
+            persist = (changed and bool(results_bucket and env) and
+                       (max_pages < 0 or
+                        time.time() - index["persisted"] > INGESTION_SUBMISSIONS_INDEX_PERSIST_SECONDS))
+            # Serialized while holding the lock so that it is consistent; written to S3 after releasing it.
+            index_json = json.dumps(index) if persist else None
+        if index_json:
+            _persist_ingestion_submissions_index(index, index_json, results_bucket, env)
+    finally:
+        update_lock.release()
+    return index
+
+
+def _create_ingestion_submissions_index(bucket: str) -> dict:
+    return {
+        "version": INGESTION_SUBMISSIONS_INDEX_VERSION,
+        "bucket": bucket,
+        "submissions": {},
+        "scan": 1,  # Identifies the current scan through the bucket; incremented when each scan completes.
+        "scan_after": None,
+        "scan_started": time.time(),
+        "reconciled": None,
+        "persisted": 0
+    }
+
+
+def _add_key_to_index(index: dict, key_uuid: str, key_file: str, key_size: int,
+                      key_modified: datetime.datetime) -> None:
+    key_modified = key_modified.astimezone(pytz.utc).isoformat(timespec="microseconds")
+    key = index["submissions"].get(key_uuid)
+    if not key or key["scan"] != index["scan"]:
+        # First key of this submission seen during this scan; keys of a submission are contiguous
+        # (listed in key order) so all of its files are (re)collected during this scan from here.
+        key = index["submissions"][key_uuid] = {"uuid": key_uuid, "file": None, "modified": key_modified,
+                                                "files": [], "scan": index["scan"]}
+    elif key_modified > key["modified"]:
+        # We take the most recently modified date within the
+        # bucket amont the keys with the same (prefix) uuid.
+        key["modified"] = key_modified
+    if key_file.startswith("datafile"):
+        key["file"] = key_file
+    if _is_started_file(key_file):
+        key["started"] = True
+    if _is_done_file(key_file):
+        key["done"] = True
+    if _is_error_file(key_file):
+        key["error"] = True
+    if not [file for file in key["files"] if file["file"] == key_file]:
+        file = {"file": key_file, "modified": key_modified, "size": key_size}
+        if _is_detail_file(key_file):
+            file["detail"] = True
+        key["files"].append(file)
+
+
+def _reconcile_ingestion_submissions_index(index: dict) -> None:
+    index["submissions"] = {key_uuid: key for key_uuid, key in index["submissions"].items()
+                            if key["scan"] == index["scan"]}
+    index["scan"] += 1
+    index["scan_after"] = None
+    index["scan_started"] = time.time()
+    index["reconciled"] = datetime.datetime.now(pytz.utc).isoformat(timespec="microseconds")
+
+
+def _load_ingestion_submissions_index(bucket: str, results_bucket: Optional[str],
+                                      env: Optional[str]) -> Optional[dict]:
+    if not results_bucket or not env:
+        return None
+    index = _read_s3_key(results_bucket, INGESTION_SUBMISSIONS_INDEX_KEY.format(env=env), is_json=True)
+    if (not isinstance(index, dict) or index.get("version") != INGESTION_SUBMISSIONS_INDEX_VERSION or
+            index.get("bucket") != bucket):
+        return None
+    index["persisted"] = time.time()
+    return index
+
+
+def _persist_ingestion_submissions_index(index: dict, index_json: str, results_bucket: str, env: str) -> None:
+    index_key = INGESTION_SUBMISSIONS_INDEX_KEY.format(env=env)
+    try:
+        boto_s3_client().put_object(Bucket=results_bucket, Key=index_key,
+                                    Body=index_json, ContentType="application/json")
+        index["persisted"] = time.time()
+    except Exception as e:
+        # Not fatal; the index is still kept (and updated) in memory.
+        logger.warning(f"Exception (not fatal) writing ingestion submissions index to:"
+                       f" {results_bucket}/{index_key}: {e}")
+
+
+def _get_ingestion_submissions_index_locks(bucket: str) -> Tuple[threading.Lock, threading.Lock]:
+    """
+    Returns the locks for the index of the given bucket: the first guards (reading and changing) the index
+    itself, and is only held briefly; the second is held for the whole of an update of the index.
+    """
+    with _ingestion_submissions_indexes_lock:
+        if not (locks := _ingestion_submissions_index_locks.get(bucket)):
+            locks = _ingestion_submissions_index_locks[bucket] = (threading.Lock(), threading.Lock())
+        return locks
+
+
+_ingestion_submissions_indexes = {}
+_ingestion_submissions_index_locks = {}
+_ingestion_submissions_indexes_lock = threading.Lock()
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        return str(uuid.UUID(value)).lower() == value.lower()
+    except Exception:
+        return False
+
+
+def _get_uuid_and_file_from_key(key: str) -> Tuple[Optional[str], Optional[str]]:
+    parts = key.split("/")
+    if len(parts) != 2 or not _is_uuid(parts[0]) or not parts[1]:
+        return (None, None)
+    return (parts[0], parts[1])
+
+
 def read_ingestion_submission_detail(bucket: str, uuid: str) -> Optional[str]:
     file = f"submission.json"
     contents = _read_s3_key(bucket, f"{uuid}/{file}", is_json=True)
@@ -1,13 +1,17 @@
 from chalice.app import Request
+import concurrent.futures
+import contextvars
 from typing import Dict, List
 import inspect
 import json
 import os
 import pkg_resources
 import sys
+import time
 from typing import Any, Callable, Optional, Tuple, Union
 from urllib.parse import urlparse
 from dcicutils.task_utils import pmap
+from ...server_timing import get_server_timings
 
 
 def sort_dictionary_by_case_insensitive_keys(dictionary: Dict) -> Dict:
@@ -284,11 +288,60 @@ def run_functions_concurrently(functions: List[Callable]) -> List[Any]:
     so often/typically the caller passes a special wrapper function/lambda which calls
     the "real" function with the desired arguments. Returns the results of each function
     call in a list, the order of which corresponds to the order fo the given function list.
+    If server timing is enabled, the functions run in (copies of) the caller's context, so
+    that their timing spans are recorded for the current request (see server_timing.py).
     """
     if not functions or not isinstance(functions, list):
         return []
     functions = [function if isinstance(function, Callable) else lambda: None for function in functions]
+    if get_server_timings() is not None:
+        functions = [lambda function=function, context=contextvars.copy_context(): context.run(function)
+                     for function in functions]
     return [result for result in pmap(lambda f: f(), functions)] if len(functions) > 1 else [functions[0]()]
 
 
+def run_functions_concurrently_with_timeout(functions: List[Callable], timeout: float,
+                                            max_workers: int) -> List[Tuple[Any, Optional[BaseException]]]:
+    """
+    Runs the given list of functions (which take no arguments, like run_functions_concurrently)
+    concurrently, at most max_workers at a time, each given the given timeout (seconds) measured
+    from when it starts running; so a function waiting for a worker loses none of its time. Returns
+    a list of tuples of the result and exception (None if none) of each function call, in the order
+    of the given functions; the exception is a concurrent.futures.TimeoutError if the function timed out.
+    A function which times out is abandoned, i.e. left running in the background, as threads cannot be
+    stopped; it no longer counts toward max_workers, so functions which hang do not hold up the others.
+    If server timing is enabled, the functions run in (copies of) the caller's context; see server_timing.py.
+    """
+    if not functions:
+        return []
+    if get_server_timings() is not None:
+        functions = [lambda function=function, context=contextvars.copy_context(): context.run(function)
+                     for function in functions]
+    results = [(None, None)] * len(functions)
+    # Threads are created only as needed, i.e. at most max_workers plus any which are abandoned.
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(functions))
+    try:
+        running = {}  # future -> (index of function, deadline)
+        next_index = 0
+        while next_index < len(functions) or running:
+            while next_index < len(functions) and len(running) < max_workers:
+                running[executor.submit(functions[next_index])] = (next_index, time.monotonic() + timeout)
+                next_index += 1
+            earliest_deadline = min(deadline for _, deadline in running.values())
+            done, _ = concurrent.futures.wait(running, timeout=max(earliest_deadline - time.monotonic(), 0),
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            now = time.monotonic()
+            for future, (index, deadline) in list(running.items()):
+                if future in done:
+                    del running[future]
+                    results[index] = (None, future.exception()) if future.exception() else (future.result(), None)
+                elif deadline <= now and not future.done():
+                    del running[future]
+                    results[index] = (None, concurrent.futures.TimeoutError(f"Timed out after {timeout} seconds."))
+    finally:
+        # Do not wait for any abandoned (timed out) functions to finish.
+        executor.shutdown(wait=False)
+    return results
+
+
 run_concurrently = pmap
@@ -4,6 +4,7 @@ from dcicutils import ff_utils
 from dcicutils.misc_utils import future_datetime
 from typing import Optional, Tuple
 from ...app import app
+from ...server_timing import server_timing_span
 from .datetime_utils import (
     convert_iso_datetime_string_to_datetime as normalize_portal_datetime,
     convert_datetime_to_utc_datetime_string as datetime_to_string
@@ -73,7 +74,8 @@ def get_portal_access_key_info(env: str,
 def _get_portal_access_key_expires_date(keys: dict) -> Tuple[datetime, Optional[datetime], Optional[Exception]]:
     try:
         query = f"/search/?type=AccessKey&description={_PORTAL_ACCESS_KEY_NAME}&sort=-date_created"
-        access_key = ff_utils.search_metadata(query, key=keys)[0]
+        with server_timing_span("portal"):
+            access_key = ff_utils.search_metadata(query, key=keys)[0]
         access_key_create_date = normalize_portal_datetime(access_key["date_created"])
         access_key_expires_date = access_key.get("expiration_date")
         if access_key_expires_date:
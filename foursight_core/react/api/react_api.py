@@ -1,5 +1,4 @@
 from chalice import Response, __version__ as chalice_version
-import boto3
 from botocore.errorfactory import ClientError as BotoClientError
 import copy
 import datetime
@@ -25,6 +24,10 @@ from dcicutils.obfuscation_utils import obfuscate_dict
 from dcicutils.redis_tools import RedisSessionToken, SESSION_TOKEN_COOKIE
 from dcicutils.ssl_certificate_utils import get_ssl_certificate_info
 from ...app import app
+from ...boto_client import boto_client
+from ...boto_s3 import boto_s3_client
+from ...exceptions import BadHistoryCursor
+from ...server_timing import server_timing_span
 from .auth import AUTH_TOKEN_COOKIE
 from .auth import Auth
 from .aws_network import (
@@ -37,6 +40,12 @@ from .aws_stacks import (
     aws_get_stack_outputs, aws_get_stack_parameters,
     aws_get_stack_resources, aws_get_stack_template,
 )
+from .cache_utils import ttl_function_cache, ttl_function_cache_clear, ttl_function_cache_info
+from .check_analytics import (
+    CHECK_ANALYTICS_DEFAULT_DAYS,
+    CHECK_ANALYTICS_DEFAULT_INTERVAL,
+    get_check_analytics
+)
 from .checks import Checks
 from .cognito import get_cognito_oauth_config, handle_cognito_oauth_callback
 from .cookie_utils import create_delete_cookie_string, read_cookie, read_cookie_bool, read_cookie_int
@@ -76,7 +85,8 @@ class ReactApi(ReactApiBase, ReactRoutes):
     def __init__(self):
         super(ReactApi, self).__init__()
         self._react_ui = ReactUi(self)
-        self._checks = Checks(app.core.check_handler.CHECK_SETUP, self._envs)
+        self._checks = Checks(app.core.check_handler.CHECK_SETUP, self._envs,
+                              app.core.check_handler.CHECK_DISPLAY_INDEX)
         self._accounts_file_name = "known_accounts"
 
     @staticmethod
@@ -113,7 +123,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
                 "redis_server": self._get_redis_server_version()
             }
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_known_buckets(self, env: str = None) -> dict:
         if not env:
             env = self._envs.get_default_env()
@@ -132,6 +142,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
     def get_ecosystem_data(self) -> dict:
         return sort_dictionary_by_case_insensitive_keys(EnvUtils.declared_data())
 
+    @ttl_function_cache(ttl=60, stale=10 * 60)
     def _get_elasticsearch_server_status(self) -> Optional[dict]:
         response = {"url": app.core.host}
         try:
@@ -174,7 +185,6 @@ class ReactApi(ReactApiBase, ReactRoutes):
         redis_info = connection.redis_info()
         return redis_info.get("redis_version") if redis_info else None
 
-    @function_cache
     def _get_user_attribution(self, type: str, env: str, raw: bool = False,
                               map_title: Optional[Callable] = None,
                               additional_info: Optional[Callable] = None) -> list:
@@ -183,7 +193,8 @@ class ReactApi(ReactApiBase, ReactRoutes):
         """
         results = []
         connection = app.core.init_connection(env)
-        response = ff_utils.search_metadata(f'/search/?type={type}&datastore=database', key=connection.ff_keys)
+        with server_timing_span("portal"):
+            response = ff_utils.search_metadata(f'/search/?type={type}&datastore=database', key=connection.ff_keys)
         if response:
             if not raw:
                 for item in response:
@@ -201,7 +212,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
                 results = response
         return results
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_institutions(self, env: str, raw: bool = False) -> list:
         """
         Returns the list of available user institutions.
@@ -212,19 +223,19 @@ class ReactApi(ReactApiBase, ReactRoutes):
 
         return self._get_user_attribution("Institution", env, raw, additional_info=get_principle_investigator)
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_projects(self, env: str, raw: bool = False) -> list:
         return self._get_user_attribution("Project", env, raw)
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_awards(self, env: str, raw: bool = False) -> list:
         return self._get_user_attribution("Award", env, raw)
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_labs(self, env: str, raw: bool = False) -> list:
         return self._get_user_attribution("Lab", env, raw)
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_consortia(self, env: str, raw: bool = False) -> list:
         def map_title(title: str) -> str:
             suffix_to_ignore = " Consortium"
@@ -233,7 +244,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
             return title
         return self._get_user_attribution("Consortium", env, raw, map_title=map_title)
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_submission_centers(self, env: str, raw: bool = False) -> list:
         def map_title(title: str) -> str:
             suffix_to_ignore = " Submission Center"
@@ -261,14 +272,14 @@ class ReactApi(ReactApiBase, ReactRoutes):
         ]
         return [{"id": role, "name": role, "title": role.replace("_", " ").title()} for role in roles]
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_schema(self, env: str) -> dict:
         portal_url = get_base_url(app.core.get_portal_url(env))
         user_schema_url = f"{portal_url}/profiles/User.json?format=json"
         user_schema = requests.get(user_schema_url).json()
         return user_schema
 
-    @function_cache
+    @ttl_function_cache(ttl=60 * 60, stale=24 * 60 * 60)
     def _get_user_statuses(self, env: str) -> list:
         user_schema = self._get_user_schema(env)
         user_schema_properties = user_schema.get("properties") if user_schema else None
@@ -350,6 +361,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
         redirect_url = self.get_redirect_url(request, env, domain, context)
         # always delete both cookies on logout
         headers = {"Set-Cookie": [authtoken_cookie_deletion, c4_st_cookie_deletion]}
+        self._auth.invalidate_authtoken_cache(request)
         redis_handler = self._auth.get_redis_handler()
         if redis_handler:
             redis_session_token = RedisSessionToken.from_redis(
@@ -464,7 +476,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
             pass
         return None
 
-    @function_cache(key=lambda self, request, env: env)  # new as of 2023-04-27
+    @ttl_function_cache(ttl=5 * 60, stale=60 * 60, key=lambda self, request, env: env)  # new as of 2023-04-27
     def _reactapi_header_cache(self, request: dict, env: str) -> dict:
         """
         No-cache version of above reactapi_header function.
@@ -713,7 +725,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
         for ecosystem_name in ecosystem_names:
             if not ecosystem_name.endswith(".ecosystem"):
                 ecosystem_name = f"{ecosystem_name}.ecosystem"
-            s3 = boto3.client("s3")
+            s3 = boto_s3_client()
             try:
                 ecosystem_data = s3.get_object(Bucket=global_env_bucket, Key=ecosystem_name)
                 ecosystem_data = json.loads(ecosystem_data["Body"].read().decode("utf-8"))
@@ -901,8 +913,9 @@ class ReactApi(ReactApiBase, ReactRoutes):
         if search:
             # Though limit and offset (from) are supported by search_metadata, total counts don't seem to be (?);
             # very possibly missing something there; so for now get all results and to paging manually here.
-            results = ff_utils.search_metadata(f"/search/?type=User&frame=object&q={search}&sort={sort}",
-                                               key=connection.ff_keys)
+            with server_timing_span("portal"):
+                results = ff_utils.search_metadata(f"/search/?type=User&frame=object&q={search}&sort={sort}",
+                                                   key=connection.ff_keys)
             total = len(results)
             if offset > 0:
                 results = results[offset:]
@@ -910,8 +923,9 @@ class ReactApi(ReactApiBase, ReactRoutes):
                 results = results[:limit]
         else:
             add_on = f"frame=object&datastore=database&limit={limit}&from={offset}&sort={sort}"
-            results = ff_utils.get_metadata("users/", ff_env=full_env_name(env), add_on=add_on,
-                                            key=connection.ff_keys)
+            with server_timing_span("portal"):
+                results = ff_utils.get_metadata("users/", ff_env=full_env_name(env), add_on=add_on,
+                                                key=connection.ff_keys)
             total = results["total"]
             results = results["@graph"]
 
@@ -949,9 +963,10 @@ class ReactApi(ReactApiBase, ReactRoutes):
                 # Note these call works for both email address or user UUID.
                 # Note we must lower case the email to find the user. This is because all emails
                 # in the database are lowercased; it causes issues with OAuth if we don't do this.
-                user = ff_utils.get_metadata('users/' + item.lower(),
-                                             ff_env=full_env_name(env), add_on='frame=object&datastore=database',
-                                             key=connection.ff_keys)
+                with server_timing_span("portal"):
+                    user = ff_utils.get_metadata('users/' + item.lower(),
+                                                 ff_env=full_env_name(env), add_on='frame=object&datastore=database',
+                                                 key=connection.ff_keys)
                 users.append(self._create_user_record_for_output(user) if not raw else user)
             except Exception as e:
                 if "Not Found" in str(e):
@@ -978,8 +993,9 @@ class ReactApi(ReactApiBase, ReactRoutes):
         ignored(request)
         user = self._create_user_record_from_input(user, include_deletes=False)
         connection = app.core.init_connection(env)
-        response = ff_utils.post_metadata(schema_name="users", post_item=user, ff_env=full_env_name(env),
-                                          key=connection.ff_keys)
+        with server_timing_span("portal"):
+            response = ff_utils.post_metadata(schema_name="users", post_item=user, ff_env=full_env_name(env),
+                                              key=connection.ff_keys)
         # Response looks like:
         # {'status': 'success', '@type': ['result'], '@graph': [{'date_created': '2022-10-22T18:39:16.973680+00:00',
         # 'submitted_by': '/users/b5f738b6-455a-42e5-bc1c-77fbfd9b15d2/', 'schema_version': '1', 'status': 'current',
@@ -1018,8 +1034,9 @@ class ReactApi(ReactApiBase, ReactRoutes):
         else:
             add_on = ""
         connection = app.core.init_connection(env)
-        response = ff_utils.patch_metadata(obj_id=f"users/{uuid}", patch_item=user,
-                                           ff_env=full_env_name(env), key=connection.ff_keys, add_on=add_on)
+        with server_timing_span("portal"):
+            response = ff_utils.patch_metadata(obj_id=f"users/{uuid}", patch_item=user,
+                                               ff_env=full_env_name(env), key=connection.ff_keys, add_on=add_on)
         status = response.get("status")
         if status != "success":
             return self.create_error_response(json.dumps(response))
@@ -1043,8 +1060,11 @@ class ReactApi(ReactApiBase, ReactRoutes):
         # kwargs = {"skip_indexing": True} if elasticsearch_server_version >= "7" else {}
         kwargs = {} if elasticsearch_server_version >= "7" else {}
         connection = app.core.init_connection(env)
-        ff_utils.delete_metadata(obj_id=f"users/{uuid}", ff_env=full_env_name(env), key=connection.ff_keys, **kwargs)
-        ff_utils.purge_metadata(obj_id=f"users/{uuid}", ff_env=full_env_name(env), key=connection.ff_keys, **kwargs)
+        with server_timing_span("portal"):
+            ff_utils.delete_metadata(obj_id=f"users/{uuid}", ff_env=full_env_name(env), key=connection.ff_keys,
+                                     **kwargs)
+            ff_utils.purge_metadata(obj_id=f"users/{uuid}", ff_env=full_env_name(env), key=connection.ff_keys,
+                                    **kwargs)
         return self.create_success_response({"status": "User deleted.", "uuid": uuid})
 
     def reactapi_users_institutions(self, request: dict, env: str, args: dict) -> Response:
@@ -1243,69 +1263,89 @@ class ReactApi(ReactApiBase, ReactRoutes):
     def reactapi_checks_history_recent(self, request: dict, env: str, args: Optional[dict] = None) -> Response:
         """
         Called from react_routes for endpoint: GET /{env}/checks/history/recent.
-        Returns the most results among all defined checks for the given environment.
-        Does this by looping through each check and getting the 10 most recent results from each
-        and then globally sorting (in descending order) each of those results by check run timestamp.
+        Returns the most recent results among all defined checks for the given environment,
+        in descending order by check run timestamp. Gets these in a single ES search,
+        or if no ES, by listing (concurrently) only the S3 keys of the results of each check.
         Optional arguments (args) for the request are any of:
         - limit: to limit the results to the specified number; default is 25.
         """
         ignored(request)
-        max_results_per_check = 10
         limit = int(args.get("limit", "25")) if args else 25
         if limit < 1:
             limit = 1
         results = []
         connection = app.core.init_connection(env)
         checks = self._checks.get_checks(env)
-        for check_name in checks:
+        recent_history = app.core.get_foursight_history_recent(connection, list(checks), limit)
+        for check_name, result in recent_history:
+            if check_name not in checks:
+                continue
             group_name = checks[check_name]["group"]
             check_title = checks[check_name]["title"]
-            recent_history, _ = app.core.get_foursight_history(connection, check_name,
-                                                               0, max_results_per_check, "timestamp.desc")
-            for result in recent_history:
-                uuid = None
-                duration = None
-                state = None
-                #
-                # Oddly each result in the history list is an array like this:
-                #
-                # [ "PASS",
-                #   "DB and ES item counts are equal",
-                #   { "primary": true,
-                #     "uuid": "2022-09-22T18:00:12.335344",
-                #     "runtime_seconds": 12.3,
-                #     "queue_action": "Not queued"
-                #    },
-                #    true
-                # ]
-                #
-                # TODO: Do this same kind of sorting out of data below in
-                #       reactapi_checks_history so the UI doesn't have to do it.
-                #
-                status = result[0]
-                for item in result:
-                    if isinstance(item, dict):
-                        uuid = item.get("uuid")
-                        duration = item.get("runtime_seconds")
-                        state = item.get("queue_action")
-                        break
-                if uuid:
-                    timestamp = datetime.datetime.strptime(uuid, "%Y-%m-%dT%H:%M:%S.%f")
-                    timestamp = convert_datetime_to_utc_datetime_string(timestamp)
-                    results.append({
-                        "check": check_name,
-                        "title": check_title,
-                        "group": group_name,
-                        "status": status,
-                        "state": state,
-                        "uuid": uuid,
-                        "duration": duration,
-                        "timestamp": timestamp
-                    })
+            uuid = None
+            duration = None
+            state = None
+            #
+            # Oddly each result in the history list is an array like this:
+            #
+            # [ "PASS",
+            #   "DB and ES item counts are equal",
+            #   { "primary": true,
+            #     "uuid": "2022-09-22T18:00:12.335344",
+            #     "runtime_seconds": 12.3,
+            #     "queue_action": "Not queued"
+            #    },
+            #    true
+            # ]
+            #
+            # TODO: Do this same kind of sorting out of data below in
+            #       reactapi_checks_history so the UI doesn't have to do it.
+            #
+            status = result[0]
+            for item in result:
+                if isinstance(item, dict):
+                    uuid = item.get("uuid")
+                    duration = item.get("runtime_seconds")
+                    state = item.get("queue_action")
+                    break
+            if uuid:
+                timestamp = datetime.datetime.strptime(uuid, "%Y-%m-%dT%H:%M:%S.%f")
+                timestamp = convert_datetime_to_utc_datetime_string(timestamp)
+                results.append({
+                    "check": check_name,
+                    "title": check_title,
+                    "group": group_name,
+                    "status": status,
+                    "state": state,
+                    "uuid": uuid,
+                    "duration": duration,
+                    "timestamp": timestamp
+                })
         results.sort(key=lambda value: value["timestamp"], reverse=True)
         results = results[:limit]
         return self.create_success_response(results)
 
+    def reactapi_checks_analytics(self, request: dict, env: str, check: str, args: Optional[dict] = None) -> Response:
+        """
+        Called from react_routes for endpoint: GET /{env}/checks/{check}/analytics
+        Returns analytics for the recent results of the given check (name), i.e. status counts
+        (overall and over time buckets), runtime percentiles, failure streaks, and mean time to recovery;
+        computed with ES aggregations, or if no ES, by streaming through the S3 results.
+        Optional arguments (args) for the request are any of:
+        - interval: the time bucket size, like 30m, 6h, or 1d; default is 1d.
+        - days: the number of (most recent) days of results to include; default is 30.
+        """
+        ignored(request)
+        interval = args.get("interval", CHECK_ANALYTICS_DEFAULT_INTERVAL) if args else CHECK_ANALYTICS_DEFAULT_INTERVAL
+        try:
+            days = int(args.get("days", CHECK_ANALYTICS_DEFAULT_DAYS)) if args else CHECK_ANALYTICS_DEFAULT_DAYS
+            connection = app.core.init_connection(env)
+            analytics = get_check_analytics(connection, check, interval, days)
+        except ValueError as e:
+            # An invalid interval or days argument is a bad request.
+            return self.create_error_response(get_error_message(e), http_status=400)
+        return self.create_success_response({"env": env, **analytics})
+
     def reactapi_checks_history(self, request: dict, env: str, check: str, args: Optional[dict] = None) -> Response:
         """
         Called from react_routes for endpoint: GET /{env}/checks/{check}/history
@@ -1315,8 +1355,13 @@ class ReactApi(ReactApiBase, ReactRoutes):
         - offset: to skip past the first specified number of results.
         - sort: to sort by the specified field name (optionally suffixed with .asc which is default or .desc);
                 default value is timestamp.desc.
+        - cursor: to page via an opaque cursor rather than offset; if present (may be empty for the first
+                  page) then offset is ignored and paging.next_cursor is returned for use for the next page,
+                  which is null if there are no more; more efficient than offset for deep paging.
         """
         ignored(request)
+        if args and "cursor" in args:
+            return self._reactapi_checks_history_cursor(env, check, args)
         offset = int(args.get("offset", "0")) if args else 0
         if offset < 0:
             offset = 0
@@ -1330,14 +1375,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
         history, total = app.core.get_foursight_history(connection, check, offset, limit, sort)
         history_kwargs = list(set(chain.from_iterable([item[2] for item in history])))
         # queue_attr = app.core.sqs.get_sqs_attributes(app.core.sqs.get_sqs_queue().url)
-        for item in history:
-            for subitem in item:
-                if isinstance(subitem, dict):
-                    uuid = subitem.get("uuid")
-                    if uuid:
-                        timestamp = datetime.datetime.strptime(uuid, "%Y-%m-%dT%H:%M:%S.%f")
-                        timestamp = convert_datetime_to_utc_datetime_string(timestamp)
-                        subitem["timestamp"] = timestamp
+        self._annotate_checks_history_timestamps(history)
         body = {
             "env": env,
             "history_kwargs": history_kwargs,
@@ -1352,6 +1390,48 @@ class ReactApi(ReactApiBase, ReactRoutes):
         }
         return self.create_success_response(body)
 
+    def _reactapi_checks_history_cursor(self, env: str, check: str, args: dict) -> Response:
+        """
+        Cursor based paging version of reactapi_checks_history.
+        """
+        cursor = urllib.parse.unquote(args.get("cursor") or "") or None
+        limit = int(args.get("limit", "25"))
+        if limit < 0:
+            limit = 0
+        sort = urllib.parse.unquote(args.get("sort", "timestamp.desc"))
+        connection = app.core.init_connection(env)
+        try:
+            history, total, next_cursor = app.core.get_foursight_history_page(connection, check, limit, sort, cursor)
+        except BadHistoryCursor as e:
+            # A malformed cursor, or one not created for this sort (or results store), is a bad request.
+            return self.create_error_response(e, http_status=400)
+        history_kwargs = list(set(chain.from_iterable([item[2] for item in history])))
+        self._annotate_checks_history_timestamps(history)
+        body = {
+            "env": env,
+            "history_kwargs": history_kwargs,
+            "paging": {
+                "total": total,
+                "count": len(history),
+                "limit": min(limit, total),
+                "cursor": cursor,
+                "next_cursor": next_cursor
+            },
+            "list": history
+        }
+        return self.create_success_response(body)
+
+    @staticmethod
+    def _annotate_checks_history_timestamps(history: list) -> None:
+        for item in history:
+            for subitem in item:
+                if isinstance(subitem, dict):
+                    uuid = subitem.get("uuid")
+                    if uuid:
+                        timestamp = datetime.datetime.strptime(uuid, "%Y-%m-%dT%H:%M:%S.%f")
+                        timestamp = convert_datetime_to_utc_datetime_string(timestamp)
+                        subitem["timestamp"] = timestamp
+
     def reactapi_checks_run(self, request: dict, env: str, check: str, args: str) -> Response:
         """
         Called from react_routes for endpoint: GET /{env}/checks/{check}/run
@@ -1450,14 +1530,38 @@ class ReactApi(ReactApiBase, ReactRoutes):
         ignored(request, env)
         return self.create_success_response(AwsS3.get_buckets())
 
-    def reactapi_aws_s3_buckets_keys(self, request: dict, env: str, bucket: str) -> Response:
+    def reactapi_aws_s3_buckets_keys(self, request: dict, env: str, bucket: str,
+                                     args: Optional[dict] = None) -> Response:
         """
         Called from react_routes for endpoint: GET /{env}/s3/buckets/{bucket}
-        Return a list of all AWS S3 bucket key names in the given bucket
-        for the current AWS environment.
+        Return a list of the (first 1000) AWS S3 bucket key names in the given bucket
+        for the current AWS environment. If any of the below optional arguments (args)
+        are given then returns a page of keys, and "folders" (if delimiter), as a dictionary
+        (see AwsS3.get_bucket_keys_page) with a next_token to use to get the next page:
+        - prefix: to include only keys starting with the specified prefix.
+        - delimiter: to roll up keys (after the prefix) containing this (e.g. /) into folders.
+        - limit: the maximum number of keys (and folders) to return; default is 1000.
+        - token: the next_token returned for the previous page, to get the next page.
         """
         ignored(request, env)
-        return self.create_success_response(AwsS3.get_bucket_keys(bucket))
+        if not args or not any(arg in args for arg in ["prefix", "delimiter", "limit", "token"]):
+            return self.create_success_response(AwsS3.get_bucket_keys(bucket))
+        try:
+            limit = int(args.get("limit", AwsS3.BUCKET_KEYS_DEFAULT_LIMIT))
+        except ValueError as e:
+            return self.create_error_response(get_error_message(e), http_status=400)
+        token = args.get("token") or None
+        try:
+            return self.create_success_response(AwsS3.get_bucket_keys_page(bucket,
+                                                                           prefix=args.get("prefix") or None,
+                                                                           delimiter=args.get("delimiter") or None,
+                                                                           limit=limit,
+                                                                           token=token))
+        except BotoClientError as e:
+            # A malformed or expired continuation token is a bad request.
+            if token and e.response.get("Error", {}).get("Code") == "InvalidArgument":
+                return self.create_error_response(get_error_message(e), http_status=400)
+            raise e
 
     def reactapi_aws_s3_buckets_key_contents(self, request: dict, env: str, bucket: str, key: str) -> Response:
         """
@@ -1584,7 +1688,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
             s3_secret_access_key = os.environ.get("S3_SECRET_ACCESS_KEY")
             global_env_bucket = self.get_global_env_bucket()
             if s3_aws_access_key_id and s3_secret_access_key and global_env_bucket:
-                s3 = boto3.client("s3")
+                s3 = boto_s3_client()
                 try:
                     s3.list_objects_v2(Bucket=global_env_bucket)
                     return True
@@ -2011,7 +2115,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
 
     def reactapi_aws_ecs_task_arns(self, latest: bool = True) -> Response:
         # If latest is True then only looks for the non-revisioned task ARNs.
-        ecs = boto3.client('ecs')
+        ecs = boto_client('ecs')
         task_arns = ecs.list_task_definitions()['taskDefinitionArns']  # TODO: ecs_utils.list_ecs_tasks
         if latest:
             task_arns = list(set([self._ecs_task_definition_arn_to_name(task_arn) for task_arn in task_arns]))
@@ -2020,7 +2124,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
 
     def reactapi_aws_ecs_tasks(self, latest: bool = True) -> Response:
         task_definitions = []
-        ecs = boto3.client('ecs')
+        ecs = boto_client('ecs')
         task_definition_arns = ecs.list_task_definitions()['taskDefinitionArns']
         if latest:
             task_definition_arns = list(set([self._ecs_task_definition_arn_to_name(task_definition_arn)
@@ -2066,7 +2170,7 @@ class ReactApi(ReactApiBase, ReactRoutes):
         # and the ARN prefix, e.g. "arn:aws:ecs:us-east-1:643366669028:task-definition", may be
         # also be omitted. URL-decode because the ARN may contain a slash.
         task_definition_arn = urllib.parse.unquote(task_definition_arn)
-        ecs = boto3.client('ecs')
+        ecs = boto_client('ecs')
         task_definition = ecs.describe_task_definition(taskDefinition=task_definition_arn)["taskDefinition"]
         task_containers = []
         for task_container in task_definition.get("containerDefinitions", []):
@@ -2121,7 +2225,10 @@ class ReactApi(ReactApiBase, ReactRoutes):
             self._get_metadata_bundles_bucket(env, args),
             int(args.get("offset", "0")) if args else 0,
             int(args.get("limit", "50")) if args else 50,
-            urllib.parse.unquote(args.get("sort", "modified.desc") if args else "modified.desc")))
+            urllib.parse.unquote(args.get("sort", "modified.desc") if args else "modified.desc"),
+            # The index of the submissions is persisted in our own results bucket (see ingestion_utils).
+            results_bucket=get_foursight_bucket(envname=env, stage=app.core.stage.get_stage()),
+            env=full_env_name(env)))
 
     def reactapi_ingestion_submission_summary(self, request: dict, env: str,
                                               uuid: str, args: Optional[dict] = None) -> Response:
@@ -2183,11 +2290,12 @@ class ReactApi(ReactApiBase, ReactRoutes):
 
     def reactapi_function_cache(self, request: dict) -> Response:
         """
-        Called from react_routes for endpoint: GET /__reloadlambda__
-        Kicks off a reload of the given lambda name. For troubleshooting only.
+        Called from react_routes for endpoint: GET /__functioncache__
+        Returns info for all function caches, including (for @ttl_function_cache) hit/miss/latency stats.
+        For troubleshooting only.
         """
         ignored(request)
-        return self.create_success_response(json.dumps(function_cache_info(), default=str))
+        return self.create_success_response(json.dumps(function_cache_info() + ttl_function_cache_info(), default=str))
 
     def reactapi_function_cache_clear(self, request: dict, args: Optional[dict] = None) -> Response:
         """
@@ -2198,10 +2306,11 @@ class ReactApi(ReactApiBase, ReactRoutes):
         cache_cleared = []
         if names and names.lower() != "null":
             for name in names.split(","):
-                if function_cache_clear(name):
+                if function_cache_clear(name) or ttl_function_cache_clear(name):
                     cache_cleared.append(name)
         else:
             function_cache_clear()
+            ttl_function_cache_clear()
             cache_cleared.append("<all>")
         return self.create_success_response({"cache_cleared": cache_cleared})
 
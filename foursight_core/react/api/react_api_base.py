@@ -12,6 +12,7 @@ from ...app import app
 from ...route_prefixes import ROUTE_PREFIX
 from .auth import Auth, AUTH_TOKEN_COOKIE
 from .auth0_config import Auth0Config
+from .compression_utils import compress_response
 from .cookie_utils import create_set_cookie_string, read_cookie
 from .datetime_utils import convert_datetime_to_time_t
 from .envs import Envs
@@ -51,7 +52,17 @@ class ReactApiBase:
             if id(headers) == id(ReactApiBase.STANDARD_HEADERS):
                 headers = {**headers}
             headers[ReactApiBase.CONTENT_TYPE] = content_type
-        return Response(status_code=http_status, body=body, headers=headers)
+        response = Response(status_code=http_status, body=body, headers=headers)
+        return compress_response(response, ReactApiBase.get_request_accept_encoding())
+
+    @staticmethod
+    def get_request_accept_encoding() -> Optional[str]:
+        """
+        Returns the value of the Accept-Encoding header of the current request, if any.
+        """
+        # Note that current_request is only set on the app while handling a request.
+        request = getattr(app, "current_request", None)
+        return request.headers.get("accept-encoding") if request and request.headers else None
 
     @staticmethod
     def create_success_response(body: Optional[Union[dict, list]] = None, content_type: str = None) -> Response:
@@ -97,7 +108,7 @@ class ReactApiBase:
         return ReactApiBase.create_response(http_status=403, body={"status": "Forbidden."})
 
     @staticmethod
-    def create_error_response(message: Union[dict, str, Exception]) -> Response:
+    def create_error_response(message: Union[dict, str, Exception], http_status: int = 500) -> Response:
         if isinstance(message, Exception):
             # Treat an Exception object like the error message string associated with that Exception.
             body = {"error": get_error_message(message)}
@@ -107,7 +118,7 @@ class ReactApiBase:
             body = message
         else:
             raise ValueError(f"The message argument must be a dict, str, or Exception: {message!r}")
-        return ReactApiBase.create_response(http_status=500, body=body)
+        return ReactApiBase.create_response(http_status=http_status, body=body)
 
     @staticmethod
     def is_react_authentication_callback(request: dict) -> bool:
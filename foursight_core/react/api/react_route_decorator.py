@@ -1,14 +1,27 @@
 # This module defines a "route" decorator that wraps the Chalice route decorator,
 # and does authorization (and authentication) checking, tweaks the path appropriately,
-# sets up CORS if necessary (only for local development), and has common exception handling.
+# sets up CORS if necessary (only for local development), and has common exception handling;
+# and aggregates the per-request timing spans into a Server-Timing header (see server_timing.py).
 # We DEFAULT to AUTHORIZATION checking; if not wanted use authorize=False in route decorator.
 
 from chalice import CORSConfig, Response
+from chalice.app import handle_extra_types
+import hashlib
+import json
 import logging
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from dcicutils.misc_utils import get_error_message, PRINT
 from ...app import app
 from ...route_prefixes import CHALICE_LOCAL, ROUTE_PREFIX, ROUTE_EMPTY_PREFIX, ROUTE_PREFIX_EXPLICIT
+from ...server_timing import (
+    SERVER_TIMING_HEADER,
+    get_server_timings,
+    is_server_timing_enabled,
+    is_server_timing_log_enabled,
+    log_server_timings,
+    server_timing_span,
+    server_timings
+)
 
 REACT_API_PATH_COMPONENT = "reactapi"
 REACT_UI_PATH_COMPONENT = "react"
@@ -33,6 +46,7 @@ if CHALICE_LOCAL:
 else:
     _CORS = None
 
+_HTTP_NOT_MODIFIED = 304
 _HTTP_UNAUTHENTICATED = 401
 _HTTP_UNAUTHORIZED = 403
 
@@ -54,6 +68,14 @@ def route(*args, **kwargs):
       def reactapi_route_info(env: str) -> Response:
           return do_route_processing_and_return_response(env)
 
+    If etag=True is passed then (GET) responses are given a strong ETag header, derived from a hash of
+    the response content (unless the response already has an ETag), and a 304 (Not Modified) response,
+    with no body, is returned if the request has an If-None-Match header matching it. Note that this saves
+    on sending the body, but not generating it; so use this for routes where that is cheap (e.g. cached).
+
+    If server timing is enabled (see server_timing.py) then the timing spans (ES, S3, SQS, portal, JSON, etc)
+    within each call are aggregated and returned in a Server-Timing response header, and/or logged as JSON.
+
     Note that functions decorated with this are (if class members) implicitly STATIC methods.
     """
     # Special handling for "root" route, i.e. / (just slash). If NO function specified for the
@@ -111,6 +133,13 @@ def route(*args, **kwargs):
     else:
         authorize = True
 
+    # This "etag" is to specify whether or not ETag/If-None-Match (304) handling is done for the route.
+    if "etag" in kwargs:
+        etag = kwargs["etag"] is True
+        del kwargs["etag"]
+    else:
+        etag = False
+
     # As a convenience we allow "method" or "methods" to specify the HTTP verb(s).
     # If no method(s) given then default to GET.
     if "methods" not in kwargs:
@@ -130,6 +159,23 @@ def route(*args, **kwargs):
             """
             This is the function called on each actual route/endpoint (API) call.
             """
+            server_timing = is_server_timing_enabled()
+            server_timing_log = is_server_timing_log_enabled()
+            if not server_timing and not server_timing_log:
+                return call_route_function(*args, **kwargs)
+            with server_timings() as timings:
+                response = call_route_function(*args, **kwargs)
+                if not isinstance(response, Response):
+                    return response
+                if server_timing:
+                    response.headers = {**(response.headers or {}), SERVER_TIMING_HEADER: timings.to_header()}
+                if server_timing_log:
+                    log_server_timings(timings, route=wrapped_route_function.__name__, path=path,
+                                       method=getattr(app.current_request, "method", None),
+                                       status=response.status_code)
+                return response
+
+        def call_route_function(*args, **kwargs):
             try:
                 env = kwargs.get("env")
                 if env and env != "static" and app.core._envs and not app.core._envs.is_known_env(env):
@@ -138,13 +184,19 @@ def route(*args, **kwargs):
                     # Note that the "env" argument in the kwargs is the environment name from the endpoint
                     # path; this does NOT have to be present in the endpoint path, BUT if it IS then it
                     # MUST be exactly named "env", otherwise we won't properly do per-env authorization.
-                    unauthorized_response = _authorize(app.current_request.to_dict(), env)
+                    with server_timing_span("auth"):
+                        unauthorized_response = _authorize(app.current_request.to_dict(), env)
                     if unauthorized_response:
                         return unauthorized_response
                 # Here we are authenticated and authorized and so we call the actual route function.
                 if define_noenv_route and not env:
                     kwargs["env"] = app.core.get_default_env()
-                return wrapped_route_function(*args, **kwargs)
+                response = wrapped_route_function(*args, **kwargs)
+                if get_server_timings() is not None:
+                    response = _serialize_response_body(response)
+                if etag:
+                    response = _handle_etag(app.current_request, response)
+                return response
             except Exception as e:
                 # Common endpoint exception handling here.
                 logger.error(f"Exception in route ({wrapped_route_function.__name__}): {get_error_message(e)}")
@@ -177,3 +229,65 @@ def _authorize(request: dict, env: Optional[str]) -> Optional[Response]:
         http_status = _HTTP_UNAUTHENTICATED if not authorize_response["authenticated"] else _HTTP_UNAUTHORIZED
         return app.core.create_response(http_status=http_status, body=authorize_response)
     return None
+
+
+def _serialize_response_body(response: Response) -> Response:
+    """
+    Serializes the (JSON) body of the given response, in place, exactly as Chalice would otherwise do later
+    (in Response.to_dict), so that this is done, and timed, within the request (see server_timing.py).
+    """
+    if isinstance(response, Response) and not isinstance(response.body, (str, bytes)):
+        with server_timing_span("json"):
+            # Same serialization as chalice.Response.to_dict does.
+            response.body = json.dumps(response.body, separators=(",", ":"), default=handle_extra_types)
+    return response
+
+
+def create_etag(content: Union[str, bytes, dict, list]) -> str:
+    """
+    Returns a strong ETag value (including its double quotes) for the given content.
+    """
+    if not isinstance(content, (str, bytes)):
+        with server_timing_span("json"):
+            # Same serialization as chalice.Response.to_dict does.
+            content = json.dumps(content, separators=(",", ":"), default=handle_extra_types)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return f"\"{hashlib.sha256(content).hexdigest()[:32]}\""
+
+
+def _handle_etag(request, response: Response) -> Response:
+    """
+    Sets the ETag header for the given (successful) response to a GET request, if not already set,
+    and if the given request has an If-None-Match header matching this ETag then returns a 304
+    (Not Modified) response, otherwise returns the given response.
+    """
+    if not request or request.method != "GET" or not isinstance(response, Response) or response.status_code != 200:
+        return response
+    if response.headers is None:
+        response.headers = {}
+    etag = next((value for name, value in response.headers.items() if name.lower() == "etag"), None)
+    if not etag:
+        etag = create_etag(response.body)
+        response.headers = {**response.headers, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() in ["etag", "vary", "cache-control", "content-location", "expires"]}
+        return Response(status_code=_HTTP_NOT_MODIFIED, body="", headers=headers)
+    return response
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Returns True iff the given If-None-Match request header value matches the given ETag;
+    per RFC 7232 this uses weak comparison, i.e. ignoring any W/ prefix.
+    """
+    def strip_weak(value: str) -> str:
+        value = value.strip()
+        return value[2:] if value.startswith("W/") else value
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return strip_weak(etag) in [strip_weak(value) for value in if_none_match.split(",")]
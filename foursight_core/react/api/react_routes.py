@@ -229,7 +229,7 @@ class ReactRoutes:
         """
         return app.core.reactapi_users_statuses(app.request(), env)
 
-    @route("/{env}/checks", authorize=True)
+    @route("/{env}/checks", authorize=True, etag=True)
     def reactapi_route_checks_ungrouped(env: str) -> Response:  # noqa: implicit @staticmethod via @route
         """
         Returns detailed info on all defined checks, NOT grouped by check group, as dictionary
@@ -238,7 +238,7 @@ class ReactRoutes:
         """
         return app.core.reactapi_checks_ungrouped(app.request(), env)
 
-    @route("/{env}/checks/grouped", authorize=True)
+    @route("/{env}/checks/grouped", authorize=True, etag=True)
     def reactapi_route_checks_grouped(env: str) -> Response:  # noqa: implicit @staticmethod via @route
         """
         Returns detailed info on all defined checks, grouped by check group, as a list where
@@ -270,10 +270,22 @@ class ReactRoutes:
         - offset: to skip past the first specified number of results.
         - sort: to sort by the specified field name (optionally suffixed with .asc which is default or .desc);
                 default value is timestamp.desc.
+        - cursor: to page via an opaque cursor (from paging.next_cursor) rather than offset.
         """
         return app.core.reactapi_checks_history(app.request(), env, check=check, args=app.request_args())
 
-    @route("/{env}/checks/{check}/history/latest", authorize=True)
+    @route("/{env}/checks/{check}/analytics", authorize=True)
+    def reactapi_route_checks_analytics(env: str, check: str) -> Response:  # noqa: implicit @staticmethod via @route
+        """
+        Returns analytics for the recent run histories of the given check, i.e. status counts
+        (overall and per time bucket), runtime percentiles, failure streaks, and mean time to recovery.
+        Optional arguments (args) for the request are any of:
+        - interval: the time bucket size, like 30m, 6h, or 1d; default is 1d.
+        - days: the number of (most recent) days of results to include; default is 30.
+        """
+        return app.core.reactapi_checks_analytics(app.request(), env, check=check, args=app.request_args())
+
+    @route("/{env}/checks/{check}/history/latest", authorize=True, etag=True)
     def reactapi_route_checks_history_latest(env: str, check: str) -> Response:  # noqa: implicit @staticmethod via @route
         """
         Returns the latest (most recent) run result for the given check.
@@ -345,7 +357,7 @@ class ReactRoutes:
         """
         return app.core.reactapi_checks_validation(app.request(), env)
 
-    @route("/{env}/lambdas", authorize=True)
+    @route("/{env}/lambdas", authorize=True, etag=True)
     def reactapi_route_lambdas(env: str) -> Response:  # noqa: implicit @staticmethod via @route
         """
         Returns detailed info on defined lambdas.
@@ -370,8 +382,9 @@ class ReactRoutes:
     def reactapi_route_aws_s3_buckets_keys(env: str, bucket: str) -> Response:  # noqa: implicit @staticmethod via @route
         """
         Return the list of AWS S3 bucket key names in the given bucket for the current AWS environment.
+        Or a page of them, with folders, if any of the prefix, delimiter, limit, or token arguments are given.
         """
-        return app.core.reactapi_aws_s3_buckets_keys(app.request(), env, bucket=bucket)
+        return app.core.reactapi_aws_s3_buckets_keys(app.request(), env, bucket=bucket, args=app.request_args())
 
     @route("/{env}/aws/s3/buckets/{bucket}/{key}", authorize=True)
     def reactapi_route_aws_s3_buckets_key_contents(env: str, bucket: str, key: str) -> Response:  # noqa: implicit @staticmethod via @route
@@ -777,26 +790,26 @@ class ReactRoutes:
     def reactui_route_root() -> Response:  # noqa: implicit @staticmethod via @route
         return route_root()
 
-    @route("/{env}", static=True, authorize=False, define_noenv_route=True)
+    @route("/{env}", static=True, authorize=False, etag=True, define_noenv_route=True)
     def reactui_route_0(env) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [])
 
-    @route("/{env}/{path1}", static=True, authorize=False)
+    @route("/{env}/{path1}", static=True, authorize=False, etag=True)
     def reactui_route_1(env, path1) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [path1])
 
-    @route("/{env}/{path1}/{path2}", static=True, authorize=False)
+    @route("/{env}/{path1}/{path2}", static=True, authorize=False, etag=True)
     def reactui_route_2(env, path1, path2) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [path1, path2])
 
-    @route("/{env}/{path1}/{path2}/{path3}", static=True, authorize=False)
+    @route("/{env}/{path1}/{path2}/{path3}", static=True, authorize=False, etag=True)
     def reactui_route_3(env, path1, path2, path3) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [path1, path2, path3])
 
-    @route("/{env}/{path1}/{path2}/{path3}/{path4}", static=True, authorize=False)
+    @route("/{env}/{path1}/{path2}/{path3}/{path4}", static=True, authorize=False, etag=True)
     def reactui_route_4(env, path1, path2, path3, path4) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [path1, path2, path3, path4])
 
-    @route("/{env}/{path1}/{path2}/{path3}/{path4}/{path5}", static=True, authorize=False)
+    @route("/{env}/{path1}/{path2}/{path3}/{path4}/{path5}", static=True, authorize=False, etag=True)
     def reactui_route_5(env, path1, path2, path3, path4, path5) -> Response:  # noqa: implicit @staticmethod via @route
         return app.core.react_serve_static_file(env, [path1, path2, path3, path4, path5])
@@ -2,8 +2,17 @@ from chalice import Response
 import io
 import logging
 import os
-from typing import Optional
+from typing import Optional, Union
 from dcicutils.function_cache_decorator import function_cache
+from .compression_utils import (
+    COMPRESSION_MIN_SIZE,
+    create_compressed_response,
+    compress,
+    get_accepted_encoding,
+    is_compressible_content_type,
+    is_compression_enabled
+)
+from .react_route_decorator import create_etag
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -122,10 +131,50 @@ class ReactUi:
             logger.error(message)
             return self._react_api.create_error_response(message)
 
+    def _get_file_content_response(self, file: str, open_mode: str, content_type: str) -> Response:
+        """
+        Returns a response for the content of the given file; compressed if the request accepts it
+        (and compression is enabled); the file content, and its compressed variants, are cached.
+        """
+        encoding = None
+        if is_compression_enabled() and is_compressible_content_type(content_type):
+            encoding = get_accepted_encoding(self._react_api.get_request_accept_encoding())
+        headers = {**self._react_api.STANDARD_HEADERS, self._react_api.CONTENT_TYPE: content_type}
+        if encoding:
+            content = self._get_file_content_compressed(file, open_mode, encoding)
+            if content is not None:
+                headers["ETag"] = self._get_file_content_etag(file, open_mode, encoding)
+                return create_compressed_response(content, encoding, headers=headers)
+        headers["ETag"] = self._get_file_content_etag(file, open_mode)
+        return Response(body=self._get_file_content(file, open_mode), headers=headers)
+
+    @staticmethod
     @function_cache
-    def _get_file_content_response(self, file: str, open_mode: str, content_type: str) -> str:
+    def _get_file_content(file: str, open_mode: str) -> Union[str, bytes]:
         with io.open(file, open_mode) as f:
-            content = f.read()
-            response = self._react_api.create_success_response(content_type=content_type)
-            response.body = content
-            return response
+            return f.read()
+
+    @staticmethod
+    @function_cache
+    def _get_file_content_etag(file: str, open_mode: str, encoding: Optional[str] = None) -> str:
+        """
+        Returns the (strong) ETag for the content of the given file, compressed with the given
+        encoding (if any; different encodings of the same content have different ETags); cached.
+        """
+        if encoding:
+            content = ReactUi._get_file_content_compressed(file, open_mode, encoding)
+            if content is not None:
+                return create_etag(content)
+        return create_etag(ReactUi._get_file_content(file, open_mode))
+
+    @staticmethod
+    @function_cache
+    def _get_file_content_compressed(file: str, open_mode: str, encoding: str) -> Optional[bytes]:
+        """
+        Returns the content of the given file compressed with the given encoding (br or gzip),
+        or None if it is too small to be worth compressing; precompressed once and cached.
+        """
+        content = ReactUi._get_file_content(file, open_mode)
+        if len(content) < COMPRESSION_MIN_SIZE:
+            return None
+        return compress(content, encoding)
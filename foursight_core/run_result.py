@@ -1,12 +1,15 @@
+import base64
 import datetime
 import time
 import logging
 from dateutil import tz
 from abc import abstractmethod
 import json
+from typing import Optional
 # from foursight_core.s3_connection import S3Connection
 from foursight_core.exceptions import (
   BadCheckOrAction,
+  BadHistoryCursor,
   MissingFoursightPrefixException
 )
 
@@ -271,6 +274,75 @@ class RunResult(object):
             for idx, key in enumerate(history):
                 history[idx] = self.get_s3_object(key)
 
+        return self._format_result_history(history), total
+
+    def get_result_history_page(self, limit, sort='timestamp.desc', cursor=None) -> [list, int, Optional[str]]:
+        """
+        Like get_result_history but pages using an opaque cursor rather than a start offset, so that
+        getting any page (however deep) costs the same; with ES this uses search_after. The cursor
+        should be None for the first page, and thereafter the cursor returned for the previous page.
+        Returns a tuple of the list of results (see get_result_history), the total, and the cursor
+        for the next page, which is None if there are no more results.
+        """
+        search_after = self.decode_history_cursor(cursor, sort)
+        if self.es:
+            history, total, search_after = self.connections['es'].get_result_history_after(self.name, limit, sort,
+                                                                                           search_after)
+        else:
+            # Only sorted by timestamp (i.e. uuid) descending, same as get_result_history for S3.
+            all_keys = self.connections['s3'].list_all_keys_w_prefix(self.name, records_only=True)
+            total = len(all_keys)
+            all_keys.sort(key=self.filename_to_datetime, reverse=True)
+            if search_after:
+                # The sort values of a cursor from ES (e.g. epoch milliseconds for uuid) are not valid here.
+                try:
+                    after_date = datetime.datetime.strptime(search_after[0], '%Y-%m-%dT%H:%M:%S.%f')
+                except (TypeError, ValueError):
+                    raise BadHistoryCursor('Result history cursor is not valid for the S3 results store.')
+                all_keys = [key for key in all_keys if self.filename_to_datetime(key) < after_date]
+            history_keys = all_keys[:limit]
+            history = self.connections['s3'].get_objects(history_keys)
+            history = [obj for obj in history if isinstance(obj, dict)]
+            if len(all_keys) > limit and history_keys:
+                search_after = [self.filename_to_datetime(history_keys[-1]).strftime('%Y-%m-%dT%H:%M:%S.%f')]
+            else:
+                search_after = None
+        next_cursor = self.encode_history_cursor(search_after, sort) if search_after else None
+        return self._format_result_history(history), total, next_cursor
+
+    @staticmethod
+    def encode_history_cursor(search_after, sort) -> str:
+        """
+        Returns an opaque (URL safe) cursor string for get_result_history_page encoding the
+        given sort values of the last result of a page (search_after), and the sort itself.
+        """
+        cursor = json.dumps({'sort': sort, 'after': search_after}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(cursor.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_history_cursor(cursor, sort) -> Optional[list]:
+        """
+        Returns the sort values (search_after) encoded in the given cursor from encode_history_cursor,
+        or None if no cursor. Raises BadHistoryCursor (a ValueError) if it is malformed or was not
+        created for the given sort.
+        """
+        if not cursor:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            search_after = cursor['after']
+        except Exception:
+            raise BadHistoryCursor()
+        if cursor.get('sort') != sort or not isinstance(search_after, list) or not search_after:
+            raise BadHistoryCursor('Result history cursor does not match the requested sort.')
+        return search_after
+
+    @staticmethod
+    def _format_result_history(history) -> list:
+        """
+        Returns the given list of (check or action) result objects in the form returned
+        by get_result_history, i.e. a list of [status, summary, kwargs, is_check].
+        """
         results = []
         for n in range(len(history)):
             obj = history[n]
@@ -286,7 +358,7 @@ class RunResult(object):
             for remove_key in ['_run_info']:
                 res_val[2].pop(remove_key, None)
             results.append(res_val)
-        return results, total
+        return results
 
     def store_formatted_result(self, uuid, formatted, primary):
         """
@@ -1,11 +1,13 @@
 import os
 import json
-import boto3
 import datetime
 import logging
 from foursight_core.abstract_connection import AbstractConnection
 from dcicutils.misc_utils import full_class_name
+from dcicutils.task_utils import pmap
+from .boto_client import boto_client
 from .boto_s3 import boto_s3_client, boto_s3_resource
+from .server_timing import server_timed
 
 
 logging.basicConfig()
@@ -16,7 +18,7 @@ class S3Connection(AbstractConnection):
     def __init__(self, bucket_name):
         self.client = boto_s3_client()
         self.resource = boto_s3_resource()
-        self.cw = boto3.client('cloudwatch')  # for s3 bucket stats
+        self.cw = boto_client('cloudwatch')  # for s3 bucket stats
         self.bucket = bucket_name
         self.location = 'us-east-1'
         self.encryption = os.environ.get('S3_ENCRYPT_KEY_ID')
@@ -29,6 +31,7 @@ class S3Connection(AbstractConnection):
             self.head_info = self.test_connection()
             self.status_code = self.head_info.get('ResponseMetadata', {}).get("HTTPStatusCode", 404)
 
+    @server_timed("s3")
     def put_object(self, key, value):
         try:
             if self.encryption:
@@ -43,10 +46,12 @@ class S3Connection(AbstractConnection):
         else:
             return key, value
 
+    @server_timed("s3")
     def get_all_objects(self):
         raise NotImplementedError(f"The get_all_objects operation is not allowed"
                                   f" for objects of type {full_class_name(self)}.")
 
+    @server_timed("s3")
     def get_object(self, key):
         # return found bucket content or None on an error
         try:
@@ -63,6 +68,20 @@ class S3Connection(AbstractConnection):
             logger.error(e)
             return None
 
+    @server_timed("s3")
+    def get_objects(self, keys, concurrency=None):
+        """
+        Bulk version of get_object; fetches the given keys concurrently and returns
+        a list of results in the same order as the given keys, with None for any
+        key which could not be found. The concurrency argument is the maximum number
+        of simultaneous requests (default is dcicutils.task_utils default chunk size).
+        """
+        keys = list(keys or [])
+        if len(keys) <= 1:
+            return [self.get_object(key) for key in keys]
+        return list(pmap(self.get_object, keys, chunk_size=concurrency))
+
+    @server_timed("s3")
     def get_size(self):
         """
         Gets the number of keys stored on this s3 connection. This is a very slow
@@ -71,6 +90,7 @@ class S3Connection(AbstractConnection):
         bucket = self.resource.Bucket(self.bucket)
         return sum(1 for _ in bucket.objects.all())
 
+    @server_timed("s3")
     def get_size_bytes(self):
         """
         Uses CloudWatch client to get the bucket size in bytes of this bucket.
@@ -91,6 +111,7 @@ class S3Connection(AbstractConnection):
                                              EndTime=now.isoformat())
         return resp['Datapoints']
 
+    @server_timed("s3")
     def list_all_keys_w_prefix(self, prefix, records_only=False, no_trailing_slash=False):
         """
         List all s3 keys with the given prefix (should look like
@@ -120,6 +141,7 @@ class S3Connection(AbstractConnection):
         # not sorted at this point
         return all_keys
 
+    @server_timed("s3")
     def list_all_keys(self):
         if not self.bucket:
             return []
@@ -129,6 +151,7 @@ class S3Connection(AbstractConnection):
             all_keys.append(obj.key)
         return all_keys
 
+    @server_timed("s3")
     def delete_keys(self, key_list):
         # boto3 requires this setup
         to_delete = {
@@ -137,6 +160,7 @@ class S3Connection(AbstractConnection):
         }
         return self.client.delete_objects(Bucket=self.bucket, Delete=to_delete)
 
+    @server_timed("s3")
     def test_connection(self):
         try:
             bucket_resp = self.client.head_bucket(Bucket=self.bucket)
@@ -144,6 +168,7 @@ class S3Connection(AbstractConnection):
             return {'ResponseMetadata': {'HTTPStatusCode': 404}}
         return bucket_resp
 
+    @server_timed("s3")
     def create_bucket(self, manual_bucket=None):
         # us-east-1 is default location
         # add CreateBucketConfiguration w/ Location key for a different region
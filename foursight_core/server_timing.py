@@ -0,0 +1,157 @@
+# Lightweight per-request timing instrumentation: named spans around calls to ES (ESConnection), S3
+# (S3Connection), SQS, the portal (ff_utils), and JSON serialization, etc, which are aggregated (total duration
+# and count by span name) per React API request by the route decorator (see react_route_decorator.py), and
+# returned in a Server-Timing response header (see https://www.w3.org/TR/server-timing), which the browser dev
+# tools show (Network -> Timing) for each request; and/or logged as a line of structured JSON per request.
+# Only enabled if the FOURSIGHT_SERVER_TIMING (header) and/or FOURSIGHT_SERVER_TIMING_LOG (logging)
+# environment variables are set to true. Otherwise, i.e. outside of a timed request, the only
+# overhead of a span is a context variable lookup.
+
+from contextlib import contextmanager
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Iterator, Optional
+from dcicutils.misc_utils import str_to_bool
+
+SERVER_TIMING_ENABLED_ENV_VAR = "FOURSIGHT_SERVER_TIMING"
+SERVER_TIMING_LOG_ENV_VAR = "FOURSIGHT_SERVER_TIMING_LOG"
+SERVER_TIMING_HEADER = "Server-Timing"
+# Name of the Server-Timing metric for the total duration of the request (i.e. of the route function).
+SERVER_TIMING_TOTAL = "total"
+
+# The ServerTimings for the current request, if timing is enabled; set by the server_timings context manager.
+# Note that context variables are not inherited by threads (unless run via contextvars.copy_context), so
+# spans within threads started by the code being timed are only recorded if so (see run_functions_concurrently).
+_server_timings = contextvars.ContextVar("server_timings", default=None)
+# Names of the spans currently active (in this context), so that nested spans of the same name are not
+# counted twice, e.g. for an ESConnection method which calls another ESConnection method.
+_server_timing_active_spans = contextvars.ContextVar("server_timing_active_spans", default=frozenset())
+
+logging.basicConfig()
+logger = logging.getLogger(__name__)
+
+
+def is_server_timing_enabled() -> bool:
+    return str_to_bool(os.environ.get(SERVER_TIMING_ENABLED_ENV_VAR, "false"))
+
+
+def is_server_timing_log_enabled() -> bool:
+    return str_to_bool(os.environ.get(SERVER_TIMING_LOG_ENV_VAR, "false"))
+
+
+class ServerTimings:
+    """
+    Accumulates the total duration and count of timing spans, by span name, for a single request.
+    Spans in concurrent threads are each counted, so the total for a span name may exceed the elapsed time.
+    """
+    def __init__(self) -> None:
+        self._spans = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def add(self, name: str, duration: float) -> None:
+        with self._lock:
+            total, count = self._spans.get(name, (0.0, 0))
+            self._spans[name] = (total + duration, count + 1)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def to_dict(self) -> dict:
+        """
+        Returns a dictionary of span names to their total duration (milliseconds) and count;
+        including the elapsed time since this object was created, as SERVER_TIMING_TOTAL.
+        """
+        with self._lock:
+            spans = dict(self._spans)
+        timings = {name: {"duration_ms": round(total * 1000, 3), "count": count}
+                   for name, (total, count) in sorted(spans.items())}
+        timings[SERVER_TIMING_TOTAL] = {"duration_ms": round(self.elapsed() * 1000, 3), "count": 1}
+        return timings
+
+    def to_header(self) -> str:
+        """
+        Returns the Server-Timing header value for these timings, looking like, for example:
+        es;dur=12.345;desc="es (2)", s3;dur=3.21;desc="s3 (1)", total;dur=20.5
+        """
+        return ", ".join(f"{name};dur={timing['duration_ms']}"
+                         + (f";desc=\"{name} ({timing['count']})\"" if name != SERVER_TIMING_TOTAL else "")
+                         for name, timing in self.to_dict().items())
+
+
+@contextmanager
+def server_timings() -> Iterator[ServerTimings]:
+    """
+    Context manager within which timing spans (see server_timing_span and server_timed) are
+    recorded into the yielded ServerTimings object. Used by the route decorator for each request.
+    """
+    timings = ServerTimings()
+    token = _server_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _server_timings.reset(token)
+
+
+def get_server_timings() -> Optional[ServerTimings]:
+    """
+    Returns the ServerTimings for the current request, or None if timing is not enabled.
+    """
+    return _server_timings.get()
+
+
+class server_timing_span:  # noqa: named like a function as it is used like one (like contextlib.suppress)
+    """
+    Context manager for a timing span of the given name, recorded into the current ServerTimings (see
+    server_timings), if any; otherwise, or if a span of the same name is already active, does nothing.
+    Usage: with server_timing_span("portal"): ff_utils.get_metadata(...)
+    """
+    __slots__ = ("_name", "_timings", "_token", "_started")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._timings = None
+
+    def __enter__(self) -> "server_timing_span":
+        if (timings := _server_timings.get()) is not None:
+            active_spans = _server_timing_active_spans.get()
+            if self._name not in active_spans:
+                self._timings = timings
+                self._token = _server_timing_active_spans.set(active_spans | {self._name})
+                self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._timings is not None:
+            self._timings.add(self._name, time.perf_counter() - self._started)
+            _server_timing_active_spans.reset(self._token)
+            self._timings = None
+
+
+def server_timed(name: str) -> Callable:
+    """
+    Decorator to record each call to the decorated function as a timing span of the given
+    name (see server_timing_span); when there is no current ServerTimings (i.e. timing is
+    not enabled) the only overhead is a context variable lookup. Not for generator functions.
+    """
+    def server_timed_decorator(wrapped_function: Callable) -> Callable:
+        @functools.wraps(wrapped_function)
+        def function_wrapper(*args, **kwargs):
+            if _server_timings.get() is None:
+                return wrapped_function(*args, **kwargs)
+            with server_timing_span(name):
+                return wrapped_function(*args, **kwargs)
+        return function_wrapper
+    return server_timed_decorator
+
+
+def log_server_timings(timings: ServerTimings, **kwargs) -> None:
+    """
+    Logs the given timings as a single line of JSON, along with the given kwargs (e.g. the route and status).
+    """
+    logger.warning(json.dumps({"server_timing": timings.to_dict(), **kwargs}, default=str))
@@ -1,10 +1,11 @@
-import boto3
 from datetime import datetime
 import json
 import os
 from dcicutils.misc_utils import ignored
 from foursight_core.stage import Stage
+from foursight_core.boto_client import boto_client
 from foursight_core.boto_sqs import boto_sqs_client, boto_sqs_resource
+from foursight_core.server_timing import server_timed
 
 
 class SQS(object):
@@ -15,12 +16,13 @@ class SQS(object):
     def __init__(self, foursight_prefix):
         self.stage = Stage(foursight_prefix)
 
+    @server_timed("sqs")
     def invoke_check_runner(self, runner_input):
         """
         Simple function to invoke the next check_runner lambda with runner_input
         (dict containing {'sqs_url': <str>})
         """
-        client = boto3.client('lambda')
+        client = boto_client('lambda')
         # InvocationType='Event' makes asynchronous
         # try/except while async invokes are problematic
         try:
@@ -36,6 +38,7 @@ class SQS(object):
             )
         return response
 
+    @server_timed("sqs")
     def delete_message_and_propogate(self, runner_input, receipt, propogate=True):
         """
         Delete the message with given receipt from sqs queue and invoke the next
@@ -60,6 +63,7 @@ class SQS(object):
         if propogate is True:
             self.invoke_check_runner(runner_input)
 
+    @server_timed("sqs")
     def recover_message_and_propogate(self, runner_input, receipt, propogate=True):
         """
         Recover the message with given receipt to sqs queue and invoke the next
@@ -90,6 +94,7 @@ class SQS(object):
         if propogate is True:
             self.invoke_check_runner(runner_input)
 
+    @server_timed("sqs")
     def get_sqs_queue(self):
         """
         Returns boto3 sqs resource
@@ -109,6 +114,7 @@ class SQS(object):
         return queue
 
     @classmethod
+    @server_timed("sqs")
     def send_sqs_messages(cls, queue, environ, check_vals, uuid=None):
         """
         Send messages to SQS queue. Check_vals are entries within a check_group.
@@ -136,6 +142,7 @@ class SQS(object):
         return uuid
 
     @classmethod
+    @server_timed("sqs")
     def get_sqs_attributes(cls, sqs_url):
         """
         Returns a dict of the desired attributes form the queue with given url
@@ -1,6 +1,8 @@
 from conftest import DEV_ENV
 import pytest
 import chalice
+import json
+import time
 from foursight_core import app_utils as app_utils_module
 from foursight_core.app_utils import AppUtilsCore
 from unittest import mock
@@ -186,7 +188,95 @@ class TestAppUtils:
         assert (trimmed_short == {'some_field': 'some_value'})
         long_output = {'some_field': 'some_value ' * 100000}
         trimmed_long = app_utils.trim_output(long_output)
-        assert trimmed_long == app_utils.TRIM_ERR_OUTPUT
+        assert len(json.dumps(trimmed_long)) <= 100000
+        assert trimmed_long['some_field'].startswith('some_value some_value')
+        assert trimmed_long['some_field'].endswith('... (truncated)')
+        long_output = {'some_list': list(range(100000)), 'other_field': 'other_value'}
+        trimmed_long = app_utils.trim_output(long_output, max_size=1000)
+        assert len(json.dumps(trimmed_long, separators=(',', ':'))) <= 1000
+        assert trimmed_long['some_list'][:3] == [0, 1, 2]
+        assert trimmed_long['some_list'][-1].endswith('more items truncated')
+        assert trimmed_long['...'] == '1 more key truncated'
+
+    def test_get_view_environments(self, app_utils_obj_conn):
+        """ Tests that main page environments are loaded concurrently and a slow one times out on its own """
+        app_utils, conn = app_utils_obj_conn
+
+        def get_view_environment(environ, environments, is_admin=False):
+            if environ == 'slow':
+                time.sleep(2)
+            if environ == 'broken':
+                raise Exception('broken environment')
+            return {'status': 'success', 'environment': environ, 'server': 'dummy-url', 'groups': []}
+
+        with mock.patch.object(app_utils, 'get_view_environment', side_effect=get_view_environment):
+            with mock.patch.object(app_utils, 'VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS', 0.5):
+                view_envs = app_utils.get_view_environments(['fast', 'slow', 'broken'], {}, True)
+        assert [view_env['environment'] for view_env in view_envs] == ['fast', 'slow', 'broken']
+        assert [view_env['status'] for view_env in view_envs] == ['success', 'error', 'error']
+        assert view_envs[1]['description'] == 'Timed out loading environment.'
+        assert 'broken environment' in view_envs[2]['description']
+
+        # Each environment gets its time budget from when it starts loading; so environments waiting
+        # behind (here, the only worker) hung environments still load, rather than timing out too.
+        with mock.patch.object(app_utils, 'get_view_environment', side_effect=get_view_environment):
+            with mock.patch.object(app_utils, 'VIEW_FOURSIGHT_ENV_TIMEOUT_SECONDS', 0.5), \
+                    mock.patch.object(app_utils, 'VIEW_FOURSIGHT_MAX_WORKERS', 1):
+                view_envs = app_utils.get_view_environments(['slow', 'slow', 'fast'], {}, True)
+        assert [view_env['status'] for view_env in view_envs] == ['error', 'error', 'success']
+
+    def test_get_associated_actions(self, app_utils_obj_conn):
+        """ Tests that associated actions for check results are looked up in bulk """
+        app_utils, _ = app_utils_obj_conn
+        results = [
+            {'name': 'check_a', 'uuid': 'uuid_a', 'action': 'action_a'},
+            {'name': 'check_b', 'uuid': 'uuid_b', 'action': 'action_b'},
+            {'name': 'check_c', 'uuid': 'uuid_c'}
+        ]
+        connection = mock.MagicMock()
+        connection.connections['s3'].get_objects.return_value = [b'action_a/uuid_x.json', None]
+        connection.get_objects.return_value = [{'name': 'action_a', 'status': 'DONE'}]
+        assc_actions = app_utils.get_associated_actions(connection, results)
+        connection.connections['s3'].get_objects.assert_called_once_with(['check_a/action_records/uuid_a',
+                                                                          'check_b/action_records/uuid_b'])
+        connection.get_objects.assert_called_once_with(['action_a/uuid_x.json'])
+        assert assc_actions == {
+            'check_a/action_records/uuid_a': ('action_a/uuid_x.json', {'name': 'action_a', 'status': 'DONE'}),
+            'check_b/action_records/uuid_b': (None, None)
+        }
+
+    def test_get_foursight_history_recent_s3(self):
+        """ Tests that only the most recent results across all checks are fetched from S3 """
+        keys = {
+            'check_a': ['check_a/2023-01-01T00:00:00.000000.json', 'check_a/2023-01-04T00:00:00.000000.json'],
+            'check_b': ['check_b/2023-01-03T00:00:00.000000.json', 'check_b/2023-01-02T00:00:00.000000.json']
+        }
+        connection = mock.MagicMock(connections={'s3': mock.MagicMock(), 'es': None})
+        s3 = connection.connections['s3']
+        s3.list_all_keys_w_prefix.side_effect = lambda check, records_only: keys[check]
+        s3.get_objects.side_effect = lambda keys: [{'name': key.split('/')[0], 'status': 'PASS',
+                                                    'kwargs': {'uuid': key.split('/')[1][:-5]}} for key in keys]
+        recent = AppUtilsCore.get_foursight_history_recent(connection, ['check_a', 'check_b'], 3)
+        s3.get_objects.assert_called_once_with(['check_a/2023-01-04T00:00:00.000000.json',
+                                                'check_b/2023-01-03T00:00:00.000000.json',
+                                                'check_b/2023-01-02T00:00:00.000000.json'])
+        assert [(check, result[2]['uuid']) for check, result in recent] == [
+            ('check_a', '2023-01-04T00:00:00.000000'),
+            ('check_b', '2023-01-03T00:00:00.000000'),
+            ('check_b', '2023-01-02T00:00:00.000000')
+        ]
+
+    def test_get_view_queue_info_cached(self):
+        """ Tests that the SQS queue info for the HTML views is cached (briefly) """
+        app_utils = mock.MagicMock()
+        app_utils.sqs.get_sqs_attributes.return_value = {'ApproximateNumberOfMessagesNotVisible': '2',
+                                                         'ApproximateNumberOfMessages': '3'}
+        assert AppUtilsCore.get_view_queue_info(app_utils) == {'running_checks': '2', 'queued_checks': '3'}
+        assert AppUtilsCore.get_view_queue_info(app_utils) == {'running_checks': '2', 'queued_checks': '3'}
+        assert app_utils.sqs.get_sqs_attributes.call_count == 1
+
+    def test_jinja_bytecode_cache(self):
+        assert isinstance(AppUtilsCore._create_jinja_bytecode_cache(), app_utils_module.jinja2.FileSystemBytecodeCache)
 
     def test_query_params_to_literals(self, app_utils_obj_conn):
         app_utils, conn = app_utils_obj_conn
@@ -0,0 +1,57 @@
+from unittest import mock
+from foursight_core.react.api import aws_ecs_services
+from foursight_core.react.api.aws_ecs_services import AwsCodeBuildCache, get_aws_ecr_build_info
+
+
+def create_build(project: str, number: int, image_repo: str, image_tag: str = "latest") -> dict:
+    return {"id": f"{project}:{number}", "arn": f"arn:aws:codebuild:us-east-1:1:build/{project}:{number}",
+            "buildNumber": number, "buildStatus": "SUCCEEDED",
+            "environment": {"environmentVariables": [{"name": "IMAGE_REPO_NAME", "value": image_repo},
+                                                     {"name": "IMAGE_TAG", "value": image_tag}]}}
+
+
+BUILDS = {build["id"]: build for build in (
+    [create_build("other-project", number, "other-repo") for number in range(150, 0, -1)] +
+    [create_build("my-builder", number, "my-repo") for number in [3, 2, 1]]
+)}
+
+
+def create_codebuild() -> mock.MagicMock:
+    def list_builds_for_project(projectName, nextToken=None, sortOrder=None):  # noqa: boto3 argument names
+        ids = [build_id for build_id in BUILDS if build_id.startswith(f"{projectName}:")]
+        start = int(nextToken) if nextToken else 0
+        return {"ids": ids[start:start + 100], **({"nextToken": str(start + 100)} if start + 100 < len(ids) else {})}
+    codebuild = mock.MagicMock()
+    codebuild.list_projects.return_value = {"projects": ["other-project", "my-builder"]}
+    codebuild.list_builds_for_project.side_effect = list_builds_for_project
+    codebuild.batch_get_builds.side_effect = lambda ids: {"builds": [BUILDS[build_id] for build_id in reversed(ids)
+                                                                     if build_id in BUILDS]}
+    return codebuild
+
+
+def test_get_aws_ecr_build_info():
+    codebuild = create_codebuild()
+    with mock.patch.object(aws_ecs_services, "boto_client", return_value=codebuild):
+        cache = AwsCodeBuildCache()
+        build_info = get_aws_ecr_build_info("my-repo", "latest", previous_builds=2, cache=cache)
+        assert build_info["latest"]["number"] == 3
+        assert [build["number"] for build in build_info["others"]] == [2, 1]
+        assert build_info["latest"]["project"] == "my-builder"
+        assert all(len(call.kwargs["ids"]) <= 100 for call in codebuild.batch_get_builds.call_args_list)
+        # First page of other-project, then my-builder (concurrently with the rest), then other-project page 2.
+        assert codebuild.batch_get_builds.call_count == 3
+        # Second lookup (e.g. for another service with the same image) is served from the cache.
+        assert get_aws_ecr_build_info("my-repo", "latest", previous_builds=0, cache=cache)["latest"]["number"] == 3
+        assert codebuild.batch_get_builds.call_count == 3
+        assert codebuild.list_projects.call_count == 1
+
+
+def test_aws_codebuild_cache_get_builds_batches():
+    codebuild = create_codebuild()
+    with mock.patch.object(aws_ecs_services, "boto_client", return_value=codebuild):
+        cache = AwsCodeBuildCache()
+        build_ids = list(BUILDS)
+        assert [build["id"] for build in cache.get_builds(build_ids)] == build_ids
+        assert sorted(len(call.kwargs["ids"]) for call in codebuild.batch_get_builds.call_args_list) == [53, 100]
+        assert [build["id"] for build in cache.get_builds(build_ids[:5] + ["unknown:1"])] == build_ids[:5]
+        assert codebuild.batch_get_builds.call_count == 3
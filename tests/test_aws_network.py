@@ -0,0 +1,36 @@
+from unittest import mock
+from foursight_core.react.api import aws_network
+from foursight_core.react.api.aws_network import aws_get_network
+
+PAGES = {
+    "describe_vpcs": [
+        {"Vpcs": [{"VpcId": "vpc-1", "Tags": [{"Key": "Name", "Value": "C4NetworkMainVPC"}]}]},
+        {"Vpcs": [{"VpcId": "vpc-2", "Tags": [{"Key": "Name", "Value": "C4NetworkOtherVPC"}]}]}
+    ],
+    "describe_subnets": [
+        {"Subnets": [{"SubnetId": "subnet-1", "VpcId": "vpc-1", "Tags": [{"Key": "Name", "Value": "C4PrivateA"}]},
+                     {"SubnetId": "subnet-2", "VpcId": "vpc-2", "Tags": [{"Key": "Name", "Value": "C4PublicA"}]}]},
+        {"Subnets": [{"SubnetId": "subnet-3", "VpcId": "vpc-1", "Tags": [{"Key": "Name", "Value": "C4PublicB"}]}]}
+    ],
+    "describe_security_groups": [
+        {"SecurityGroups": [{"GroupId": "sg-1", "GroupName": "C4DB", "VpcId": "vpc-2",
+                             "Tags": [{"Key": "Name", "Value": "C4DB"}]}]}
+    ]
+}
+
+
+def test_aws_get_network():
+    ec2 = mock.MagicMock()
+    ec2.get_paginator.side_effect = lambda operation: mock.MagicMock(paginate=lambda: iter(PAGES[operation]))
+    aws_get_network.cache_clear()
+    with mock.patch.object(aws_network, "boto_client", return_value=ec2) as mock_client:
+        network = aws_get_network("C4*")
+        assert aws_get_network("C4*") is network
+        assert mock_client.call_count == 1
+    aws_get_network.cache_clear()
+    assert [vpc["id"] for vpc in network] == ["vpc-1", "vpc-2"]
+    assert [subnet["id"] for subnet in network[0]["subnets"]] == ["subnet-1", "subnet-3"]
+    assert [subnet["type"] for subnet in network[0]["subnets"]] == ["private", "public"]
+    assert network[0]["security_groups"] == []
+    assert [subnet["id"] for subnet in network[1]["subnets"]] == ["subnet-2"]
+    assert [sg["id"] for sg in network[1]["security_groups"]] == ["sg-1"]
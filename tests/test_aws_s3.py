@@ -0,0 +1,63 @@
+import datetime
+from unittest import mock
+from foursight_core.react.api import aws_s3
+from foursight_core.react.api.aws_s3 import AwsS3
+
+MODIFIED = datetime.datetime(2023, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+KEYS = sorted([f"check_{i}/2023-01-0{j}T00:00:00.000000.json" for i in range(3) for j in range(1, 4)] + ["top.json"])
+
+
+def list_objects_v2(Bucket, MaxKeys, Prefix="", Delimiter=None, ContinuationToken=None):  # noqa: S3 argument names
+    items = []
+    for key in KEYS:
+        if not key.startswith(Prefix):
+            continue
+        if Delimiter and Delimiter in key[len(Prefix):]:
+            folder = Prefix + key[len(Prefix):].split(Delimiter)[0] + Delimiter
+            if not items or items[-1] != ("folder", folder):
+                items.append(("folder", folder))
+        else:
+            items.append(("key", key))
+    start = int(ContinuationToken) if ContinuationToken else 0
+    page = items[start:start + MaxKeys]
+    response = {
+        "IsTruncated": start + MaxKeys < len(items),
+        "CommonPrefixes": [{"Prefix": value} for kind, value in page if kind == "folder"],
+        "Contents": [{"Key": value, "Size": 10, "LastModified": MODIFIED} for kind, value in page if kind == "key"]
+    }
+    if response["IsTruncated"]:
+        response["NextContinuationToken"] = str(start + MaxKeys)
+    return response
+
+
+def test_get_bucket_keys_page():
+    s3 = mock.MagicMock()
+    s3.list_objects_v2.side_effect = list_objects_v2
+    with mock.patch.object(aws_s3, "boto_s3_client", return_value=s3):
+        page = AwsS3.get_bucket_keys_page("some-bucket", delimiter="/", limit=3)
+        assert page["folders"] == ["check_0/", "check_1/", "check_2/"]
+        assert page["keys"] == [] and page["count"] == 3
+        page = AwsS3.get_bucket_keys_page("some-bucket", delimiter="/", limit=3, token=page["next_token"])
+        assert page["folders"] == [] and [key["key"] for key in page["keys"]] == ["top.json"]
+        assert page["next_token"] is None
+        keys = []
+        token = None
+        while True:
+            page = AwsS3.get_bucket_keys_page("some-bucket", prefix="check_1/", limit=2, token=token)
+            keys.extend(key["key"] for key in page["keys"])
+            if not (token := page["next_token"]):
+                break
+        assert keys == [key for key in KEYS if key.startswith("check_1/")]
+        assert AwsS3.get_bucket_keys("some-bucket")[0] == {"key": KEYS[0], "size": 10,
+                                                           "modified": "2023-01-01 12:00:00 UTC"}
+
+
+def test_get_bucket_keys_page_limit_spans_s3_pages():
+    s3 = mock.MagicMock()
+    s3.list_objects_v2.side_effect = list_objects_v2
+    with mock.patch.object(aws_s3, "boto_s3_client", return_value=s3), \
+            mock.patch.object(AwsS3, "BUCKET_KEYS_PAGE_SIZE", 4):
+        page = AwsS3.get_bucket_keys_page("some-bucket", limit=7)
+        assert [key["key"] for key in page["keys"]] == KEYS[:7]
+        assert [call.kwargs["MaxKeys"] for call in s3.list_objects_v2.call_args_list] == [4, 3]
+        assert page["next_token"] == "7"
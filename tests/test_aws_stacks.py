@@ -0,0 +1,56 @@
+import datetime
+from unittest import mock
+from foursight_core.react.api import aws_stacks
+from foursight_core.react.api.aws_stacks import aws_get_stack, aws_get_stacks
+
+CREATED = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+STACK = {
+    "StackName": "c4-foursight-test-stack", "StackId": "stack-1", "StackStatus": "CREATE_COMPLETE",
+    "CreationTime": CREATED,
+    "Outputs": [{"OutputKey": "Url", "OutputValue": "https://foursight"},
+                {"OutputKey": "SecretKey", "OutputValue": "some-secret"}],
+    "Parameters": [{"ParameterKey": "Env", "ParameterValue": "test"}]
+}
+RESOURCES = [{"StackResourceSummaries": [{"LogicalResourceId": "Queue", "ResourceType": "AWS::SQS::Queue"}]},
+             {"StackResourceSummaries": [{"LogicalResourceId": "Bucket", "ResourceType": "AWS::S3::Bucket"}]}]
+
+
+def _create_cloudformation(stack: dict) -> mock.MagicMock:
+    cf = mock.MagicMock()
+    cf.describe_stacks.side_effect = lambda StackName: {"Stacks": [stack]}
+    paginators = {
+        "describe_stacks": mock.MagicMock(paginate=lambda: iter([{"Stacks": [{**stack, "StackName": "other-stack"}]},
+                                                                 {"Stacks": [stack]}])),
+        "list_stack_resources": mock.MagicMock(paginate=lambda StackName: iter(RESOURCES))
+    }
+    cf.get_paginator.side_effect = lambda operation: paginators[operation]
+    return cf
+
+
+def test_aws_get_stacks():
+    aws_get_stacks.cache_clear()
+    with mock.patch.object(aws_stacks, "boto_client", return_value=_create_cloudformation(STACK)):
+        stacks = aws_get_stacks()
+    aws_get_stacks.cache_clear()
+    assert [stack["name"] for stack in stacks] == ["c4-foursight-test-stack"]
+    assert stacks[0]["status"] == "CREATE_COMPLETE" and stacks[0]["updated"] is None
+
+
+def test_aws_get_stack_revalidated_by_stack_version():
+    stack = dict(STACK)
+    cf = _create_cloudformation(stack)
+    aws_stacks._aws_get_stack_resources.cache_clear()
+    with mock.patch.object(aws_stacks, "boto_client", return_value=cf):
+        info = aws_get_stack("c4-foursight-test-stack")
+        assert info["outputs"] == {"SecretKey": "********", "Url": "https://foursight"}
+        assert info["parameters"] == {"Env": "test"}
+        assert info["resources"] == {"Bucket": "AWS::S3::Bucket", "Queue": "AWS::SQS::Queue"}
+        # Unchanged stack: only revalidated (describe_stacks), resources not refetched.
+        assert aws_get_stack("c4-foursight-test-stack") == info
+        assert cf.describe_stacks.call_count == 2
+        assert cf.get_paginator.call_count == 1
+        # Updated (deployed) stack: resources refetched.
+        stack.update(StackStatus="UPDATE_COMPLETE", LastUpdatedTime=CREATED + datetime.timedelta(days=1))
+        assert aws_get_stack("c4-foursight-test-stack")["status"] == "UPDATE_COMPLETE"
+        assert cf.get_paginator.call_count == 2
+    aws_stacks._aws_get_stack_resources.cache_clear()
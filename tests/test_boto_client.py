@@ -0,0 +1,33 @@
+import os
+from botocore.config import Config
+from unittest import mock
+from foursight_core.boto_client import (
+    BOTO_CLIENT_MAX_POOL_CONNECTIONS,
+    boto_client, boto_client_cache_clear, boto_resource, get_boto_endpoint_url
+)
+from foursight_core.boto_s3 import boto_s3_client
+
+
+def test_get_boto_endpoint_url():
+    with mock.patch.dict(os.environ, {"S3_URL": "http://localhost:4566", "AWS_ENDPOINT_URL_LAMBDA": "http://lambda"}):
+        assert get_boto_endpoint_url("s3") == "http://localhost:4566"
+        assert get_boto_endpoint_url("lambda") == "http://lambda"
+        assert get_boto_endpoint_url("ecs") == os.environ.get("AWS_ENDPOINT_URL")
+
+
+def test_boto_client_cached_and_configured():
+    boto_client_cache_clear()
+    with mock.patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1", "S3_URL": "http://localhost:4566"}):
+        client = boto_client("lambda")
+        assert boto_client("lambda") is client
+        assert client.meta.config.max_pool_connections == BOTO_CLIENT_MAX_POOL_CONNECTIONS
+        assert client.meta.config.retries["mode"] == "adaptive"
+        assert boto_client("lambda", region_name="us-west-2") is not client
+        configured_client = boto_client("lambda", config=Config(read_timeout=3))
+        assert boto_client("lambda", config=Config(read_timeout=3)) is configured_client
+        assert configured_client.meta.config.read_timeout == 3
+        assert configured_client.meta.config.max_pool_connections == BOTO_CLIENT_MAX_POOL_CONNECTIONS
+        assert boto_s3_client().meta.endpoint_url == "http://localhost:4566"
+        assert boto_s3_client(endpoint_url="http://other").meta.endpoint_url == "http://other"
+        assert boto_resource("s3") is boto_resource("s3")
+    boto_client_cache_clear()
@@ -0,0 +1,63 @@
+import time
+from unittest import mock
+from foursight_core.react.api.cache_utils import ttl_function_cache, ttl_function_cache_clear, ttl_function_cache_info
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_ttl_function_cache():
+    calls = []
+
+    @ttl_function_cache(ttl=60)
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    assert double(2) == 4
+    assert double(2) == 4
+    assert double(3) == 6
+    assert calls == [2, 3]
+    info = double.cache_info()
+    assert info["hits"] == 1 and info["misses"] == 2 and info["size"] == 2
+    assert info["name"].endswith("double")
+    assert info in ttl_function_cache_info()
+    assert ttl_function_cache_clear(info["name"]) == 1
+    assert double.cache_info()["size"] == 0
+
+
+def test_ttl_function_cache_expired_and_stale():
+    values = iter(range(100))
+    now = [1000.0]
+
+    @ttl_function_cache(ttl=10, stale=20)
+    def get_value():
+        return next(values)
+
+    with mock.patch("foursight_core.react.api.cache_utils.time.monotonic", side_effect=lambda: now[0]):
+        assert get_value() == 0
+        now[0] += 5
+        assert get_value() == 0  # fresh
+        now[0] += 10
+        assert get_value() == 0  # stale; refreshed in the background
+        assert _wait_for(lambda: get_value.cache_info()["refreshes"] == 1)
+        assert get_value() == 1
+        now[0] += 100
+        assert get_value() == 2  # expired (past stale); fetched synchronously
+    info = get_value.cache_info()
+    assert (info["hits"], info["stale_hits"], info["misses"]) == (2, 1, 2)
+
+
+def test_ttl_function_cache_maxsize_and_nocache_none():
+    @ttl_function_cache(ttl=60, maxsize=2, nocache_none=True)
+    def identity(value):
+        return value
+
+    identity(None)
+    assert identity.cache_info()["size"] == 0
+    identity(1), identity(2), identity(3)
+    assert identity.cache_info()["size"] == 2
@@ -0,0 +1,111 @@
+import datetime
+import pytest
+from unittest import mock
+from foursight_core.es_connection import ESConnection
+from foursight_core.react.api.check_analytics import (
+    CheckFailureStreaks,
+    get_check_analytics,
+    parse_interval,
+    percentile
+)
+
+NOW = datetime.datetime(2023, 1, 10, 12, 0, 0)
+RESULTS = [
+    ('2023-01-08T01:00:00.000000', 'PASS', 10.0),
+    ('2023-01-08T02:00:00.000000', 'FAIL', 20.0),
+    ('2023-01-08T03:00:00.000000', 'ERROR', 30.0),
+    ('2023-01-08T05:00:00.000000', 'PASS', 40.0),
+    ('2023-01-09T01:00:00.000000', 'WARN', None),
+    ('2023-01-09T02:00:00.000000', 'FAIL', 50.0)
+]
+
+
+def test_parse_interval():
+    assert parse_interval('30m') == 30 * 60
+    assert parse_interval('6h') == 6 * 60 * 60
+    assert parse_interval('1d') == 24 * 60 * 60
+    for interval in ['', '0d', '1w', 'd', '1.5h']:
+        with pytest.raises(ValueError):
+            parse_interval(interval)
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+
+
+def test_check_failure_streaks():
+    failures = CheckFailureStreaks()
+    for uuid, status, _ in RESULTS:
+        failures.add(uuid, status)
+    assert failures.to_dict() == {
+        'failures': {'streaks': 2, 'longest_streak': 2, 'current_streak': 1},
+        'recovery': {'count': 1, 'mean_seconds': 3 * 60 * 60}
+    }
+
+
+def test_get_check_analytics_s3():
+    keys = [f'my_check/{uuid}.json' for uuid, _, _ in RESULTS] + ['my_check/2022-01-01T00:00:00.000000.json']
+    objects = {f'my_check/{uuid}.json': {'status': status, 'kwargs': {'runtime_seconds': runtime}}
+               for uuid, status, runtime in RESULTS}
+    s3 = mock.MagicMock()
+    s3.list_all_keys_w_prefix.return_value = list(reversed(keys))
+    s3.get_objects.side_effect = lambda keys: [objects.get(key) for key in keys]
+    connection = mock.MagicMock(connections={'s3': s3, 'es': None})
+    analytics = get_check_analytics(connection, 'my_check', '1d', 30, now=NOW)
+    assert analytics['source'] == 's3'
+    assert analytics['total'] == 6
+    assert analytics['status_counts'] == {'PASS': 2, 'FAIL': 2, 'ERROR': 1, 'WARN': 1}
+    assert [bucket['total'] for bucket in analytics['buckets']] == [4, 2]
+    assert analytics['buckets'][0]['status_counts'] == {'PASS': 2, 'FAIL': 1, 'ERROR': 1}
+    assert analytics['runtime']['count'] == 5
+    assert analytics['runtime']['min'] == 10.0 and analytics['runtime']['max'] == 50.0
+    assert analytics['runtime']['percentiles']['50.0'] == 30.0
+    assert analytics['failures']['longest_streak'] == 2
+    assert analytics['recovery']['mean_seconds'] == 3 * 60 * 60
+
+
+def test_get_check_analytics_es():
+    es = mock.MagicMock()
+    es.get_result_analytics.return_value = {
+        'statuses': {'buckets': [{'key': 'PASS', 'doc_count': 3}, {'key': 'FAIL', 'doc_count': 1}]},
+        'buckets': {'buckets': [{'key': 1673136000000, 'doc_count': 4,
+                                 'statuses': {'buckets': [{'key': 'PASS', 'doc_count': 3},
+                                                          {'key': 'FAIL', 'doc_count': 1}]}}]},
+        'runtime_percentiles': {'values': {'50.0': 12.5, '99.0': 40.0}},
+        'runtime_stats': {'count': 4, 'min': 1.0, 'max': 41.0, 'avg': 15.0}
+    }
+    es.iter_result_statuses.return_value = iter([(uuid, status) for uuid, status, _ in RESULTS])
+    connection = mock.MagicMock(connections={'s3': mock.MagicMock(), 'es': es})
+    analytics = get_check_analytics(connection, 'my_check', '1d', 30, now=NOW)
+    es.get_result_analytics.assert_called_once_with('my_check', '2022-12-11T12:00:00.000000', '1d',
+                                                    [50.0, 90.0, 95.0, 99.0])
+    assert analytics['source'] == 'es'
+    assert analytics['total'] == 4
+    assert analytics['buckets'] == [{'timestamp': '2023-01-08 00:00:00 UTC', 'total': 4,
+                                     'status_counts': {'PASS': 3, 'FAIL': 1}}]
+    assert analytics['runtime']['percentiles'] == {'50.0': 12.5, '99.0': 40.0}
+    assert analytics['failures']['streaks'] == 2
+
+
+def test_get_check_analytics_too_many_buckets():
+    connection = mock.MagicMock(connections={'s3': mock.MagicMock(), 'es': None})
+    with pytest.raises(ValueError):
+        get_check_analytics(connection, 'my_check', '1m', 30, now=NOW)
+
+
+def test_iter_result_statuses_unique_sort():
+    # Pages (of 2) via search_after, which needs a total (unique) sort, as uuids may be equal.
+    pages = [[{'_source': {'uuid': '2023-01-08T01:00:00.000', 'status': 'PASS'}, 'sort': [1, 'my_check/a.json']},
+              {'_source': {'uuid': '2023-01-08T01:00:00.000', 'status': 'FAIL'}, 'sort': [1, 'my_check/b.json']}],
+             [{'_source': {'uuid': '2023-01-08T01:00:00.000', 'status': 'PASS'}, 'sort': [1, 'my_check/c.json']}]]
+    es = object.__new__(ESConnection)
+    es.es, es.index = mock.MagicMock(), 'some_index'
+    with mock.patch.object(es, 'search', side_effect=[(page, 3) for page in pages]) as search:
+        statuses = list(es.iter_result_statuses('my_check', '2023-01-01T00:00:00.000000', page_size=2))
+    assert [status for _, status in statuses] == ['PASS', 'FAIL', 'PASS']
+    second_page = search.call_args_list[1][0][0].to_dict()
+    assert second_page['sort'] == [{'uuid': {'order': 'asc'}}, {'id_alias.keyword': {'order': 'asc'}}]
+    assert second_page['search_after'] == [1, 'my_check/b.json']
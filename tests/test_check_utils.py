@@ -1,5 +1,6 @@
 import datetime
 from time import sleep
+from unittest import mock
 from conftest import *
 from foursight_core import exceptions
 from foursight_core import run_result
@@ -204,3 +205,51 @@ class TestCheckUtils:
         assert placeholder['name'] == 'test_check'
         assert placeholder['status'] == 'PASS'
         assert placeholder['description'] == 'If queued, this check will run with default arguments'
+
+    def test_get_check_results_s3_bulk_and_sorted(self, check_handler):
+        """ Tests that s3-only check results are fetched in bulk and sorted by status then title """
+        check_setup = {
+            'check_a': {'title': 'Zebra Check', 'group': 'group_one'},
+            'check_b': {'title': 'apple check', 'group': 'group_one'},
+            'check_c': {'title': 'Middle Check', 'group': 'group_two'},
+            'check_d': {'title': 'Ignored Check', 'group': 'group_two'}
+        }
+        stored = {
+            'check_a/primary.json': {'name': 'check_a', 'status': 'PASS'},
+            'check_b/primary.json': {'name': 'check_b', 'status': 'PASS'},
+            'check_c/primary.json': {'name': 'check_c', 'status': 'ERROR'},
+            'check_d/primary.json': {'name': 'check_d', 'status': 'IGNORE'}
+        }
+        s3 = mock.MagicMock()
+        s3.get_objects.side_effect = lambda keys: [stored.get(key) for key in keys]
+        connection = mock.MagicMock(connections={'s3': s3, 'es': None})
+        with mock.patch.object(check_handler, 'CHECK_SETUP', check_setup):
+            with mock.patch.object(check_handler, 'CHECK_SORT_TITLES',
+                                   check_handler.build_check_sort_titles(check_setup)):
+                results = check_handler.get_check_results(connection, checks=[*check_setup, 'check_e'])
+        s3.get_objects.assert_called_once()
+        assert [result['name'] for result in results] == ['check_c', 'check_b', 'check_e', 'check_a']
+
+    def test_check_display_index(self, check_handler):
+        """ Tests the env -> group -> checks display index built from CHECK_SETUP """
+        check_setup = {
+            'check_a': {'title': 'A', 'group': 'group_one', 'schedule': {'morning': {'env-one': {}}}},
+            'check_b': {'title': 'B', 'group': 'group_one', 'schedule': {'morning': {'all': {}}}},
+            'check_c': {'title': 'C', 'group': 'group_two', 'schedule': {}, 'display': ['env-two']},
+            'check_d': {'title': 'D', 'group': 'group_two', 'schedule': {'evening': {'env-two': {}}},
+                        'display': ['env-one']}
+        }
+        index = check_handler.build_check_display_index(check_setup)
+        assert index['unscheduled'] == {'group_two': {'check_c'}}
+        assert check_handler.get_displayed_checks(index, 'env-one') == {
+            'group_one': {'check_a', 'check_b'}, 'group_two': {'check_d'}
+        }
+        assert check_handler.get_displayed_checks(index, 'env-two') == {
+            'group_one': {'check_b'}, 'group_two': {'check_c', 'check_d'}
+        }
+        assert check_handler.get_displayed_checks(index, 'env-three', include_unscheduled=True) == {
+            'group_one': {'check_b'}, 'group_two': {'check_c'}
+        }
+        assert check_handler.get_displayed_checks(index, 'one', is_same_env=lambda a, b: a.endswith(b)) == {
+            'group_one': {'check_a', 'check_b'}, 'group_two': {'check_d'}
+        }
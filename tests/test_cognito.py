@@ -0,0 +1,59 @@
+import json
+import jwt
+from jwt.algorithms import RSAAlgorithm
+import pytest
+from unittest import mock
+from cryptography.hazmat.primitives.asymmetric import rsa
+from foursight_core.react.api import cognito
+from foursight_core.react.api.cognito import CognitoJwksCache
+
+JWKS_URL = "https://cognito-idp.us-east-1.amazonaws.com/some-user-pool/.well-known/jwks.json"
+
+
+def create_jwk(kid: str) -> dict:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return {**json.loads(RSAAlgorithm.to_jwk(private_key.public_key())), "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def mock_jwks_response(*kids: str) -> mock.MagicMock:
+    return mock.MagicMock(json=mock.MagicMock(return_value={"keys": [create_jwk(kid) for kid in kids]}))
+
+
+def test_cognito_jwks_cache():
+    now = [1000.0]
+    with mock.patch.object(cognito.requests, "get") as mock_get, \
+            mock.patch.object(cognito.time, "monotonic", side_effect=lambda: now[0]):
+        mock_get.return_value = mock_jwks_response("kid-a")
+        jwks_cache = CognitoJwksCache(JWKS_URL, ttl=3600, refresh=30)
+        assert jwks_cache.get_signing_key("kid-a").key_id == "kid-a"
+        assert jwks_cache.get_signing_key("kid-a").key_id == "kid-a"
+        assert mock_get.call_count == 1
+        # Unknown kid refreshes, but not more than once per refresh interval.
+        mock_get.return_value = mock_jwks_response("kid-a", "kid-b")
+        with pytest.raises(jwt.PyJWKClientError):
+            jwks_cache.get_signing_key("kid-b")
+        assert mock_get.call_count == 1
+        now[0] += 31
+        assert jwks_cache.get_signing_key("kid-b").key_id == "kid-b"
+        assert mock_get.call_count == 2
+        # Failed refresh after expiration falls back to the stale key set.
+        now[0] += 3601
+        mock_get.side_effect = Exception("network error")
+        assert jwks_cache.get_signing_key("kid-b").key_id == "kid-b"
+        assert mock_get.call_count == 3
+        assert jwks_cache.get_signing_key("kid-a").key_id == "kid-a"
+        assert mock_get.call_count == 3
+
+
+def test_cognito_jwks_cache_fetch_failure():
+    with mock.patch.object(cognito.requests, "get", side_effect=Exception("network error")):
+        with pytest.raises(jwt.PyJWKClientError):
+            CognitoJwksCache(JWKS_URL).get_signing_key("kid-a")
+
+
+def test_get_cognito_oauth_signing_key_client_cached_per_user_pool():
+    with mock.patch.object(cognito, "_get_cognito_oauth_config_basic",
+                           return_value={cognito.KEY_USER_POOL_ID: "some-user-pool"}):
+        signing_key_client = cognito._get_cognito_oauth_signing_key_client()
+        assert isinstance(signing_key_client, CognitoJwksCache)
+        assert signing_key_client is cognito._get_cognito_oauth_signing_key_client()
@@ -0,0 +1,55 @@
+import base64
+import gzip
+import json
+from chalice import Response
+from unittest import mock
+from foursight_core.react.api import compression_utils
+from foursight_core.react.api.compression_utils import (
+    CompressedResponse,
+    compress_response,
+    get_accepted_encoding,
+    is_compressible_content_type
+)
+
+
+def test_get_accepted_encoding():
+    assert get_accepted_encoding(None) is None
+    assert get_accepted_encoding("identity") is None
+    assert get_accepted_encoding("gzip, deflate") == "gzip"
+    assert get_accepted_encoding("gzip;q=0, deflate") is None
+    assert get_accepted_encoding("*") == "gzip"
+    with mock.patch.object(compression_utils, "brotli", None):
+        assert get_accepted_encoding("br, gzip") == "gzip"
+        assert get_accepted_encoding("br") is None
+
+
+def test_is_compressible_content_type():
+    assert is_compressible_content_type("application/json") is True
+    assert is_compressible_content_type("text/html; charset=utf-8") is True
+    assert is_compressible_content_type("image/png") is False
+    assert is_compressible_content_type(None) is False
+
+
+def test_compress_response():
+    body = {"some_list": ["some_value"] * 1000}
+    with mock.patch.dict("os.environ", {compression_utils.COMPRESSION_ENABLED_ENV_VAR: "true"}):
+        response = compress_response(Response(body=body, headers={"Content-Type": "application/json"}), "gzip")
+        assert isinstance(response, CompressedResponse)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        response_dict = response.to_dict()
+        assert response_dict["isBase64Encoded"] is True
+        assert json.loads(gzip.decompress(base64.b64decode(response_dict["body"]))) == body
+        # too small to be worth compressing
+        small_response = Response(body={"abc": "def"}, headers={"Content-Type": "application/json"})
+        assert compress_response(small_response, "gzip") is small_response
+        # not compressible
+        image_response = Response(body=b"x" * 10000, headers={"Content-Type": "image/png"})
+        assert compress_response(image_response, "gzip") is image_response
+        # not accepted
+        json_response = Response(body=body, headers={"Content-Type": "application/json"})
+        assert compress_response(json_response, None) is json_response
+    # not enabled
+    with mock.patch.dict("os.environ", {compression_utils.COMPRESSION_ENABLED_ENV_VAR: "false"}):
+        json_response = Response(body=body, headers={"Content-Type": "application/json"})
+        assert compress_response(json_response, "gzip") is json_response
@@ -0,0 +1,30 @@
+import pytest
+from pyDes import triple_des
+from foursight_core.react.api.encoding_utils import base64_encode_to_bytes, bytes_to_string
+from foursight_core.react.api.encryption import ENCRYPTION_ENVELOPE_V2, Encryption
+
+PASSWORD = "some-password-for-testing"
+
+
+def test_encryption_roundtrip():
+    encryption = Encryption(PASSWORD)
+    encrypted = encryption.encrypt("hello world")
+    assert encrypted.startswith(ENCRYPTION_ENVELOPE_V2)
+    assert encrypted != encryption.encrypt("hello world")  # random nonce
+    assert encryption.decrypt(encrypted) == "hello world"
+    assert encryption.decrypt(encryption.encrypt({"abc": [1, 2]})) == '{"abc": [1, 2]}'
+
+
+def test_encryption_decrypt_legacy():
+    legacy_encrypted = bytes_to_string(base64_encode_to_bytes(
+        triple_des(PASSWORD[0:24]).encrypt("hello legacy world", padmode=2)))
+    assert Encryption(PASSWORD).decrypt(legacy_encrypted) == "hello legacy world"
+
+
+def test_encryption_decrypt_tampered_or_wrong_password():
+    encrypted = Encryption(PASSWORD).encrypt("hello world")
+    with pytest.raises(Exception, match="Decryption error"):
+        Encryption(PASSWORD + "x").decrypt(encrypted)
+    tampered = encrypted[:-2] + ("AA" if encrypted[-2:] != "AA" else "BB")
+    with pytest.raises(Exception, match="Decryption error"):
+        Encryption(PASSWORD).decrypt(tampered)
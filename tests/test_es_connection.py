@@ -32,6 +32,17 @@ class TestESConnection:
         ex = es_connection.ElasticsearchException('test message')
         assert ex.message == 'test message'
 
+    def test_result_history_query_sort(self):
+        """
+        Tests that the result history sort (only) for search_after paging ends with a unique (keyword) field.
+        """
+        query = es_connection.ESConnection._get_result_history_query('some_check', 10, 'timestamp.asc')
+        assert query['sort'] == [{'uuid': {'order': 'asc'}}]
+        query = es_connection.ESConnection._get_result_history_query('some_check', 10, 'status.desc',
+                                                                     unique_sort=True)
+        assert query['sort'] == [{'status': {'order': 'desc'}}, {'uuid': {'order': 'desc'}},
+                                 {'id_alias.keyword': {'order': 'desc'}}]
+
     def test_basic_indexing(self, es):
         """
         Creates a test index, indexes a few check items, verifies they are
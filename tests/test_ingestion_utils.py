@@ -0,0 +1,87 @@
+import datetime
+import io
+import json
+from unittest import mock
+from foursight_core.react.api import ingestion_utils
+from foursight_core.react.api.ingestion_utils import (
+    INGESTION_SUBMISSIONS_INDEX_KEY,
+    read_ingestion_submissions,
+    update_ingestion_submissions_index
+)
+
+BUCKET = "some-metadata-bundles-bucket"
+RESULTS_BUCKET = "some-foursight-results-bucket"
+ENV = "some-env"
+INDEX_KEY = INGESTION_SUBMISSIONS_INDEX_KEY.format(env=ENV)
+UUIDS = [f"{i:08}-a1bc-4e72-ad0d-1873d4253f25" for i in range(1, 6)]
+
+
+class FakeS3:
+
+    def __init__(self):
+        self.objects = {}  # Keys of the metadata-bundles-bucket.
+        self.results = {}  # Keys of the results bucket, i.e. the persisted index.
+
+    def put(self, key: str, day: int, body: bytes = b"x") -> None:
+        self.objects[key] = (body, datetime.datetime(2023, 9, day, 12, 0, 0, tzinfo=datetime.timezone.utc))
+
+    def list_objects_v2(self, Bucket, MaxKeys, StartAfter=None):  # noqa: S3 argument names
+        assert Bucket == BUCKET
+        keys = [key for key in sorted(self.objects) if not StartAfter or key > StartAfter]
+        return {"IsTruncated": len(keys) > MaxKeys,
+                "Contents": [{"Key": key, "Size": len(self.objects[key][0]), "LastModified": self.objects[key][1]}
+                             for key in keys[:MaxKeys]]}
+
+    def put_object(self, Bucket, Key, Body, ContentType):  # noqa: S3 argument names
+        assert Bucket == RESULTS_BUCKET
+        self.results[Key] = Body.encode("utf-8")
+
+    def get_object(self, Bucket, Key):  # noqa: S3 argument names
+        assert Bucket == RESULTS_BUCKET
+        return {"Body": io.BytesIO(self.results[Key])}
+
+
+def test_read_ingestion_submissions_incremental():
+    s3 = FakeS3()
+    for day, uuid in enumerate(UUIDS[:3], start=1):
+        s3.put(f"{uuid}/started.txt", day)
+    s3.put(f"{UUIDS[0]}/submission.json", 4)
+    s3.put(f"{UUIDS[1]}/traceback.txt", 2)
+    with mock.patch.object(ingestion_utils, "boto_s3_client", return_value=s3), \
+            mock.patch.object(ingestion_utils, "_MAX_KEYS_PER_READ", 2), \
+            mock.patch.object(ingestion_utils, "INGESTION_SUBMISSIONS_INDEX_PAGES_PER_UPDATE", 1), \
+            mock.patch.object(ingestion_utils, "_ingestion_submissions_indexes", {}) as indexes:
+        # No index yet so it is built from the whole bucket, and persisted in the results bucket.
+        submissions = read_ingestion_submissions(BUCKET, sort="modified.desc", results_bucket=RESULTS_BUCKET, env=ENV)
+        assert [item["uuid"] for item in submissions["list"]] == [UUIDS[0], UUIDS[2], UUIDS[1]]
+        assert submissions["list"][0]["done"] is True
+        assert submissions["list"][0]["modified"] == "2023-09-04 12:00:00 UTC"
+        assert submissions["list"][2]["error"] is True
+        assert submissions["paging"]["total"] == 3 and submissions["paging"]["reconciled"]
+        assert list(s3.results) == [INDEX_KEY]
+        # New submissions show up, and deleted ones go away, as the scan (2 keys per page here) wraps around.
+        s3.put(f"{UUIDS[3]}/started.txt", 5)
+        del s3.objects[f"{UUIDS[1]}/started.txt"]
+        del s3.objects[f"{UUIDS[1]}/traceback.txt"]
+        update_ingestion_submissions_index(BUCKET, max_pages=1)
+        assert set(indexes[BUCKET]["submissions"]) == set(UUIDS[:3])
+        for _ in range(3):
+            update_ingestion_submissions_index(BUCKET, max_pages=1)
+        assert set(indexes[BUCKET]["submissions"]) == {UUIDS[0], UUIDS[2], UUIDS[3]}
+        # While an update of the index is in progress (in another thread) the index is returned as is.
+        with ingestion_utils._get_ingestion_submissions_index_locks(BUCKET)[1]:
+            with mock.patch.object(s3, "list_objects_v2") as list_objects_v2:
+                assert update_ingestion_submissions_index(BUCKET) is indexes[BUCKET]
+                assert list_objects_v2.call_count == 0
+        # A cold start loads the persisted index rather than listing the whole bucket.
+        ingestion_utils._persist_ingestion_submissions_index(indexes[BUCKET], json.dumps(indexes[BUCKET]),
+                                                             RESULTS_BUCKET, ENV)
+        scan = indexes[BUCKET]["scan"]
+        indexes.clear()
+        with mock.patch.object(s3, "list_objects_v2", wraps=s3.list_objects_v2) as list_objects_v2:
+            submissions = read_ingestion_submissions(BUCKET, offset=1, limit=1, sort="uuid.asc",
+                                                     results_bucket=RESULTS_BUCKET, env=ENV)
+            assert list_objects_v2.call_count == 1
+        assert indexes[BUCKET]["scan"] == scan
+        assert [item["uuid"] for item in submissions["list"]] == [UUIDS[2]]
+        assert submissions["paging"]["total"] == 3 and submissions["paging"]["more"] == 1
@@ -0,0 +1,51 @@
+import json
+from foursight_core.json_utils import json_size, json_truncate, JSON_TRUNCATED_KEY
+
+
+def _json_dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+def test_json_size():
+    value = {'abc': [1, 2, 3], 'def': 'ghi', 'jkl': None}
+    assert json_size(value) == len(_json_dumps(value))
+    assert json_size('é') == len(json.dumps('é'))
+    # stops early once the limit is exceeded
+    assert 10 < json_size(list(range(100000)), 10) < len(_json_dumps(list(range(100000))))
+
+
+def test_json_truncate_not_needed():
+    value = {'abc': [1, 2, 3], 'def': 'ghi'}
+    assert json_truncate(value, 1000) is value
+
+
+def test_json_truncate_list():
+    value = list(range(10000))
+    truncated = json_truncate(value, 500)
+    assert len(_json_dumps(truncated)) <= 500
+    assert truncated[:5] == [0, 1, 2, 3, 4]
+    assert truncated[-1] == f"{len(value) - len(truncated) + 1} more items truncated"
+
+
+def test_json_truncate_dict():
+    value = {f"key_{i}": f"value_{i}" for i in range(1000)}
+    truncated = json_truncate(value, 500)
+    assert len(_json_dumps(truncated)) <= 500
+    assert truncated['key_0'] == 'value_0'
+    assert truncated[JSON_TRUNCATED_KEY] == f"{len(value) - len(truncated) + 1} more keys truncated"
+
+
+def test_json_truncate_nested():
+    value = {'first': {'nested': ['x' * 100 for _ in range(100)]}, 'second': 'y' * 10000}
+    truncated = json_truncate(value, 2000)
+    assert len(_json_dumps(truncated)) <= 2000
+    assert truncated['first']['nested'][0] == 'x' * 100
+    assert truncated['first']['nested'][-1].endswith('more items truncated')
+    assert truncated['second'].endswith('... (truncated)')
+
+
+def test_json_truncate_string():
+    truncated = json_truncate('abc' * 1000, 100)
+    assert len(_json_dumps(truncated)) <= 100
+    assert truncated.startswith('abcabc')
+    assert truncated.endswith('... (truncated)')
@@ -115,3 +115,33 @@ def test_react_authorize_munged():
                 request = create_test_request(authtoken)
                 response = AUTH.authorize(request, ALLOWED_ENV)
                 assert_unauthenticated_response(response)
+
+
+def test_react_authorize_cached():
+    with mock.patch.object(envs, "foursight_env_name", mock_foursight_env_name):
+        with mock.patch.object(gac, "short_env_name", mock_short_env_name):
+            authtoken = create_test_authtoken_good()
+            request = create_test_request(authtoken)
+            AUTH.invalidate_authtoken_cache(request)
+            with mock.patch.object(AUTH, "decode_authtoken", wraps=AUTH.decode_authtoken) as decode_authtoken:
+                assert_authorized_response(AUTH.authorize(request, ALLOWED_ENV))
+                assert_authorized_response(AUTH.authorize(request, ALLOWED_ENV))
+                assert_unauthorized_response(AUTH.authorize(request, DISALLOWED_ENV))
+                assert decode_authtoken.call_count == 1
+                AUTH.invalidate_authtoken_cache(request)
+                assert_authorized_response(AUTH.authorize(request, ALLOWED_ENV))
+                assert decode_authtoken.call_count == 2
+
+
+def test_react_authorize_cached_invalid():
+    with mock.patch.object(auth, "app", get_mock_chalice_app()):
+        with mock.patch.object(envs, "foursight_env_name", mock_foursight_env_name):
+            with mock.patch.object(gac, "short_env_name", mock_short_env_name):
+                authtoken = create_test_authtoken_munged()
+                request = create_test_request(authtoken)
+                AUTH.invalidate_authtoken_cache(request)
+                with mock.patch.object(AUTH, "decode_authtoken", wraps=AUTH.decode_authtoken) as decode_authtoken:
+                    response = AUTH.authorize(request, ALLOWED_ENV)
+                    assert_unauthenticated_response(response)
+                    assert AUTH.authorize(request, ALLOWED_ENV)["status"] == response["status"]
+                    assert decode_authtoken.call_count == 1
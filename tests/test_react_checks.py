@@ -0,0 +1,45 @@
+from unittest import mock
+from foursight_core.react.api import checks as checks_module
+from foursight_core.react.api.checks import Checks
+
+CHECK_SETUP = {
+    "my_check": {"title": "My Check", "group": "My Group", "schedule": {"hourly_checks": {"data": {}}}},
+    "my_other_check": {"title": "My Other Check", "group": "My Group", "schedule": {"app.daily_checks": {}}}
+}
+STACK_TEMPLATE = {"TemplateBody": {"Resources": {
+    "HourlyChecks": {"Type": "AWS::Lambda::Function",
+                     "Properties": {"Code": {"S3Bucket": "b", "S3Key": "k1"}, "Handler": "app.hourly_checks"}},
+    "DailyChecks": {"Type": "AWS::Lambda::Function",
+                    "Properties": {"Code": {"S3Bucket": "b", "S3Key": "k2"}, "Handler": "app.daily_checks"}},
+    "HourlyChecksRule": {"Type": "AWS::Events::Rule",
+                         "Properties": {"ScheduleExpression": "cron(0 0/1 * * ? *)",
+                                        "Targets": [{"Arn": {"Fn::GetAtt": ["HourlyChecks", "Arn"]}}]}}
+}}}
+LAMBDA_FUNCTIONS = [{"Handler": f"app.{name}", "FunctionName": name, "FunctionArn": f"arn:{name}",
+                     "CodeSize": 100, "LastModified": "2023-01-01T00:00:00.000+0000",
+                     "Description": name, "Role": "role"} for name in ["hourly_checks", "daily_checks", "other"]]
+
+
+def test_get_annotated_lambdas():
+    checks = Checks(CHECK_SETUP, mock.MagicMock(), check_display_index={})
+    boto_lambda = mock.MagicMock()
+    boto_lambda.list_tags.side_effect = lambda Resource: {  # noqa: boto3 argument name
+        "Tags": {"last_modified": "2022-12-01T00:00:00.000+0000"} if Resource == "arn:daily_checks" else {}}
+    Checks.invalidate_annotated_lambdas()
+    with mock.patch.object(Checks, "_get_stack_template", return_value=STACK_TEMPLATE) as get_stack_template, \
+            mock.patch.object(Checks, "_get_all_lambda_functions", return_value=LAMBDA_FUNCTIONS), \
+            mock.patch.object(checks_module, "boto_client", return_value=boto_lambda):
+        lambdas = {la["lambda_name"]: la for la in checks.get_annotated_lambdas()}
+        assert boto_lambda.list_tags.call_count == 2
+        assert lambdas["HourlyChecks"]["lambda_function_name"] == "hourly_checks"
+        assert lambdas["HourlyChecks"]["lambda_schedule"] == "0 0/1 * * ? *"
+        assert lambdas["HourlyChecks"]["lambda_modified"] == "2023-01-01T00:00:00.000+0000"
+        assert [check["check_name"] for check in lambdas["HourlyChecks"]["lambda_checks"]] == ["my_check"]
+        assert lambdas["DailyChecks"]["lambda_modified"] == "2022-12-01T00:00:00.000+0000"
+        assert [check["check_name"] for check in lambdas["DailyChecks"]["lambda_checks"]] == ["my_other_check"]
+        checks.get_annotated_lambdas()
+        assert get_stack_template.call_count == 1
+        Checks.invalidate_annotated_lambdas()
+        checks.get_annotated_lambdas()
+        assert get_stack_template.call_count == 2
+    Checks.invalidate_annotated_lambdas()
@@ -1,5 +1,6 @@
 from unittest import mock
 import os
+import time
 from foursight_core.react.api import envs as react_envs
 from foursight_core.react.api.envs import Envs
 from test_react_auth_defs import (
@@ -45,3 +46,47 @@ def test_envs():
         check_find_known_env(KNOWN_ENV_A)
         check_find_known_env(KNOWN_ENV_B)
         check_find_known_env(KNOWN_ENV_C)
+
+
+def test_get_user_auth_info():
+
+    users = {
+        KNOWN_ENV_A["full_name"]: {"groups": ["admin"], "first_name": "First", "last_name": "Last"},
+        KNOWN_ENV_B["full_name"]: {"groups": ["other"]},
+        KNOWN_ENV_C["full_name"]: {"groups": ["foursight"], "first_name": "First", "last_name": "Last"}
+    }
+
+    def get_user(env_name, email):
+        assert email == "someone@example.com"
+        return users[env_name]
+
+    envs = Envs(KNOWN_ENVS)
+    with mock.patch.object(envs, "_get_user", side_effect=get_user) as mock_get_user:
+        assert envs.get_user_auth_info("Someone@Example.com") == (
+            [KNOWN_ENV_A["full_name"], KNOWN_ENV_C["full_name"]], "First", "Last")
+        assert mock_get_user.call_count == 3
+        # Cached per email.
+        envs.get_user_auth_info("someone@example.com")
+        assert mock_get_user.call_count == 3
+
+
+def test_get_user_auth_info_failure_partially_cached():
+
+    def get_user(env_name, email):
+        if env_name == KNOWN_ENV_B["full_name"]:
+            raise Exception("portal down")
+        return {"groups": ["admin"]}
+
+    envs = Envs(KNOWN_ENVS)
+    with mock.patch.object(envs, "_get_user", side_effect=get_user) as mock_get_user:
+        assert envs.get_user_auth_info("someone@example.com")[0] == [KNOWN_ENV_A["full_name"], KNOWN_ENV_C["full_name"]]
+        # The results from the environments which succeeded are cached, but only briefly.
+        assert envs.get_user_auth_info("someone@example.com")[0] == [KNOWN_ENV_A["full_name"], KNOWN_ENV_C["full_name"]]
+        assert mock_get_user.call_count == 3
+        expires = envs._user_auth_info_cache["someone@example.com"][0]
+        assert expires <= time.time() + Envs.USER_AUTH_INFO_PARTIAL_CACHE_TTL_SECONDS
+        with mock.patch.object(envs, "USER_AUTH_INFO_PARTIAL_CACHE_TTL_SECONDS", 0):
+            envs._user_auth_info_cache.clear()
+            envs.get_user_auth_info("someone@example.com")
+            envs.get_user_auth_info("someone@example.com")
+        assert mock_get_user.call_count == 9
@@ -0,0 +1,41 @@
+from chalice import Response
+from unittest import mock
+from foursight_core.react.api.react_route_decorator import _handle_etag, create_etag
+
+
+def create_test_request(method: str = "GET", if_none_match: str = None):
+    return mock.MagicMock(method=method, headers={"if-none-match": if_none_match} if if_none_match else {})
+
+
+def create_test_response(body=None):
+    return Response(body=body or {"some_property": "some_value"}, headers={"Content-Type": "application/json"})
+
+
+def test_create_etag():
+    assert create_etag({"abc": 123}) == create_etag('{"abc":123}') == create_etag(b'{"abc":123}')
+    assert create_etag({"abc": 123}) != create_etag({"abc": 124})
+    assert create_etag("abc").startswith('"') and create_etag("abc").endswith('"')
+
+
+def test_handle_etag():
+    response = _handle_etag(create_test_request(), create_test_response())
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert etag == create_etag(create_test_response().body)
+    response = _handle_etag(create_test_request(if_none_match=etag), create_test_response())
+    assert response.status_code == 304
+    assert response.body == ""
+    assert response.headers["ETag"] == etag
+    response = _handle_etag(create_test_request(if_none_match=f'"other", W/{etag}'), create_test_response())
+    assert response.status_code == 304
+    response = _handle_etag(create_test_request(if_none_match='"other"'), create_test_response())
+    assert response.status_code == 200
+    # not for non-GET requests
+    response = _handle_etag(create_test_request(method="POST", if_none_match=etag), create_test_response())
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    # existing ETag is used as is
+    response = create_test_response()
+    response.headers["ETag"] = '"existing"'
+    response = _handle_etag(create_test_request(if_none_match='"existing"'), response)
+    assert response.status_code == 304
@@ -1,4 +1,6 @@
 import datetime
+import pytest
+from unittest import mock
 from conftest import *
 from foursight_core import run_result
 
@@ -71,6 +73,42 @@ class TestRunResult:
         test_exc = run_result.BadCheckOrAction('Abcd')
         assert (str(test_exc) == 'Abcd')
 
+    def test_history_cursor(self):
+        cursor = run_result.RunResult.encode_history_cursor(['2023-01-02T03:04:05.123456'], 'timestamp.desc')
+        assert '/' not in cursor and '+' not in cursor
+        assert run_result.RunResult.decode_history_cursor(cursor, 'timestamp.desc') == ['2023-01-02T03:04:05.123456']
+        assert run_result.RunResult.decode_history_cursor(None, 'timestamp.desc') is None
+        with pytest.raises(ValueError):
+            run_result.RunResult.decode_history_cursor(cursor, 'status.asc')
+        with pytest.raises(ValueError):
+            run_result.RunResult.decode_history_cursor('not-a-cursor', 'timestamp.desc')
+        with pytest.raises(run_result.BadHistoryCursor):
+            run_result.RunResult.decode_history_cursor(
+                run_result.RunResult.encode_history_cursor([], 'timestamp.desc'), 'timestamp.desc')
+
+    def test_get_result_history_page_s3(self):
+        uuids = ['2023-01-0%dT00:00:00.000000' % day for day in range(1, 6)]
+        objects = {f'{self.check_name}/{uuid}.json': {'uuid': uuid, 'status': 'PASS', 'summary': uuid,
+                                                      'kwargs': {'uuid': uuid}}
+                   for uuid in uuids}
+        s3 = mock.MagicMock()
+        s3.list_all_keys_w_prefix.return_value = list(objects)
+        s3.get_objects.side_effect = lambda keys: [objects[key] for key in keys]
+        connection = mock.MagicMock(connections={'s3': s3, 'es': None})
+        run = run_result.CheckResult(connection, self.check_name)
+        pages, cursor = [], None
+        while True:
+            history, total, cursor = run.get_result_history_page(2, 'timestamp.desc', cursor)
+            assert total == 5
+            pages.append([item[1] for item in history])
+            if not cursor:
+                break
+        assert pages == [[uuids[4], uuids[3]], [uuids[2], uuids[1]], [uuids[0]]]
+        # A cursor from ES (with epoch milliseconds rather than datetime strings) is not valid for S3.
+        es_cursor = run_result.RunResult.encode_history_cursor([1672531200000, 'some/key.json'], 'timestamp.desc')
+        with pytest.raises(run_result.BadHistoryCursor):
+            run.get_result_history_page(2, 'timestamp.desc', es_cursor)
+
     @pytest.mark.flaky
     def test_delete_results_nonprimary(self, app_utils_obj_conn, run):
         """
@@ -0,0 +1,68 @@
+import json
+import os
+from chalice import Response
+from unittest import mock
+from foursight_core.app import app
+from foursight_core.react.api.misc_utils import run_functions_concurrently
+from foursight_core.react.api.react_route_decorator import route
+from foursight_core.server_timing import (
+    SERVER_TIMING_ENABLED_ENV_VAR,
+    SERVER_TIMING_LOG_ENV_VAR,
+    get_server_timings,
+    server_timed,
+    server_timing_span,
+    server_timings
+)
+
+
+@server_timed("es")
+def es_function(nested: bool = False) -> str:
+    return es_function() if nested else "result"
+
+
+def test_server_timing_spans():
+    assert get_server_timings() is None
+    assert es_function() == "result"  # not timed, outside of server_timings
+    with server_timings() as timings:
+        assert get_server_timings() is timings
+        assert es_function() == "result"
+        assert es_function(nested=True) == "result"  # nested span of same name only counted once
+        with server_timing_span("json"):
+            es_function()
+        run_functions_concurrently([lambda: es_function(), lambda: es_function()])
+    assert get_server_timings() is None
+    spans = timings.to_dict()
+    assert spans["es"]["count"] == 5
+    assert spans["json"]["count"] == 1
+    assert list(spans) == ["es", "json", "total"]
+    header = timings.to_header()
+    assert header.startswith("es;dur=")
+    assert ';desc="es (5)", json;dur=' in header
+    assert ", total;dur=" in header
+
+
+def test_route_server_timing():
+
+    @route("/{env}/test_route_server_timing", authorize=False)
+    def test_route(env: str) -> Response:
+        es_function()
+        return Response(body={"env": env}, headers={"Content-Type": "application/json"})
+
+    core = mock.MagicMock(_envs=None)
+    with mock.patch.object(app, "core", core, create=True), \
+            mock.patch.object(app, "current_request", mock.MagicMock(method="GET"), create=True):
+        with mock.patch.dict(os.environ, {SERVER_TIMING_ENABLED_ENV_VAR: "false", SERVER_TIMING_LOG_ENV_VAR: ""}):
+            response = test_route(env="some-env")
+            assert "Server-Timing" not in response.headers
+            assert response.body == {"env": "some-env"}
+        with mock.patch.dict(os.environ, {SERVER_TIMING_ENABLED_ENV_VAR: "true", SERVER_TIMING_LOG_ENV_VAR: "true"}), \
+                mock.patch("foursight_core.server_timing.logger") as logger:
+            response = test_route(env="some-env")
+            header = response.headers["Server-Timing"]
+            assert header.startswith("es;dur=") and ", json;dur=" in header and ", total;dur=" in header
+            # body is serialized (and timed) within the request exactly as chalice would do it
+            assert response.body == '{"env":"some-env"}'
+            assert response.to_dict()["body"] == '{"env":"some-env"}'
+            logged = json.loads(logger.warning.call_args[0][0])
+            assert logged["route"] == "test_route" and logged["status"] == 200
+            assert logged["server_timing"]["es"]["count"] == 1